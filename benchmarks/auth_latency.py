@@ -0,0 +1,148 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2018 Red Hat
+# Licensed under The MIT License (MIT)
+# http://opensource.org/licenses/MIT
+#
+"""
+Compare per-request latency of authenticating with Kerberos handler and
+token header on the session (as done by older clients) with plain token
+authentication.
+
+A local stand-in server is used. It answers requests without a valid token
+with a Kerberos (Negotiate) challenge. With ``--challenge-every N`` it also
+challenges every N-th request carrying a token, e.g. to emulate an expired
+token. The Kerberos handler then silently renegotiates, which shows as extra
+server requests, while plain token requests are rejected. Since there is no
+KDC, the stand-in Kerberos handler generates a dummy SPNEGO header; the rest
+of its logic is the one of requests-kerberos.
+
+    $ python benchmarks/auth_latency.py --requests 500 --challenge-every 50
+"""
+
+from __future__ import print_function
+
+import argparse
+import os
+import sys
+import time
+from threading import Thread
+
+try:
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+    from SocketServer import ThreadingMixIn
+except ImportError:
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+    from socketserver import ThreadingMixIn
+
+import requests
+import requests_kerberos
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from pdc_client.auth import TokenAuth
+
+TOKEN = 'BENCHMARK'
+
+
+class StandInKerberosAuth(requests_kerberos.HTTPKerberosAuth):
+    """Kerberos handler producing dummy SPNEGO tokens."""
+    def generate_request_header(self, response, host, is_preemptive=False):
+        return 'Negotiate U1RBTkQtSU4='
+
+
+class StandInServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+class StandInHandler(BaseHTTPRequestHandler, object):
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+    challenge_every = 0
+    count = 0
+
+    def do_GET(self):
+        StandInHandler.count += 1
+        authorization = self.headers.get('Authorization', '')
+        challenge = self.challenge_every and self.count % self.challenge_every == 0
+        if authorization.startswith('Negotiate') or (authorization == 'Token ' + TOKEN and not challenge):
+            body = b'{"count": 0, "next": null, "previous": null, "results": []}'
+            self.send_response(200)
+        else:
+            body = b'{"detail": "Authentication credentials were not provided."}'
+            self.send_response(401)
+            self.send_header('WWW-Authenticate', 'Negotiate')
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def percentile(values, percent):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * percent / 100.0))]
+
+
+def measure(session, url, count):
+    latencies = []
+    rejected = 0
+    for _ in range(count):
+        start = time.time()
+        if session.get(url).status_code != 200:
+            rejected += 1
+        latencies.append((time.time() - start) * 1000)
+    return latencies, rejected
+
+
+def kerberos_session():
+    """Session as configured before: Kerberos handler and token header."""
+    session = requests.Session()
+    session.auth = StandInKerberosAuth(mutual_authentication=requests_kerberos.DISABLED)
+    session.headers['Authorization'] = 'Token ' + TOKEN
+    return session
+
+
+def token_session():
+    """Session with token authentication only."""
+    session = requests.Session()
+    session.auth = TokenAuth(TOKEN)
+    return session
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--requests', type=int, default=500,
+                        help='number of requests per mode')
+    parser.add_argument('--challenge-every', type=int, default=0, metavar='N',
+                        help='reject every N-th token request with Negotiate challenge')
+    args = parser.parse_args()
+
+    StandInHandler.challenge_every = args.challenge_every
+    server = StandInServer(('localhost', 0), StandInHandler)
+    thread = Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+    url = 'http://localhost:%d/rest_api/v1/releases/' % server.server_address[1]
+
+    print('{0:16} {1:>9} {2:>9} {3:>9} {4:>9} {5:>9}'.format(
+        'Mode', 'Requests', 'Rejected', 'Mean ms', 'p50 ms', 'p95 ms'))
+    for name, session_factory in (('kerberos+token', kerberos_session),
+                                  ('token', token_session)):
+        session = session_factory()
+        measure(session, url, 10)
+        StandInHandler.count = 0
+        latencies, rejected = measure(session, url, args.requests)
+        print('{0:16} {1:>9} {2:>9} {3:>9.3f} {4:>9.3f} {5:>9.3f}'.format(
+            name, StandInHandler.count, rejected, sum(latencies) / len(latencies),
+            percentile(latencies, 50), percentile(latencies, 95)))
+        session.close()
+
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
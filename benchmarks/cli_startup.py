@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2018 Red Hat
+# Licensed under The MIT License (MIT)
+# http://opensource.org/licenses/MIT
+#
+"""
+Measure cold start of the pdc command for each command of the default
+plugins.
+
+Every command is run with --help in a fresh interpreter, which covers
+loading of plugins and building of the parser but sends no requests. Both
+the whole run and Runner.setup() (loading plugins and building the parser)
+are timed. Each
+command is run as usual (only its plugin is loaded and only its arguments
+are registered) and with all plugins loaded and registered, as it is done
+for the top level help and for completion.
+
+    $ python benchmarks/cli_startup.py --runs 5
+"""
+
+from __future__ import print_function
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+sys.path.insert(0, ROOT)
+
+from pdc_client import plugin_manifest
+from pdc_client.runner import DEFAULT_PLUGIN_DIR
+
+
+def percentile(values, percent):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * percent / 100.0))]
+
+
+RUN = """
+import sys
+import time
+from pdc_client.runner import Runner
+if {all_commands}:
+    Runner._requested_command = lambda self, args: None
+sys.argv = ['pdc', {command!r}, '--help']
+runner = Runner()
+start = time.time()
+runner.setup()
+sys.stderr.write('%f' % ((time.time() - start) * 1000))
+runner.run()
+"""
+
+
+def measure(commands, runs, all_commands):
+    """Return durations of whole runs and of setup in milliseconds."""
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    durations = []
+    setups = []
+    with open(os.devnull, 'w') as devnull:
+        for command in commands:
+            code = RUN.format(command=command, all_commands=all_commands)
+            for _ in range(runs):
+                start = time.time()
+                process = subprocess.Popen([sys.executable, '-c', code], env=env,
+                                           stdout=devnull, stderr=subprocess.PIPE)
+                setup = process.communicate()[1]
+                durations.append((time.time() - start) * 1000)
+                setups.append(float(setup))
+    return durations, setups
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--runs', type=int, default=5,
+                        help='number of runs of each command per mode')
+    args = parser.parse_args()
+
+    commands = sorted(plugin_manifest.load_manifest(DEFAULT_PLUGIN_DIR))
+    results = [('all commands', measure(commands, args.runs, True)),
+               ('requested command', measure(commands, args.runs, False))]
+
+    print('{0:20} {1:>6} {2:>9} {3:>9} {4:>9} {5:>9}'.format(
+        'Mode', 'Runs', 'p50 ms', 'p95 ms', 'Setup p50', 'Setup p95'))
+    for name, (durations, setups) in results:
+        print('{0:20} {1:>6} {2:>9.3f} {3:>9.3f} {4:>9.3f} {5:>9.3f}'.format(
+            name, len(durations), percentile(durations, 50), percentile(durations, 95),
+            percentile(setups, 50), percentile(setups, 95)))
+
+
+if __name__ == '__main__':
+    main()
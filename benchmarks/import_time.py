@@ -0,0 +1,91 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2018 Red Hat
+# Licensed under The MIT License (MIT)
+# http://opensource.org/licenses/MIT
+#
+"""
+Measure time of importing pdc_client in a fresh interpreter.
+
+Each run starts a new Python process, so nothing is cached between runs
+except by the operating system. Time of importing only the dependencies
+(requests and beanbag) is measured the same way and subtracted, so the
+budget covers what pdc_client itself adds and does not depend on the
+installed versions of the dependencies. The script fails if the median
+import time exceeds the budget or if the import starts computing the version
+(running git or loading pkg_resources).
+
+    $ python benchmarks/import_time.py --runs 20 --budget 50
+"""
+
+from __future__ import print_function
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+DEPENDENCIES = 'import requests, beanbag'
+
+CHECK = (
+    "import sys, pdc_client; "
+    "assert '__version__' not in vars(pdc_client), 'version computed on import'; "
+    "assert 'pkg_resources' not in sys.modules, 'pkg_resources imported'"
+)
+
+
+def percentile(values, percent):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * percent / 100.0))]
+
+
+def measure(code, runs):
+    env = dict(os.environ, PYTHONPATH=ROOT, PYTHONDONTWRITEBYTECODE='')
+    durations = []
+    for _ in range(runs):
+        start = time.time()
+        subprocess.check_call([sys.executable, '-c', code], env=env)
+        durations.append((time.time() - start) * 1000)
+    return durations
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--runs', type=int, default=20,
+                        help='number of imports to measure')
+    parser.add_argument('--budget', type=float, default=50, metavar='MS',
+                        help='maximum median time pdc_client adds to importing '
+                             'its dependencies in milliseconds')
+    args = parser.parse_args()
+
+    try:
+        measure(CHECK, 1)
+    except subprocess.CalledProcessError:
+        sys.exit('Importing pdc_client computes its version')
+
+    baseline = measure('pass', args.runs)
+    dependencies = measure(DEPENDENCIES, args.runs)
+    imports = measure('import pdc_client', args.runs)
+    base = percentile(baseline, 50)
+    deps = percentile(dependencies, 50)
+
+    print('{0:16} {1:>9} {2:>9} {3:>9}'.format('Mode', 'Runs', 'p50 ms', 'p95 ms'))
+    print('{0:16} {1:>9} {2:>9.3f} {3:>9.3f}'.format(
+        'interpreter', args.runs, base, percentile(baseline, 95)))
+    print('{0:16} {1:>9} {2:>9.3f} {3:>9.3f}'.format(
+        'dependencies', args.runs, deps - base, percentile(dependencies, 95) - base))
+    print('{0:16} {1:>9} {2:>9.3f} {3:>9.3f}'.format(
+        'import', args.runs, percentile(imports, 50) - base, percentile(imports, 95) - base))
+    print('{0:16} {1:>9} {2:>9.3f} {3:>9}'.format(
+        'pdc_client', args.runs, percentile(imports, 50) - deps, ''))
+
+    if percentile(imports, 50) - deps > args.budget:
+        sys.exit('Median time pdc_client adds to the import exceeds budget of %.0f ms' % args.budget)
+
+
+if __name__ == '__main__':
+    main()
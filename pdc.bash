@@ -1,9 +1,231 @@
+# Generated by "pdc completion generate --shell bash", do not edit.
 
-_python_argcomplete() {
-    local IFS=''
-    COMPREPLY=( $(IFS="$IFS"                   COMP_LINE="$COMP_LINE"                   COMP_POINT="$COMP_POINT"                   _ARGCOMPLETE_COMP_WORDBREAKS="$COMP_WORDBREAKS"                   _ARGCOMPLETE=1                   "$1" 8>&1 9>&2 1>/dev/null 2>/dev/null) )
-    if [[ $? != 0 ]]; then
-        unset COMPREPLY
+declare -gA _pdc_words=(
+    ['pdc']='-h --help -s --server -k --insecure --ca-cert --json --page-size --page --prefetch --rate-limit --max-in-flight --stats --stats-json --version base-product build-image build-image-rtt-tests completion compose compose-full-import compose-image-rtt-tests compose-tree-locations content-delivery-repo global-component global-component-contact group-resource-permissions image permission product product-version release release-component release-component-contact release-variant rpm'
+    ['pdc base-product']='-h --help create info list update'
+    ['pdc base-product create']='-h --help --short --name --version --type'
+    ['pdc base-product info']='-h --help'
+    ['pdc base-product list']='-h --help --inactive --all'
+    ['pdc base-product update']='-h --help --short --name --version --type'
+    ['pdc build-image']='-h --help list info'
+    ['pdc build-image list']='-h --help --show-md5 --component-name --rpm-version --rpm-release --image-id --image-format --md5 --archive-build-nvr --archive-name --archive-size --archive-md5 --release-id'
+    ['pdc build-image info']='-h --help'
+    ['pdc build-image-rtt-tests']='-h --help list info update'
+    ['pdc build-image-rtt-tests list']='-h --help --build-nvr --image-format --test-result'
+    ['pdc build-image-rtt-tests info']='-h --help'
+    ['pdc build-image-rtt-tests update']='-h --help --test-result'
+    ['pdc completion']='-h --help generate refresh'
+    ['pdc completion generate']='-h --help --shell'
+    ['pdc completion refresh']='-h --help --source'
+    ['pdc compose']='-h --help list info update'
+    ['pdc compose list']='-h --help --deleted'
+    ['pdc compose info']='-h --help'
+    ['pdc compose update']='-h --help --acceptance-testing --linked-releases --rtt-tested-architectures'
+    ['pdc compose-full-import']='-h --help create'
+    ['pdc compose-full-import create']='-h --help --release-id --composeinfo --rpm-manifest --image-manifest --location --url --scheme'
+    ['pdc compose-image-rtt-tests']='-h --help list info update'
+    ['pdc compose-image-rtt-tests list']='-h --help --compose --variant --arch --file-name --test-result'
+    ['pdc compose-image-rtt-tests info']='-h --help'
+    ['pdc compose-image-rtt-tests update']='-h --help --test-result'
+    ['pdc compose-tree-locations']='-h --help list info update create delete'
+    ['pdc compose-tree-locations list']='-h --help --compose --variant --arch --location --scheme'
+    ['pdc compose-tree-locations info']='-h --help'
+    ['pdc compose-tree-locations update']='-h --help --scheme --url --synced-content'
+    ['pdc compose-tree-locations create']='-h --help --compose --variant --arch --location --scheme --synced-content --url'
+    ['pdc compose-tree-locations delete']='-h --help'
+    ['pdc content-delivery-repo']='-h --help list info create clone update delete export import'
+    ['pdc content-delivery-repo list']='-h --help --arch --content-category --content-format --name --release-id --repo-family --service --shadow --variant-uid --product-id --fields'
+    ['pdc content-delivery-repo info']='-h --help'
+    ['pdc content-delivery-repo create']='-h --help --arch --content-category --content-format --name --release-id --repo-family --service --variant-uid --product-id --shadow'
+    ['pdc content-delivery-repo clone']='-h --help --release-id-from --release-id-to --include-service --include-repo-family --include-content-format --include-content-category --include-shadow --exclude-shadow --include-product-id'
+    ['pdc content-delivery-repo update']='-h --help --product-id --shadow --arch --content-category --content-format --name --release-id --repo-family --service --variant-uid'
+    ['pdc content-delivery-repo delete']='-h --help'
+    ['pdc content-delivery-repo export']='-h --help --product-id --shadow --arch --content-category --content-format --name --repo-family --service --variant-uid'
+    ['pdc content-delivery-repo import']='-h --help'
+    ['pdc global-component']='-h --help list info update create'
+    ['pdc global-component list']='-h --help --dist-git-path --label --name --upstream-homepage --upstream-scm-type --upstream-scm-url'
+    ['pdc global-component info']='-h --help'
+    ['pdc global-component update']='-h --help --dist-git-path --name --homepage --scm-type --scm-url'
+    ['pdc global-component create']='-h --help --name --dist-git-path --homepage --scm-type --scm-url'
+    ['pdc global-component-contact']='-h --help list info create delete delete-match'
+    ['pdc global-component-contact list']='-h --help --component --contact --role --email'
+    ['pdc global-component-contact info']='-h --help'
+    ['pdc global-component-contact create']='-h --help --component --role --email --username --mail-name'
+    ['pdc global-component-contact delete']='-h --help'
+    ['pdc global-component-contact delete-match']='-h --help --component --contact --role --email'
+    ['pdc group-resource-permissions']='-h --help list info update create delete'
+    ['pdc group-resource-permissions list']='-h --help --resource --permission --group'
+    ['pdc group-resource-permissions info']='-h --help'
+    ['pdc group-resource-permissions update']='-h --help --resource --permission --group'
+    ['pdc group-resource-permissions create']='-h --help --resource --permission --group'
+    ['pdc group-resource-permissions delete']='-h --help'
+    ['pdc image']='-h --help list info'
+    ['pdc image list']='-h --help --show-sha256 --arch --compose --file-name --image-format --image-type --implant-md5 --md5 --sha1 --sha256 --volume-id --subvariant'
+    ['pdc image info']='-h --help --sha256'
+    ['pdc permission']='-h --help list'
+    ['pdc permission list']='-h --help'
+    ['pdc product']='-h --help create info list update'
+    ['pdc product create']='-h --help --short --name'
+    ['pdc product info']='-h --help'
+    ['pdc product list']='-h --help --inactive --all'
+    ['pdc product update']='-h --help --short --name'
+    ['pdc product-version']='-h --help create info list update'
+    ['pdc product-version create']='-h --help --short --name --version --product'
+    ['pdc product-version info']='-h --help'
+    ['pdc product-version list']='-h --help --inactive --all'
+    ['pdc product-version update']='-h --help --short --name --version --product'
+    ['pdc release']='-h --help list info update create clone'
+    ['pdc release list']='-h --help --inactive --all'
+    ['pdc release info']='-h --help'
+    ['pdc release update']='-h --help --activate --deactivate --product-version --base-product --bugzilla-product --dist-git-branch --version --short --release-type --name'
+    ['pdc release create']='-h --help --activate --deactivate --version --short --release-type --name --product-version --base-product --bugzilla-product --dist-git-branch'
+    ['pdc release clone']='-h --help --activate --deactivate --short --version --release-type --base-product --name --product-version --bugzilla-product --dist-git-branch --component-dist-git-branch --include-inactive --include-trees --integrated-with'
+    ['pdc release-component']='-h --help list info update create'
+    ['pdc release-component list']='-h --help --include-inactive-release --active --inactive --brew-package --bugzilla-component --global-component --name --release --srpm-name --type --fields'
+    ['pdc release-component info']='-h --help --include-inactive-release'
+    ['pdc release-component update']='-h --help --activate --deactivate --dist-git-branch --bugzilla-component --brew-package --type --srpm-name --global-component --name'
+    ['pdc release-component create']='-h --help --activate --deactivate --name --release --global-component --dist-git-branch --bugzilla-component --brew-package --type --srpm-name'
+    ['pdc release-component-contact']='-h --help list info create delete delete-match'
+    ['pdc release-component-contact list']='-h --help --release --dist-git-branch --global-component --component --contact --role --email'
+    ['pdc release-component-contact info']='-h --help'
+    ['pdc release-component-contact create']='-h --help --release --component --role --email --username --mail-name'
+    ['pdc release-component-contact delete']='-h --help'
+    ['pdc release-component-contact delete-match']='-h --help --release --dist-git-branch --global-component --component --contact --role --email'
+    ['pdc release-variant']='-h --help create info list update delete'
+    ['pdc release-variant create']='-h --help --release --uid --id --name --type --arch'
+    ['pdc release-variant info']='-h --help'
+    ['pdc release-variant list']='-h --help --release --uid --id --name --type'
+    ['pdc release-variant update']='-h --help --release --uid --id --name --type --arch'
+    ['pdc release-variant delete']='-h --help'
+    ['pdc rpm']='-h --help list info create update'
+    ['pdc rpm list']='-h --help --name --version --release --arch --compose --conflicts --obsoletes --provides --suggests --recommends --requires --fields'
+    ['pdc rpm info']='-h --help'
+    ['pdc rpm create']='-h --help --arch --epoch --name --release --srpm-name --version --filename --srpm-nevra --linked-releases --requires --provides --suggests --obsoletes --recommends --conflicts'
+    ['pdc rpm update']='-h --help --filename --srpm-nevra --linked-releases --arch --epoch --name --release --srpm-name --version --requires --provides --suggests --obsoletes --recommends --conflicts'
+)
+
+declare -gA _pdc_takes_value=(
+    ['pdc']='-s --server --ca-cert --page-size --page --prefetch --rate-limit --max-in-flight --stats-json'
+    ['pdc base-product create']='--short --name --version --type'
+    ['pdc base-product update']='--short --name --version --type'
+    ['pdc build-image list']='--component-name --rpm-version --rpm-release --image-id --image-format --md5 --archive-build-nvr --archive-name --archive-size --archive-md5 --release-id'
+    ['pdc build-image-rtt-tests list']='--build-nvr --image-format --test-result'
+    ['pdc build-image-rtt-tests update']='--test-result'
+    ['pdc completion generate']='--shell'
+    ['pdc completion refresh']='--source'
+    ['pdc compose update']='--acceptance-testing --linked-releases --rtt-tested-architectures'
+    ['pdc compose-full-import create']='--release-id --composeinfo --rpm-manifest --image-manifest --location --url --scheme'
+    ['pdc compose-image-rtt-tests list']='--compose --variant --arch --file-name --test-result'
+    ['pdc compose-image-rtt-tests update']='--test-result'
+    ['pdc compose-tree-locations list']='--compose --variant --arch --location --scheme'
+    ['pdc compose-tree-locations update']='--scheme --url --synced-content'
+    ['pdc compose-tree-locations create']='--compose --variant --arch --location --scheme --synced-content --url'
+    ['pdc content-delivery-repo list']='--arch --content-category --content-format --name --release-id --repo-family --service --shadow --variant-uid --product-id --fields'
+    ['pdc content-delivery-repo create']='--arch --content-category --content-format --name --release-id --repo-family --service --variant-uid --product-id --shadow'
+    ['pdc content-delivery-repo clone']='--release-id-from --release-id-to --include-service --include-repo-family --include-content-format --include-content-category --include-product-id'
+    ['pdc content-delivery-repo update']='--product-id --shadow --arch --content-category --content-format --name --release-id --repo-family --service --variant-uid'
+    ['pdc content-delivery-repo export']='--product-id --shadow --arch --content-category --content-format --name --repo-family --service --variant-uid'
+    ['pdc global-component list']='--dist-git-path --label --name --upstream-homepage --upstream-scm-type --upstream-scm-url'
+    ['pdc global-component update']='--dist-git-path --name --homepage --scm-type --scm-url'
+    ['pdc global-component create']='--name --dist-git-path --homepage --scm-type --scm-url'
+    ['pdc global-component-contact list']='--component --contact --role --email'
+    ['pdc global-component-contact create']='--component --role --email --username --mail-name'
+    ['pdc global-component-contact delete-match']='--component --contact --role --email'
+    ['pdc group-resource-permissions list']='--resource --permission --group'
+    ['pdc group-resource-permissions update']='--resource --permission --group'
+    ['pdc group-resource-permissions create']='--resource --permission --group'
+    ['pdc image list']='--arch --compose --file-name --image-format --image-type --implant-md5 --md5 --sha1 --sha256 --volume-id --subvariant'
+    ['pdc image info']='--sha256'
+    ['pdc product create']='--short --name'
+    ['pdc product update']='--short --name'
+    ['pdc product-version create']='--short --name --version --product'
+    ['pdc product-version update']='--short --name --version --product'
+    ['pdc release update']='--product-version --base-product --bugzilla-product --dist-git-branch --version --short --release-type --name'
+    ['pdc release create']='--version --short --release-type --name --product-version --base-product --bugzilla-product --dist-git-branch'
+    ['pdc release clone']='--short --version --release-type --base-product --name --product-version --bugzilla-product --dist-git-branch --component-dist-git-branch --include-inactive --include-trees --integrated-with'
+    ['pdc release-component list']='--brew-package --bugzilla-component --global-component --name --release --srpm-name --type --fields'
+    ['pdc release-component update']='--dist-git-branch --bugzilla-component --brew-package --type --srpm-name --global-component --name'
+    ['pdc release-component create']='--name --release --global-component --dist-git-branch --bugzilla-component --brew-package --type --srpm-name'
+    ['pdc release-component-contact list']='--release --dist-git-branch --global-component --component --contact --role --email'
+    ['pdc release-component-contact create']='--release --component --role --email --username --mail-name'
+    ['pdc release-component-contact delete-match']='--release --dist-git-branch --global-component --component --contact --role --email'
+    ['pdc release-variant create']='--release --uid --id --name --type --arch'
+    ['pdc release-variant list']='--release --uid --id --name --type'
+    ['pdc release-variant update']='--release --uid --id --name --type --arch'
+    ['pdc rpm list']='--name --version --release --arch --compose --conflicts --obsoletes --provides --suggests --recommends --requires --fields'
+    ['pdc rpm create']='--arch --epoch --name --release --srpm-name --version --filename --srpm-nevra --linked-releases --requires --provides --suggests --obsoletes --recommends --conflicts'
+    ['pdc rpm update']='--filename --srpm-nevra --linked-releases --arch --epoch --name --release --srpm-name --version --requires --provides --suggests --obsoletes --recommends --conflicts'
+)
+
+declare -gA _pdc_values=(
+    ['pdc build-image-rtt-tests update|--test-result']='choices:passed failed untested'
+    ['pdc completion generate|--shell']='choices:bash zsh'
+    ['pdc completion refresh|--source']='choices:releases composes global-components'
+    ['pdc compose info|0']='source:composes'
+    ['pdc compose update|0']='source:composes'
+    ['pdc compose update|--acceptance-testing']='choices:passed failed untested'
+    ['pdc compose-image-rtt-tests info|0']='source:composes'
+    ['pdc compose-image-rtt-tests update|0']='source:composes'
+    ['pdc compose-image-rtt-tests update|--test-result']='choices:passed failed untested'
+    ['pdc compose-tree-locations info|0']='source:composes'
+    ['pdc compose-tree-locations update|0']='source:composes'
+    ['pdc compose-tree-locations update|--synced-content']='choices:binary debug source'
+    ['pdc compose-tree-locations create|--synced-content']='choices:binary debug source'
+    ['pdc compose-tree-locations delete|0']='source:composes'
+    ['pdc content-delivery-repo export|0']='source:releases'
+    ['pdc content-delivery-repo import|0']='source:releases'
+    ['pdc global-component info|0']='source:global-components'
+    ['pdc global-component update|0']='source:global-components'
+    ['pdc release info|0']='source:releases'
+    ['pdc release update|0']='source:releases'
+    ['pdc release clone|0']='source:releases'
+    ['pdc release-component info|0']='source:releases'
+    ['pdc release-component update|0']='source:releases'
+    ['pdc release-variant info|0']='source:releases'
+    ['pdc release-variant update|0']='source:releases'
+    ['pdc release-variant delete|0']='source:releases'
+)
+
+_pdc_cached() {
+    local file=${PDC_COMPLETION_CACHE:-$HOME/.cache/pdc/completion}/${2//[^A-Za-z0-9._-]/_}/$1
+    [[ -r $file ]] || return
+    if type look &>/dev/null; then
+        COMPREPLY=($(look -- "$cur" "$file"))
+    else
+        COMPREPLY=($(compgen -W "$(<"$file")" -- "$cur"))
     fi
 }
-complete -o nospace -o default -F _python_argcomplete "pdc"
+
+_pdc() {
+    local cur=${COMP_WORDS[COMP_CWORD]} prev=${COMP_WORDS[COMP_CWORD-1]}
+    local cmd=pdc server=stage word spec i positional=0
+    for ((i = 1; i < COMP_CWORD; i++)); do
+        word=${COMP_WORDS[i]}
+        if [[ $word == -* ]]; then
+            if [[ " ${_pdc_takes_value[$cmd]} " == *" $word "* ]]; then
+                ((i++))
+                [[ $word == -s || $word == --server ]] && server=${COMP_WORDS[i]}
+            fi
+        elif [[ -n ${_pdc_words[$cmd $word]+set} ]]; then
+            cmd="$cmd $word"
+            positional=0
+        else
+            ((positional++))
+        fi
+    done
+
+    if ((COMP_CWORD > 1)) && [[ $prev == -* && " ${_pdc_takes_value[$cmd]} " == *" $prev "* ]]; then
+        spec=${_pdc_values[$cmd|$prev]}
+        [[ -n $spec ]] || return
+    elif [[ $cur != -* ]]; then
+        spec=${_pdc_values[$cmd|$positional]}
+    fi
+
+    case $spec in
+        choices:*) COMPREPLY=($(compgen -W "${spec#choices:}" -- "$cur")) ;;
+        source:*) _pdc_cached "${spec#source:}" "$server" ;;
+        *) COMPREPLY=($(compgen -W "${_pdc_words[$cmd]}" -- "$cur")) ;;
+    esac
+}
+
+complete -o default -F _pdc pdc
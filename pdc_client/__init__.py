@@ -9,21 +9,43 @@ from __future__ import print_function
 
 import itertools
 import json
+import logging
+import math
 import os
 import sys
-from subprocess import Popen, PIPE
+import threading
+from collections import OrderedDict, deque
 
 import requests
-import requests_kerberos
+from requests.adapters import DEFAULT_POOLSIZE
 from beanbag import BeanBag, BeanBagException
 
+from .auth import KerberosAuthStrategy
+from .compat import parse_qs, string_type, urlencode, urlsplit
 from .config import ServerConfigManager
+from .detail_cache import DetailCache
+from .http_cache import CachingHTTPAdapter, HTTPCache
+from .rate_limit import RateLimiter
+from .single_flight import SingleFlight
+from .stats import DEFAULT_LATENCY_WINDOW, DEFAULT_MAX_RECORDS, RequestStats
+from .streaming import CHUNK_SIZE, decode_stream
+from .token_cache import TokenCache, current_principal
+from .transport import HedgePolicy, PDCHTTPAdapter, RetryPolicy, ThreadLocalSession
 
 GLOBAL_CONFIG_DIR = '/etc/pdc.d/'
 USER_SPECIFIC_CONFIG_FILE = os.path.expanduser('~/.config/pdc/client_config.json')
+TOKEN_CACHE_FILE = os.path.expanduser('~/.cache/pdc/tokens.json')
 # PDC warning field in response header
 PDC_WARNING_HEADER_NAME = 'pdc-warning'
 
+# Maximum length of URLs sent by fetch_many() and the part of it reserved
+# for pagination parameters.
+DEFAULT_MAX_URL_LENGTH = 2048
+RESERVED_URL_LENGTH = 64
+DEFAULT_FETCH_MANY_WORKERS = 4
+
+logger = logging.getLogger(__name__)
+
 
 def server_configuration(server):
     configs = ServerConfigManager(USER_SPECIFIC_CONFIG_FILE, GLOBAL_CONFIG_DIR)
@@ -31,31 +53,52 @@ def server_configuration(server):
 
 
 def get_version():
+    """
+    Return version of the client. This is slow (it runs git in a checkout
+    and looks up installed distributions otherwise), so the result is only
+    computed when ``__version__`` is first needed.
+    """
+    from subprocess import Popen, PIPE
+
     fdir = os.path.dirname(os.path.realpath(__file__))
     if os.path.isdir(os.path.join(fdir, '..', '.git')):
         # running from git, try to get info
-        old_dir = os.getcwd()
-        os.chdir(fdir)
-        git = Popen(["git", "describe", "--tags"], stdout=PIPE)
-        base_ver = git.communicate()[0].strip()
-        git = Popen(["git", "rev-parse", "--short", "HEAD"], stdout=PIPE)
-        hash = git.communicate()[0]
-        os.chdir(old_dir)
+        with open(os.devnull, 'w') as devnull:
+            git = Popen(["git", "describe", "--tags"], stdout=PIPE, stderr=devnull, cwd=fdir)
+            base_ver = git.communicate()[0].strip()
+            git = Popen(["git", "rev-parse", "--short", "HEAD"], stdout=PIPE, stderr=devnull,
+                        cwd=fdir)
+            hash = git.communicate()[0].strip()
         if sys.version_info[0] == 3:
             # Python 3 compatibility
             base_ver = base_ver.decode('utf-8')
             hash = hash.decode('utf-8')
         return base_ver + "-" + hash
-    else:
+    try:
+        from importlib.metadata import version, PackageNotFoundError
+    except ImportError:
         # not running from git, get info from pkg_resources
         import pkg_resources
         try:
             return pkg_resources.get_distribution("pdc_client").version
         except pkg_resources.DistributionNotFound:
             return 'unknown'
+    try:
+        return version("pdc_client")
+    except PackageNotFoundError:
+        return 'unknown'
 
 
-__version__ = get_version()
+if sys.version_info >= (3, 7):
+    def __getattr__(name):
+        # Module level __getattr__ (PEP 562) computes the version on first access.
+        if name == '__version__':
+            global __version__
+            __version__ = get_version()
+            return __version__
+        raise AttributeError("module %r has no attribute %r" % (__name__, name))
+else:
+    __version__ = get_version()
 
 
 def _is_page(response):
@@ -63,6 +106,203 @@ def _is_page(response):
         and set(response.keys()) == set(['count', 'previous', 'results', 'next'])
 
 
+def _print_warning(response):
+    if response.headers.get(PDC_WARNING_HEADER_NAME):
+        sys.stderr.write("PDC warning: %s\n\n" % response.headers.get(PDC_WARNING_HEADER_NAME))
+
+
+def _page_number(url):
+    """
+    Return number of page from ``page`` query parameter of URL or None.
+    """
+    try:
+        return int(parse_qs(urlsplit(url).query)['page'][0])
+    except (KeyError, ValueError):
+        return None
+
+
+def split_fields(fields):
+    """
+    Return list of field names given as a list or a comma separated string.
+    """
+    if isinstance(fields, string_type):
+        fields = fields.split(',')
+    return [field.strip() for field in fields if field.strip()]
+
+
+def _set_projection(kwargs, key=None):
+    """
+    Normalize ``fields`` and ``exclude_fields`` in filters so that each
+    field is sent as a separate query parameter. Projection including only
+    some fields is extended with ``key`` which the caller needs in the
+    results (e.g. to request the next page with keyset pagination).
+    """
+    for name in ('fields', 'exclude_fields'):
+        if kwargs.get(name) is None:
+            kwargs.pop(name, None)
+        else:
+            kwargs[name] = split_fields(kwargs[name])
+    if key and 'fields' in kwargs and key not in kwargs['fields']:
+        kwargs['fields'].append(key)
+
+
+def _chunk_values(key, values, max_length):
+    """
+    Split values into lists which fit into query string of ``max_length``
+    characters when passed as multiple ``key`` parameters. Each value is
+    included at most once; a value which does not fit alone gets its own
+    list.
+    """
+    chunk = []
+    length = 0
+    seen = set()
+    for value in values:
+        if value in seen:
+            continue
+        seen.add(value)
+        value_length = len(urlencode({key: value})) + 1
+        if chunk and length + value_length > max_length:
+            yield chunk
+            chunk = []
+            length = 0
+        chunk.append(value)
+        length += value_length
+    if chunk:
+        yield chunk
+
+
+def _iter_pages(fetch, kwargs, prefetch=None, prefetch_workers=None, fetch_next=None,
+                first=None):
+    """
+    Iterate over responses of all pages of a resource.
+
+    The first page is always retrieved synchronously. Following pages are
+    retrieved by passing ``next`` link of the previous page to
+    ``fetch_next``, so the query built by the server (including a cursor or
+    the filters) is used as is. Page numbers are used only if ``fetch_next``
+    is not given or returns None for a link it cannot follow. Iteration
+    stops after a response which is not a page or which has no next page.
+
+    If ``prefetch`` is a positive number and the pages are numbered (the
+    link contains ``page`` parameter), the number of remaining pages is computed from ``count`` of the first
+    page and the pages are retrieved on a pool of ``prefetch_workers``
+    threads (defaults to ``prefetch``) with at most ``prefetch`` requests in
+    flight. Responses are still yielded in order. If the server reports more
+    pages than expected, the rest is retrieved one by one.
+
+    :param fetch:      callable retrieving single page for given keyword arguments
+    :param kwargs:     filters to be used
+    :param fetch_next: callable retrieving page for given ``next`` link
+    :param first:      already retrieved first page, which is not yielded again
+    """
+    kwargs['page'] = 1
+    if first is None:
+        response = fetch(**kwargs)
+        yield response
+    else:
+        response = first
+    if not _is_page(response) or not response['next']:
+        return
+
+    numbered = fetch_next is None or _page_number(response['next']) == 2
+    if prefetch and prefetch > 0 and response['results'] and numbered:
+        pages = int(math.ceil(float(response['count']) / len(response['results'])))
+        for response in _prefetch_pages(fetch, kwargs, pages, prefetch, prefetch_workers):
+            yield response
+            if not _is_page(response) or not response['next']:
+                return
+        kwargs['page'] = pages
+
+    while True:
+        next_url = response['next']
+        kwargs['page'] = _page_number(next_url) or kwargs['page'] + 1
+        response = fetch_next(next_url) if fetch_next else None
+        if response is None:
+            response = fetch(**kwargs)
+        yield response
+        if not _is_page(response) or not response['next']:
+            break
+
+
+def _iter_keyset_pages(fetch, kwargs, key, fallback, first=None):
+    """
+    Iterate over responses of all pages of a resource ordered by unique
+    ``key``. Instead of page number, each page after the first one is
+    requested with filter ``<key>__gt`` set to the key of the last object
+    of the previous page, so the server does not have to skip the objects
+    of all previous pages.
+
+    If the first page is not ordered by the key or the server ignores or
+    rejects (with status 400) the filter, the remaining pages are yielded
+    from ``fallback``, a callable
+    which gets the filters and the first page. The ``first`` page can be
+    passed if it was already retrieved.
+    """
+    kwargs = dict(kwargs, ordering=key)
+    response = fetch(**kwargs) if first is None else first
+    yield response
+    if not _is_page(response) or not response['next']:
+        return
+
+    first = response
+    keys = [obj.get(key) for obj in first['results']]
+    if not keys or None in keys or keys != sorted(keys):
+        for response in fallback(kwargs, first):
+            yield response
+        return
+
+    while response['next'] and response['results']:
+        last = response['results'][-1][key]
+        try:
+            response = fetch(**dict(kwargs, **{key + '__gt': last}))
+        except BeanBagException as e:
+            if first is None or e.response is None or e.response.status_code != 400:
+                raise
+            response = None
+        if first is not None:
+            # Check that the filter is supported by the first page retrieved with it.
+            keys = [obj.get(key) for obj in response['results']] if _is_page(response) else []
+            if not keys or keys[0] is None or keys[0] <= last:
+                for response in fallback(kwargs, first):
+                    yield response
+                return
+            first = None
+        yield response
+        if not _is_page(response):
+            return
+
+
+def _text(value):
+    return value if isinstance(value, string_type) else str(value)
+
+
+def _object_key(obj):
+    if isinstance(obj, dict) and 'id' in obj:
+        return obj['id']
+    return json.dumps(obj, sort_keys=True)
+
+
+def _prefetch_pages(fetch, kwargs, pages, depth, workers=None):
+    """
+    Retrieve pages 2 to ``pages`` concurrently and yield the responses in
+    order. At most ``depth`` responses are requested or buffered at once.
+    """
+    # Imported here so that the pool machinery is loaded only when needed.
+    from multiprocessing.pool import ThreadPool
+
+    pool = ThreadPool(workers or depth)
+    pending = deque()
+    page = 2
+    try:
+        while page <= pages or pending:
+            while page <= pages and len(pending) < depth:
+                pending.append(pool.apply_async(fetch, (), dict(kwargs, page=page)))
+                page += 1
+            yield pending.popleft().get()
+    finally:
+        pool.terminate()
+
+
 class NoResultsError(Exception):
     """ Exception for getting all pages of data
         Raise this NoResultsError if there is an unexpected data
@@ -110,7 +350,16 @@ class PDCClient(object):
     This class wraps general BeanBag.v1 objects, but provides easy-to-use
     interface that can use configuration files for specifying server
     connections. The authentication token is automatically retrieved (if
-    needed).
+    needed) and stored in a cache file for later use by the same Kerberos
+    principal (see :class:`pdc_client.token_cache.TokenCache`).
+
+    A client can be used from multiple threads at once, as its own thread
+    pools retrieving pages do: each thread sends requests through its own
+    session (see :class:`pdc_client.transport.ThreadLocalSession`) sharing
+    the connection pool, and all other state shared by the threads (caches,
+    statistics, rate limiter) is guarded by locks. Each call of
+    ``results()`` and ``get_paged()`` returns an object with its own state;
+    it must not be used by multiple threads at once.
 
     ::
 
@@ -131,8 +380,26 @@ class PDCClient(object):
                 ...
         except NoResultsError as e:
             # handle e.response ...
+
+        # Example: Iterate all pages of rpms, fetching up to 4 pages ahead
+        client = PDCClient(<server>, prefetch=4)
+        for r in client["rpms"].results():
+            ...
+
+        # Example: Get details of releases from a thread pool
+        client = PDCClient(<server>)
+        with ThreadPoolExecutor(8) as executor:
+            releases = list(executor.map(lambda r: client.releases[r](), release_ids))
+
+        # Example: Print latency of requests sent so far per resource
+        client.stats.print_summary(sys.stderr)
     """
-    def __init__(self, server, token=None, develop=None, ssl_verify=None, page_size=None):
+    def __init__(self, server, token=None, develop=None, ssl_verify=None, page_size=None,
+                 prefetch=None, prefetch_workers=None, auth_strategy=None,
+                 cache_dir=None, cache_size=None, detail_cache_ttl=None, detail_cache_size=None,
+                 pool_connections=None, pool_maxsize=None, connect_timeout=None, read_timeout=None,
+                 max_retries=None, retry=None, rate_limit=None, max_in_flight=None,
+                 coalesce=True, hedge=None, stats_records=None):
         """
         Create new pdc client instance.
 
@@ -149,13 +416,66 @@ class PDCClient(object):
         :param page_size:  This is a number of data which is returned per page.
                            A -1 means that pdc server will return all the data in
                            one request.
+        :param prefetch:   Number of pages to retrieve ahead when iterating
+                           over all pages with ``get_paged`` or ``results``.
+                           Pages are then requested concurrently. None or 0
+                           means that pages are retrieved one by one.
+        :param prefetch_workers: Number of threads retrieving pages ahead;
+                           defaults to ``prefetch``.
+        :param auth_strategy: Instance of :class:`pdc_client.auth.AuthStrategy`;
+                           defaults to obtaining token with Kerberos.
+        :param cache_dir:  Directory for caching GET responses, which are then
+                           revalidated with conditional requests (see
+                           :mod:`pdc_client.http_cache`); no caching by default
+        :param cache_size: Maximum size of the cache directory in bytes
+        :param detail_cache_ttl: Number of seconds to keep responses for object
+                           details (``resource/<id>/``) in memory. Modifying
+                           requests made through the client drop the affected
+                           responses. No caching by default.
+        :param detail_cache_size: Maximum number of responses kept in memory
+        :param pool_connections: Number of cached connection pools
+        :param pool_maxsize: Maximum number of connections kept alive per host;
+                           defaults to 10 or more if more pages are prefetched
+        :param connect_timeout: Seconds to wait for connecting to the server;
+                           no limit by default
+        :param read_timeout: Seconds to wait for data from the server; no limit
+                           by default
+        :param max_retries: Number of retries of failed connection attempts
+        :param retry:      Instance of :class:`pdc_client.transport.RetryPolicy`
+                           or dict with its options for retrying idempotent
+                           requests failed with a temporary error; False
+                           disables retrying. Defaults to
+                           ``RetryPolicy()``.
+        :param rate_limit: Maximum number of requests per second sent by
+                           this client from all threads; no limit by default
+        :param max_in_flight: Maximum number of requests waiting for
+                           response at once; no limit by default
+        :param coalesce:   If True, GET requests for the same URL and query
+                           sent from multiple threads at the same time are
+                           sent only once and all the threads get the
+                           decoded response. Their number is counted in
+                           ``single_flight.coalesced``.
+        :param hedge:      Instance of :class:`pdc_client.transport.HedgePolicy`,
+                           dict with its options or number of seconds after
+                           which a duplicate of a GET request without
+                           response is sent; no hedging by default. Hedges
+                           are counted in ``stats`` and in ``hedge_stats``
+                           of the adapter.
+        :param stats_records: Number of last requests kept in
+                           ``stats.records``; 1000 by default, -1 keeps all
+                           of them. Totals in ``stats.summary()`` include
+                           all requests.
 
         :raises pdc_client.config.ServerConfigError: on an configuration error
         """
         self.page_size = page_size
+        self.prefetch = prefetch
+        self.prefetch_workers = prefetch_workers
+        # Pairs of resource URL and key which cannot be used for keyset pagination.
+        self._keyset_unsupported = set()
         if not server:
             raise TypeError('Server must be specified')
-        self.session = requests.Session()
+        self.session = ThreadLocalSession()
 
         config = server_configuration(server)
         url = config.url
@@ -167,48 +487,160 @@ class PDCClient(object):
             develop = config.is_development
         if token is None:
             token = config.token
+        if cache_dir is None:
+            cache_dir = config.cache_dir
+        if cache_size is None:
+            cache_size = config.cache_size
+        if pool_connections is None:
+            pool_connections = config.pool_connections
+        if pool_maxsize is None:
+            pool_maxsize = config.pool_maxsize
+        if pool_maxsize is None and (prefetch_workers or prefetch):
+            # Keep a connection for each thread retrieving pages.
+            pool_maxsize = max(DEFAULT_POOLSIZE, prefetch_workers or prefetch)
+        if connect_timeout is None:
+            connect_timeout = config.connect_timeout
+        if read_timeout is None:
+            read_timeout = config.read_timeout
+        if max_retries is None:
+            max_retries = config.max_retries
+        if retry is None:
+            retry = config.retry
+        if retry is None or retry is True:
+            retry = RetryPolicy()
+        elif isinstance(retry, dict):
+            retry = RetryPolicy.from_config(retry)
+        if rate_limit is None:
+            rate_limit = config.rate_limit
+        if max_in_flight is None:
+            max_in_flight = config.max_in_flight
+        if hedge is None:
+            hedge = config.hedge
+        if hedge not in (None, False) and not isinstance(hedge, HedgePolicy):
+            hedge = HedgePolicy.from_config(hedge)
 
         self.session.verify = ssl_verify
-
-        if not develop:
-            # For local environment, we don't need to require a token,
-            # just access API directly.
-            # REQUIRED, OPTIONAL, DISABLED
-            self.session.auth = requests_kerberos.HTTPKerberosAuth(
-                mutual_authentication=requests_kerberos.DISABLED)
-
-        def decode(req):
-            if req.headers.get(PDC_WARNING_HEADER_NAME):
-                sys.stderr.write("PDC warning: %s\n\n" % req.headers.get(PDC_WARNING_HEADER_NAME))
-            return req.json()
+        if stats_records is None:
+            stats_records = DEFAULT_MAX_RECORDS
+        self.stats = RequestStats(url, max_records=None if stats_records < 0 else stats_records,
+                                  latency_window=hedge.window if hedge else DEFAULT_LATENCY_WINDOW)
+        self.rate_limiter = None
+        if rate_limit or max_in_flight:
+            self.rate_limiter = RateLimiter(rate_limit, max_in_flight=max_in_flight)
+        adapter_kwargs = dict(pool_connections=pool_connections, pool_maxsize=pool_maxsize,
+                              max_retries=max_retries, connect_timeout=connect_timeout,
+                              read_timeout=read_timeout, retry_policy=retry or None,
+                              rate_limiter=self.rate_limiter, stats=self.stats,
+                              hedge_policy=hedge or None)
+        if cache_dir:
+            adapter = CachingHTTPAdapter(HTTPCache(cache_dir, cache_size), **adapter_kwargs)
+        else:
+            adapter = PDCHTTPAdapter(**adapter_kwargs)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.auth_strategy = auth_strategy or KerberosAuthStrategy()
 
         content_type = "application/json"
         encode = json.dumps
-        self.client = _BeanBagWrapper(BeanBag(url, session=self.session, fmt=(content_type, encode, decode)),
-                                      page_size)
+        self.detail_cache = None
+        if detail_cache_ttl:
+            self.detail_cache = DetailCache(url, detail_cache_ttl, detail_cache_size)
+        self.single_flight = SingleFlight() if coalesce else None
+        self.client = _BeanBagWrapper(BeanBag(url, session=self.session, fmt=(content_type, encode, self._decode)),
+                                      self)
+        self.url = url
+        self.token_cache = None
+        self._token_from_cache = False
+        self._cached_token = None
+        # Reentrant, since the hook also gets the response obtaining the token.
+        self._token_lock = threading.RLock()
         if not develop:
             # For develop environment, we don't need to require a token
             if not token:
-                token = self.obtain_token()
-            self.session.headers["Authorization"] = "Token %s" % token
+                self.principal = current_principal()
+                if self.principal:
+                    # Tokens are cached only for a known Kerberos principal.
+                    self.token_cache = TokenCache(TOKEN_CACHE_FILE)
+                    token = self.token_cache.get(url, self.principal).get('token')
+                if token:
+                    self._token_from_cache = True
+                    self._cached_token = token
+                    self.session.hooks['response'].append(self._reobtain_token)
+                else:
+                    token = self.obtain_token()
+            # Only the token is sent from now on, the authentication used to
+            # obtain it is not needed anymore.
+            self.session.auth = self.auth_strategy.request_auth(token)
+        self.token = token
 
     def obtain_token(self):
         """
         Try to obtain token from all end-points that were ever used to serve the
         token. If the request returns 404 NOT FOUND, retry with older version of
         the URL.
+
+        The request is authenticated only as defined by ``token_auth()`` of the
+        authentication strategy.
+
+        If the token cache is used, the obtained token is stored there together
+        with the end-point, which is then tried first next time.
         """
-        token_end_points = ('token/obtain',
+        token_end_points = ['token/obtain',
                             'obtain-token',
-                            'obtain_token')
+                            'obtain_token']
+        if self.token_cache:
+            cached_end_point = self.token_cache.get(self.url, self.principal).get('end_point')
+            if cached_end_point in token_end_points:
+                token_end_points.remove(cached_end_point)
+                token_end_points.insert(0, cached_end_point)
+
+        # Requests falls back to session authentication if None is given, but
+        # the current token must not be sent.
+        auth = self.auth_strategy.token_auth() or (lambda request: request)
         for end_point in token_end_points:
-            try:
-                return self.auth[end_point]._(page_size=None)['token']
-            except BeanBagException as e:
-                if e.response.status_code != 404:
-                    raise
+            response = self.session.get(str(self.auth[end_point]._), auth=auth)
+            if response.status_code == 404:
+                continue
+            if response.status_code != 200:
+                raise BeanBagException(response, "Bad response code: %d" % response.status_code)
+            token = response.json()['token']
+            if self.token_cache:
+                self.token_cache.update(self.url, self.principal, token=token, end_point=end_point)
+            return token
         raise Exception('Could not obtain token from any known URL.')
 
+    def _reobtain_token(self, response, **kwargs):
+        """
+        Response hook obtaining new token if the server rejects the cached
+        one. The rejected request is then sent again with the new token,
+        also if the token was already replaced by another thread.
+        """
+        if response.status_code != 401:
+            return response
+
+        with self._token_lock:
+            if self._token_from_cache and self._sent_with_token(response.request, self.token):
+                self._token_from_cache = False
+                self.token = self.obtain_token()
+                self.session.auth = self.auth_strategy.request_auth(self.token)
+            elif self.token == self._cached_token or not self._sent_with_token(response.request, self._cached_token):
+                return response
+            auth = self.session.auth
+
+        # Consume content and release the original connection to allow it to
+        # be reused.
+        response.content
+        response.raw.release_conn()
+
+        request = auth(response.request.copy())
+        new_response = self.session.send(request, **kwargs)
+        new_response.history.append(response)
+        return new_response
+
+    def _sent_with_token(self, request, token):
+        auth = self.auth_strategy.request_auth(token)
+        return auth is not None and auth(request.copy()).headers == request.headers
+
     def get_paged(self, res, **kwargs):
         """
         This call is equivalent to ``res(**kwargs)``, only it retrieves all pages
@@ -224,25 +656,292 @@ class PDCClient(object):
             for release in client.get_paged(client['releases']._, active=True):
                 ...
 
+        If the client was created with ``page_size`` -1, all objects are
+        requested at once and decoded one by one as the response is received.
+
+        Use ``fields`` or ``exclude_fields`` (list or comma separated string)
+        to retrieve only some fields of the objects.
+
         This function is obsolete and not recommended.
         """
+        _set_projection(kwargs)
         if self.page_size is not None:
             kwargs['page_size'] = self.page_size
             if self.page_size <= 0:
                 # If page_size <= 0, pagination will be disable.
-                return res(**kwargs)
+                return self._stream_results(res, kwargs)
+
+        return self._iter_results(res, kwargs)
+
+    def count(self, res, **filters):
+        """
+        Return number of objects of resource ``res`` matching ``filters``.
+        Only a single object is requested, the number is read from the
+        ``count`` of the page.
+
+        ::
+
+            # Example: Count RPMs of a package
+            count = client.count(client['rpms']._, name='bash')
+        """
+        return self._first_page(res, filters)['count']
+
+    def exists(self, res, **filters):
+        """
+        Return True if any object of resource ``res`` matches ``filters``.
+        """
+        return self.count(res, **filters) > 0
+
+    def first(self, res, **filters):
+        """
+        Return the first object of resource ``res`` matching ``filters`` or
+        None if there is no such object. This is useful for looking up an
+        object by unique fields other than the primary key.
+
+        ::
+
+            # Example: Get ID of a global component
+            component = client.first(client['global-components']._, name='bash')
+        """
+        return self.count_and_first(res, **filters)[1]
+
+    def count_and_first(self, res, **filters):
+        """
+        Return tuple with number of objects of resource ``res`` matching
+        ``filters`` and the first of them (None if there is no such object).
+        Both are read from a single page with one object, so that the
+        returned object is the one which was counted.
+
+        ::
+
+            # Example: Delete a contact only if it is the only match
+            count, contact = client.count_and_first(client['global-component-contacts']._, role='pm')
+            if count == 1:
+                client['global-component-contacts'][contact['id']]._("DELETE", {})
+        """
+        page = self._first_page(res, filters)
+        return page['count'], page['results'][0] if page['results'] else None
+
+    def fetch_many(self, resource, key, values, max_url_length=None, workers=None, **filters):
+        """
+        Retrieve all objects of a resource with ``key`` matching any of
+        ``values``. Instead of a request per value, values are sent in
+        chunks as repeated query parameters (``name=a&name=b...``), keeping
+        URLs shorter than ``max_url_length`` (defaults to
+        ``DEFAULT_MAX_URL_LENGTH``). Chunks are retrieved concurrently by
+        ``workers`` threads (defaults to ``prefetch_workers``, ``prefetch``
+        or ``DEFAULT_FETCH_MANY_WORKERS``).
+
+        Return an iterator of pairs of the value and an object, in the order
+        the chunks are retrieved. The value is the one equal to the
+        ``key`` field of the object, or None if the object has no such
+        field (e.g. for filters by nested fields). Each object is returned
+        only once even if it matches several values.
+
+        :param resource:  resource name, e.g. ``'rpms'``
+        :param key:       name of the filter, e.g. ``'name'``
+        :param values:    values of the filter
+        :param filters:   other filters to be used for each request
+
+        ::
+
+            # Example: Get global components by name
+            names = ['bash', 'python', ...]
+            for name, component in client.fetch_many('global-components', 'name', names):
+                ...
+        """
+        _set_projection(filters, key)
+        base_length = len(str(self[resource]._)) + 1 + len(urlencode(filters, True)) \
+            + RESERVED_URL_LENGTH
+        max_length = (max_url_length or DEFAULT_MAX_URL_LENGTH) - base_length
+        chunks = list(_chunk_values(key, values, max_length))
+        workers = workers or self.prefetch_workers or self.prefetch or DEFAULT_FETCH_MANY_WORKERS
+
+        def fetch(chunk):
+            results = self[resource].results(**dict(filters, **{key: chunk}))
+            return chunk, list(results)
+
+        def worker():
+            # Imported here so that the pool machinery is loaded only when needed.
+            from multiprocessing.pool import ThreadPool
+
+            pool = ThreadPool(min(workers, len(chunks)))
+            seen = set()
+            try:
+                for chunk, results in pool.imap_unordered(fetch, chunks):
+                    requested = dict((_text(value), value) for value in chunk)
+                    for obj in results:
+                        obj_key = _object_key(obj)
+                        if obj_key in seen:
+                            continue
+                        seen.add(obj_key)
+                        yield requested.get(_text(obj.get(key))), obj
+            finally:
+                pool.terminate()
+
+        return worker() if chunks else iter([])
+
+    def _first_page(self, res, filters):
+        response = res(**dict(filters, page_size=1))
+        if not _is_page(response):
+            raise NoResultsError(response)
+        return response
+
+    def _get(self, res, kwargs):
+        """
+        Send GET request to ``res`` with query ``kwargs`` and return decoded
+        response. The response is taken from detail cache if possible and
+        shared with identical requests sent concurrently.
+        """
+        url = str(res)
+        detail_cache = self.detail_cache
+        if detail_cache is not None:
+            response = detail_cache.get(url, kwargs)
+            if response is not None:
+                return response
+
+        def get():
+            response = res(**kwargs)
+            if detail_cache is not None and not _is_page(response):
+                detail_cache.set(url, kwargs, response)
+            return response
+
+        return self._coalesce(url, kwargs, get)
+
+    def _coalesce(self, url, kwargs, get):
+        """
+        Call ``get`` to retrieve ``url`` with query ``kwargs``, sharing the
+        result with identical requests sent concurrently.
+        """
+        if self.single_flight is None:
+            return get()
+        return self.single_flight.do(SingleFlight.key('GET', url, kwargs), get)
+
+    def _decode(self, response):
+        _print_warning(response)
+        data = response.json()
+        if _is_page(data) and hasattr(response, 'stats_entry'):
+            self.stats.add_page(response.stats_entry)
+        return data
+
+    def _decode_response(self, response):
+        """
+        Return decoded body of a response received through ``session``.
+        Responses are checked the same way BeanBag checks them.
+
+        :raises beanbag.BeanBagException: on an unexpected response
+        """
+        if response.status_code < 200 or response.status_code >= 300:
+            raise BeanBagException(response, "Bad response code: %d" % response.status_code)
+        if not response.content:
+            return None
+        content_type = response.headers.get('content-type', 'application/json').split(';', 1)[0]
+        if content_type != 'application/json':
+            raise BeanBagException(response, "Bad content-type in response (Content-Type: %s)"
+                                   % content_type)
+        try:
+            return self._decode(response)
+        except ValueError:
+            raise BeanBagException(response, "Could not decode response")
+
+    def _stream_results(self, res, kwargs):
+        """
+        Retrieve all objects of resource ``res`` in a single response and
+        return an iterator which decodes them one by one as the response is
+        received (see :mod:`pdc_client.streaming`), so that neither the
+        whole response nor all the objects are kept in memory.
+
+        If the server returns a page instead of all objects, the remaining
+        pages are retrieved as usual.
+
+        :raises beanbag.BeanBagException: on an unexpected response
+        :raises NoResultsError: if the response is neither a list nor a page
+        """
+        if not isinstance(res, (BeanBag, _BeanBagWrapper)):
+            return res(**kwargs)
+
+        response = self.session.get(str(res), params=kwargs, stream=True)
+        if response.status_code < 200 or response.status_code >= 300:
+            raise BeanBagException(response, "Bad response code: %d" % response.status_code)
+        _print_warning(response)
+        try:
+            data = decode_stream(response.iter_content(CHUNK_SIZE), response.encoding or 'utf-8')
+        except ValueError:
+            raise BeanBagException(response, "Could not decode response")
+
+        if _is_page(data):
+            return self._iter_results(res, kwargs, first=data)
+        if isinstance(data, (dict, list)) or data is None:
+            raise NoResultsError(data)
 
         def worker():
-            kwargs['page'] = 1
-            while True:
-                response = res(**kwargs)
-                yield response['results']
-                if response['next']:
-                    kwargs['page'] += 1
+            try:
+                for obj in data:
+                    yield obj
+            except ValueError:
+                raise BeanBagException(response, "Could not decode response")
+            finally:
+                response.close()
+
+        return worker()
+
+    def _iter_results(self, fetch, kwargs, keyset=None, resource=None, first=None):
+        """
+        Return an iterator over results of all pages retrieved by ``fetch``
+        with given filters. This is shared by ``get_paged`` and ``results``.
+
+        If ``keyset`` is given, pages are retrieved by the key of the last
+        object of previous page (see :func:`_iter_keyset_pages`), unless the
+        ``resource`` is known not to support it. If the ``first`` page was
+        already retrieved, only the following pages are requested.
+
+        :raises NoResultsError: if a response is neither a page nor a list
+        """
+        def fallback(kwargs, first):
+            logger.info('Keyset pagination by %s is not supported by %s, using page numbers',
+                        keyset, resource)
+            self._keyset_unsupported.add((resource, keyset))
+            return _iter_pages(fetch, kwargs, self.prefetch, self.prefetch_workers,
+                               self._fetch_next, first=first)
+
+        if keyset and (resource, keyset) not in self._keyset_unsupported:
+            pages = _iter_keyset_pages(fetch, kwargs, keyset, fallback, first=first)
+        else:
+            pages = _iter_pages(fetch, kwargs, self.prefetch, self.prefetch_workers,
+                                self._fetch_next, first=first)
+            if first is not None:
+                pages = itertools.chain([first], pages)
+
+        def worker():
+            for response in pages:
+                if isinstance(response, list):
+                    yield response
+                elif _is_page(response):
+                    yield response['results']
                 else:
-                    break
+                    raise NoResultsError(response)
+
         return itertools.chain.from_iterable(worker())
 
+    def _fetch_next(self, url):
+        """
+        Retrieve page from ``next`` link of previous page. Path and query of
+        the link are used as is, relative to the API root of the client
+        (server may not know the name it is accessed by). Return None if the
+        link does not point below the API root.
+
+        Like other GET requests, identical requests sent concurrently are
+        coalesced.
+        """
+        root_path = urlsplit(self.url).path.rstrip('/') + '/'
+        parts = urlsplit(url)
+        if not parts.path.startswith(root_path):
+            return None
+        url = self.url.rstrip('/') + '/' + parts.path[len(root_path):]
+        if parts.query:
+            url += '?' + parts.query
+        return self._coalesce(url, {}, lambda: self._decode_response(self.session.get(url)))
+
     def __call__(self, *args, **kwargs):
         return self.client(*args, **kwargs)
 
@@ -282,44 +981,72 @@ class PDCClient(object):
         :param comment:     what comment to send to the server
         :paramtype comment: string
         """
-        self.session.headers["PDC-Change-Comment"] = comment
+        # Replace the headers so that requests sent from other threads at
+        # the same time see either old or new headers.
+        headers = requests.structures.CaseInsensitiveDict(self.session.headers)
+        headers["PDC-Change-Comment"] = comment
+        self.session.headers = headers
 
 
 class _BeanBagWrapper(_SetAttributeWrapper):
     """
        Wrapper of BeanBag's attributes and items.
 
-       This class wraps attributes and items of Beanbag to let page_size of
-       PDCClient's constructor work.
+       This class wraps attributes and items of Beanbag to let options of
+       PDCClient's constructor (page size, prefetching, detail cache) work.
     """
 
-    def __init__(self, client, page_size):
+    def __init__(self, client, pdc):
         self.client = client
-        self.page_size = page_size
+        self.pdc = pdc
 
         self._initialized = True
 
+    def _invalidate(self, name=None):
+        """
+        Drop cached details of this resource, or of its item ``name``, after
+        it was modified.
+        """
+        if self.pdc.detail_cache is not None:
+            url = str(self.client)
+            if name is not None:
+                url = url.rstrip('/') + '/' + str(name)
+            self.pdc.detail_cache.invalidate(url)
+
     def __call__(self, *args, **kwargs):
         if 'page_size' not in kwargs:
-            kwargs['page_size'] = self.page_size
-        return self.client(*args, **kwargs)
+            kwargs['page_size'] = self.pdc.page_size
+        if args:
+            # Request with body (POST, PATCH, ...) may modify the resource.
+            self._invalidate()
+            return self.client(*args, **kwargs)
+        return self.pdc._get(self.client, kwargs)
 
     def __getattr__(self, name):
-        return _BeanBagWrapper(self.client.__getattr__(name), self.page_size)
+        return _BeanBagWrapper(self.client.__getattr__(name), self.pdc)
+
+    def __setattr__(self, name, value):
+        if self._initialized:
+            self._invalidate(name)
+        return super(_BeanBagWrapper, self).__setattr__(name, value)
 
     def __delattr__(self, name):
+        self._invalidate(name)
         return self.client.__delattr__(name)
 
     def __getitem__(self, *args, **kwargs):
-        return _BeanBagWrapper(self.client.__getitem__(*args, **kwargs), self.page_size)
+        return _BeanBagWrapper(self.client.__getitem__(*args, **kwargs), self.pdc)
 
     def __setitem__(self, name, value):
+        self._invalidate(name)
         return self.client.__setitem__(name, value)
 
     def __delitem__(self, name):
+        self._invalidate(name)
         return self.client.__delitem__(name)
 
     def __iadd__(self, value):
+        self._invalidate()
         return self.client.__iadd__(value)
 
     def __eq__(self, other):
@@ -330,39 +1057,222 @@ class _BeanBagWrapper(_SetAttributeWrapper):
 
     def results(self, *args, **kwargs):
         """
-           Return an iterator with all pages of data.
+           Return a :class:`ResultSet` with all pages of data. Besides
+           iterating, it supports ``len()``, indexing and slicing, which
+           retrieve only the pages needed.
            Return NoResultsError with response if there is unexpected data.
+
+           If the client was created with ``prefetch``, the following pages
+           are retrieved concurrently ahead of the consumer.
+
+           With ``page_size=-1``, all objects are requested at once. When
+           iterating, they are decoded one by one as the response is
+           received; ``len()``, indexing and slicing decode the whole
+           response.
+
+           With ``keyset='id'`` (or other unique key), objects are ordered
+           by the key and each page is requested with filter ``id__gt`` set
+           to the last key instead of page number, so retrieving deep pages
+           is as fast as the first ones. Resources which do not support
+           ordering or filtering by the key are iterated by page numbers.
+
+           With ``fields`` or ``exclude_fields`` (list or comma separated
+           string), the server returns only some fields of the objects.
+
+           ::
+
+               # Example: Export all RPMs
+               for rpm in client.rpms.results(keyset='id'):
+                   ...
+
+               # Example: List names of RPMs
+               for rpm in client.rpms.results(fields=['id', 'name']):
+                   ...
         """
+        keyset = kwargs.pop('keyset', None)
+        _set_projection(kwargs, keyset)
+
+        def fetch(**kwargs):
+            if args:
+                return self.client(*args, **kwargs)
+            return self.pdc._get(self.client, kwargs)
+
+        def stream():
+            return self.pdc._stream_results(self.client, dict(kwargs))
+
+        if kwargs.get('page_size') is not None and kwargs['page_size'] <= 0 and not args:
+            return ResultSet(self.pdc, fetch, kwargs, keyset, str(self.client), stream=stream)
+        return ResultSet(self.pdc, fetch, kwargs, keyset, str(self.client))
+
+
+class ResultSet(object):
+    """
+    Lazy sequence of all objects of a resource returned by ``results()``.
+
+    Iterating over the set retrieves all pages in order (see
+    :meth:`_BeanBagWrapper.results`); the set can also be used as an
+    iterator directly, like the generator returned by earlier versions.
+    Other operations retrieve only what they need:
+
+    * ``len()`` retrieves the first page to get the total count (iteration
+      then starts with the same page),
+    * an index or a slice retrieves only the pages it covers.
+
+    Up to ``cache_pages`` pages retrieved by ``len()``, index or slice are
+    kept, least recently used are dropped first, so that repeated access to
+    near objects does not send more requests. Iteration does not add pages
+    to the cache.
+
+    If ``stream`` is given, iteration uses the iterator it returns instead
+    of retrieving pages, unless the first page is already cached. It is used
+    with ``page_size=-1``, for which the only page holds all objects.
+
+    ::
+
+        # Example: Count RPMs and get some of them
+        rpms = client.rpms.results(name='bash')
+        count = len(rpms)
+        first = rpms[0]
+        some = rpms[5000:5050]
+    """
+    DEFAULT_CACHE_PAGES = 8
+
+    def __init__(self, pdc, fetch, kwargs, keyset=None, resource=None, cache_pages=None,
+                 stream=None):
+        self.pdc = pdc
+        self.fetch = fetch
+        self.kwargs = kwargs
+        self.keyset = keyset
+        self.resource = resource
+        self.cache_pages = self.DEFAULT_CACHE_PAGES if cache_pages is None else cache_pages
+        self.pages = OrderedDict()
+        self.count = None
+        self.page_size = kwargs.get('page_size')
+        if self.page_size is not None and self.page_size <= 0:
+            # All objects are on the first page.
+            self.page_size = None
+        self.stream = stream
+        self._iterator = None
+
+    def __iter__(self):
+        if self._iterator is not None:
+            # Used as an iterator before, continue where it stopped.
+            return self._iterator
+
         def worker():
-            kwargs['page'] = 1
-            while True:
-                response = self.client(*args, **kwargs)
-                if isinstance(response, list):
-                    yield response
-                    break
-                elif _is_page(response):
-                    yield response['results']
-                    if response['next']:
-                        kwargs['page'] += 1
-                    else:
-                        break
-                else:
-                    raise NoResultsError(response)
+            # The first page is looked up only when iteration starts, since
+            # list() asks for len() after creating the iterator.
+            if self.stream is not None and 1 not in self.pages:
+                results = self.stream()
+            else:
+                results = self.pdc._iter_results(self.fetch, dict(self.kwargs), self.keyset,
+                                                 self.resource, first=self.pages.get(1))
+            for obj in results:
+                yield obj
+        return worker()
+
+    def __next__(self):
+        if self._iterator is None:
+            self._iterator = iter(self)
+        return next(self._iterator)
+
+    next = __next__
+
+    def __len__(self):
+        if self.count is None:
+            self._page(1)
+        return self.count
+
+    def __bool__(self):
+        return len(self) > 0
+
+    __nonzero__ = __bool__
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step < 0:
+                return [self[i] for i in range(start, stop, step)]
+            if start >= stop:
+                return []
+            return self._slice(start, stop)[::step]
+
+        if index < 0:
+            index += len(self)
+        results = self._slice(index, index + 1) if index >= 0 else []
+        if not results:
+            raise IndexError('ResultSet index out of range')
+        return results[0]
 
-        return itertools.chain.from_iterable(worker())
+    def __repr__(self):
+        return '<%s %s>' % (self.__class__.__name__, self.resource)
+
+    def _slice(self, start, stop):
+        """
+        Return list of objects from index ``start`` to ``stop``.
+        """
+        page_size = self._page_size()
+        first_page = start // page_size + 1
+        results = []
+        for page in range(first_page, (stop - 1) // page_size + 2):
+            page_results = self._page(page)['results']
+            results.extend(page_results)
+            if len(page_results) < page_size:
+                break
+        offset = (first_page - 1) * page_size
+        return results[start - offset:stop - offset]
+
+    def _page_size(self):
+        if self.page_size is None:
+            response = self._page(1)
+            # Either the server default or all objects if there is only one page.
+            self.page_size = max(1, len(response['results']))
+        return self.page_size
+
+    def _page(self, page):
+        """
+        Return response with given page, from the cache if possible.
+        """
+        response = self.pages.pop(page, None)
+        if response is None:
+            kwargs = dict(self.kwargs, page=page)
+            if self.keyset and (self.resource, self.keyset) not in self.pdc._keyset_unsupported:
+                # Keep the order used when iterating.
+                kwargs['ordering'] = self.keyset
+            try:
+                response = self.fetch(**kwargs)
+            except BeanBagException as e:
+                if page == 1 or e.response is None or e.response.status_code != 404:
+                    raise
+                # Page out of range.
+                response = {'count': self.count, 'next': None, 'previous': None, 'results': []}
+            if isinstance(response, list):
+                # Resource without pagination returns all objects at once.
+                response = {'count': len(response), 'next': None, 'previous': None,
+                            'results': response}
+            elif not _is_page(response):
+                raise NoResultsError(response)
+            if response['count'] is not None:
+                self.count = response['count']
+        self.pages[page] = response
+        while len(self.pages) > self.cache_pages:
+            self.pages.popitem(last=False)
+        return response
 
 
 class PDCClientWithPage(PDCClient):
     """
     PDCClient wrapper specialized for setting page in get_paged function.
     """
-    def __init__(self, server, token=None, develop=None, ssl_verify=None, page_size=None, page=None):
+    def __init__(self, server, token=None, develop=None, ssl_verify=None, page_size=None, page=None,
+                 **kwargs):
         """
         Create new client instance with page prarameter.
         Other params are all used for base class.
         :param page:  the page number of the data.
         """
-        super(PDCClientWithPage, self).__init__(server, token, develop, ssl_verify, page_size)
+        super(PDCClientWithPage, self).__init__(server, token, develop, ssl_verify, page_size,
+                                                **kwargs)
         self.page = page
 
     def get_paged(self, res, **kwargs):
@@ -385,24 +1295,16 @@ class PDCClientWithPage(PDCClient):
         If there is a self.page parameter here, just return that page's data with the
         self.page_size.
         """
+        _set_projection(kwargs)
+        if self.page is None:
+            return super(PDCClientWithPage, self).get_paged(res, **kwargs)
+
         if self.page_size is not None:
             kwargs['page_size'] = self.page_size
             if self.page_size <= 0:
                 # If page_size <= 0, pagination will be disable.
                 return res(**kwargs)
 
-        if self.page is not None:
-            kwargs['page'] = self.page
-            allinfo = res(**kwargs)
-            return allinfo['results']
-
-        def worker():
-            kwargs['page'] = 1
-            while True:
-                response = res(**kwargs)
-                yield response['results']
-                if response['next']:
-                    kwargs['page'] += 1
-                else:
-                    break
-        return itertools.chain.from_iterable(worker())
+        kwargs['page'] = self.page
+        allinfo = res(**kwargs)
+        return allinfo['results']
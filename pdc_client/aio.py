@@ -0,0 +1,461 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2018 Red Hat
+# Licensed under The MIT License (MIT)
+# http://opensource.org/licenses/MIT
+#
+"""
+Asynchronous counterpart of :class:`pdc_client.PDCClient`.
+
+This module requires Python 3.7 or newer and the aiohttp package (install
+pdc-client[async]).
+
+::
+
+    from pdc_client.aio import AsyncPDCClient
+
+    async with AsyncPDCClient(<server>) as client:
+        release = await client['releases']['fedora-27']._()
+
+        async for rpm in client['rpms'].results(name='bash'):
+            ...
+
+        releases = await client.get_many('releases', ['fedora-26', 'fedora-27'])
+"""
+
+import asyncio
+import collections
+import functools
+import json
+import os
+import ssl
+import sys
+
+import aiohttp
+from beanbag import BeanBagException
+
+from pdc_client import (PDC_WARNING_HEADER_NAME, NoResultsError, PDCClient,
+                        _is_page, server_configuration)
+
+CONTENT_TYPE = 'application/json'
+
+
+def _obtain_token(server, ssl_verify):
+    """
+    Obtain token using the synchronous client which also handles Kerberos
+    authentication.
+    """
+    return PDCClient(server, develop=False, ssl_verify=ssl_verify).token
+
+
+def _ssl_context(ssl_verify):
+    if ssl_verify is True:
+        return True
+    if not ssl_verify:
+        return False
+    if os.path.isdir(ssl_verify):
+        return ssl.create_default_context(capath=ssl_verify)
+    return ssl.create_default_context(cafile=ssl_verify)
+
+
+def _query(params):
+    """
+    Convert request parameters to a list of pairs the same way requests
+    library does it: None values are dropped and lists are expanded.
+    """
+    query = []
+    for key, value in sorted(params.items()):
+        values = value if isinstance(value, (list, tuple)) else [value]
+        for item in values:
+            if item is not None:
+                query.append((key, str(item)))
+    return query
+
+
+def _join(path, el):
+    """Join resource path with an element the same way BeanBag does."""
+    el = str(el).lstrip('/')
+    if path == '':
+        return el
+    return path.rstrip('/') + '/' + el
+
+
+class AsyncResponse(object):
+    """
+    Read response of a finished request.
+
+    It provides the subset of ``requests.Response`` interface which is
+    commonly used with :class:`beanbag.BeanBagException`.
+    """
+    def __init__(self, response, content):
+        self.status_code = response.status
+        self.reason = response.reason
+        self.headers = response.headers
+        self.url = str(response.url)
+        self.content = content
+
+    @property
+    def text(self):
+        return self.content.decode('utf-8')
+
+    def json(self):
+        return json.loads(self.text)
+
+
+class AsyncPDCClient(object):
+    """
+    Asynchronous PDC client.
+
+    The resources are accessed the same way as with :class:`PDCClient`, only
+    the calls return awaitables.
+
+    ::
+
+        # Example: Get per page of release
+        await client.releases._()
+        await client["releases"]._()
+
+        # Example: create one release data
+        await client["releases"]._(<dict data>)
+
+        # Example: update a release
+        release = client["releases"][<release_id>]._
+        release += <dict data>
+        await release
+
+        # Example: Iterate all pages of releases
+        async for r in client["releases"].results():
+            ...
+
+    Assignment and deletion of resources cannot be awaited, use the generic
+    form of the call instead, e.g. ``await client["releases"][id]._("PUT", data)``
+    or ``await client["releases"][id]._("DELETE", None)``.
+    """
+    def __init__(self, server, token=None, develop=None, ssl_verify=None, page_size=None,
+                 prefetch=None, limit=None):
+        """
+        Create new asynchronous pdc client instance.
+
+        The connection to server is opened with the first request. Close the
+        client with :meth:`close` or use it as an asynchronous context manager.
+
+        :param server:     Server API url or server name from configuration
+        :param token:      An authentication token string of visiting pdc server
+        :param develop:    This is use for dev mode
+        :param ssl_verify: True for validating SSL certificates with system CA
+                           store; False for no validation; path to CA file or
+                           directory to use for validation otherwise
+        :param page_size:  This is a number of data which is returned per page.
+                           A -1 means that pdc server will return all the data in
+                           one request.
+        :param prefetch:   Number of pages requested ahead when iterating over
+                           ``results()``.
+        :param limit:      Maximum number of concurrent connections and default
+                           limit for :meth:`gather`.
+
+        :raises pdc_client.config.ServerConfigError: on an configuration error
+        """
+        if not server:
+            raise TypeError('Server must be specified')
+
+        config = server_configuration(server)
+
+        # Command line must *always* override configuration
+        if ssl_verify is None:
+            ssl_verify = config.ssl_verify
+        if develop is None:
+            develop = config.is_development
+        if token is None:
+            token = config.token
+
+        self.server = server
+        self.url = config.url.rstrip('/') + '/'
+        self.token = token
+        self.develop = develop
+        self.ssl_verify = ssl_verify
+        self.page_size = page_size
+        self.prefetch = prefetch
+        self.limit = limit
+        self.headers = {
+            'Accept': CONTENT_TYPE,
+            'Content-Type': CONTENT_TYPE,
+        }
+        self.session = None
+        self._session_lock = None
+
+    async def __aenter__(self):
+        await self._get_session()
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    async def close(self):
+        """Close the connection to the server."""
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    async def obtain_token(self):
+        """
+        Obtain token in a thread using :meth:`PDCClient.obtain_token`.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            None, functools.partial(_obtain_token, self.server, self.ssl_verify))
+
+    async def _get_session(self):
+        if self.session is not None:
+            return self.session
+
+        if self._session_lock is None:
+            self._session_lock = asyncio.Lock()
+
+        async with self._session_lock:
+            if self.session is None:
+                if not self.develop:
+                    # For develop environment, we don't need to require a token
+                    if not self.token:
+                        self.token = await self.obtain_token()
+                    self.headers['Authorization'] = 'Token %s' % self.token
+                connector = aiohttp.TCPConnector(
+                    ssl=_ssl_context(self.ssl_verify), limit=self.limit or 100)
+                self.session = aiohttp.ClientSession(connector=connector)
+        return self.session
+
+    async def request(self, verb, path, params=None, body=None):
+        """
+        Send request to a resource path relative to API root and return the
+        decoded response.
+
+        :raises beanbag.BeanBagException: on an unexpected response
+        """
+        session = await self._get_session()
+        data = None if body is None else json.dumps(body)
+
+        async with session.request(verb, self.url + path, params=_query(params or {}),
+                                   data=data, headers=self.headers) as r:
+            content = await r.read()
+        response = AsyncResponse(r, content)
+
+        if response.status_code < 200 or response.status_code >= 300:
+            raise BeanBagException(response, "Bad response code: %d" % response.status_code)
+
+        if not content:
+            return None
+
+        ctype = response.headers.get('content-type', CONTENT_TYPE).split(';', 1)[0]
+        if ctype != CONTENT_TYPE:
+            raise BeanBagException(response, "Bad content-type in response (Content-Type: %s)"
+                                   % response.headers['content-type'])
+
+        if response.headers.get(PDC_WARNING_HEADER_NAME):
+            sys.stderr.write("PDC warning: %s\n\n" % response.headers.get(PDC_WARNING_HEADER_NAME))
+
+        try:
+            return response.json()
+        except ValueError:
+            raise BeanBagException(response, "Could not decode response")
+
+    async def gather(self, *aws, limit=None):
+        """
+        Await given requests concurrently and return list of results in the
+        same order. At most ``limit`` (defaults to ``limit`` passed to the
+        constructor) requests are awaited at the same time.
+
+        ::
+
+            # Example: Get two releases at once
+            f26, f27 = await client.gather(client.releases['fedora-26']._(),
+                                           client.releases['fedora-27']._())
+        """
+        limit = limit or self.limit
+        if not limit:
+            return await asyncio.gather(*aws)
+
+        semaphore = asyncio.Semaphore(limit)
+
+        async def run(aw):
+            async with semaphore:
+                return await aw
+
+        return await asyncio.gather(*[run(aw) for aw in aws])
+
+    async def get_many(self, resource, keys, limit=None, **kwargs):
+        """
+        Retrieve details of multiple objects of a resource concurrently.
+
+        :param resource:  resource name, e.g. ``'releases'``
+        :param keys:      primary keys of the objects
+        :param kwargs:    filters to be used for each request
+        """
+        res = self[resource]
+        return await self.gather(*[res[key]._(**kwargs) for key in keys], limit=limit)
+
+    def set_comment(self, comment):
+        """Set PDC Change comment to be stored on the server.
+
+        Once you set the comment, it will be sent in all subsequent requests.
+
+        :param comment:     what comment to send to the server
+        :paramtype comment: string
+        """
+        self.headers['PDC-Change-Comment'] = comment
+
+    def __call__(self, *args, **kwargs):
+        return _AsyncBeanBagWrapper(self, '')(*args, **kwargs)
+
+    def __getattr__(self, name):
+        """
+        If the first attribute/endpoint with "-", just replace with "_"  in name.
+        """
+        if name.startswith('__'):
+            raise AttributeError(name)
+        if name != "_":
+            name = name.replace("_", "-")
+        return getattr(_AsyncBeanBagWrapper(self, ''), name)
+
+    def __getitem__(self, name):
+        return _AsyncBeanBagWrapper(self, '')[name]
+
+    def __str__(self):
+        return self.url
+
+
+class _AsyncBeanBagWrapper(object):
+    """
+    Resource of :class:`AsyncPDCClient` mirroring interface of
+    :class:`pdc_client._BeanBagWrapper`.
+    """
+    def __init__(self, pdc, path):
+        self.__dict__['pdc'] = pdc
+        self.__dict__['path'] = path
+
+    def __call__(self, *args, **kwargs):
+        if len(args) == 0:
+            verb, body = 'GET', None
+        elif len(args) == 1:
+            verb, body = 'POST', args[0]
+        elif len(args) == 2:
+            verb, body = args
+        else:
+            raise TypeError("__call__ expected up to 2 arguments, got %d" % len(args))
+        if 'page_size' not in kwargs:
+            kwargs['page_size'] = self.pdc.page_size
+        return self.pdc.request(verb, self.path, kwargs, body)
+
+    def __getattr__(self, name):
+        if name.startswith('__'):
+            raise AttributeError(name)
+        return _AsyncBeanBagWrapper(self.pdc, _join(self.path, '/' if name == '_' else name))
+
+    def __getitem__(self, name):
+        return _AsyncBeanBagWrapper(self.pdc, _join(self.path, name))
+
+    def __setattr__(self, name, value):
+        raise TypeError('Assignment cannot be awaited; use `await resource._("PUT", data)`')
+
+    def __setitem__(self, name, value):
+        raise TypeError('Assignment cannot be awaited; use `await resource._("PUT", data)`')
+
+    def __delattr__(self, name):
+        raise TypeError('Deletion cannot be awaited; use `await resource._("DELETE", None)`')
+
+    def __delitem__(self, name):
+        raise TypeError('Deletion cannot be awaited; use `await resource._("DELETE", None)`')
+
+    def __iadd__(self, value):
+        return self.pdc.request('PATCH', self.path, body=value)
+
+    def __eq__(self, other):
+        return self.pdc is other.pdc and self.path == other.path
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __str__(self):
+        return self.pdc.url + self.path
+
+    def results(self, *args, **kwargs):
+        """
+           Return an asynchronous iterator with all pages of data.
+           Raise NoResultsError with response if there is unexpected data.
+        """
+        return _AsyncResults(self, args, kwargs, self.pdc.prefetch)
+
+
+class _AsyncResults(object):
+    """
+    Asynchronous iterator over all pages of a resource.
+
+    If ``prefetch`` is a positive number, up to ``prefetch`` following pages
+    are requested concurrently while results are still returned in order.
+    """
+    def __init__(self, resource, args, kwargs, prefetch=None):
+        self.resource = resource
+        self.args = args
+        self.kwargs = kwargs
+        self.prefetch = prefetch
+        self.items = collections.deque()
+        self.pending = collections.deque()
+        self.page = 0
+        self.pages = None
+        self.done = False
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        while not self.items:
+            if self.done:
+                raise StopAsyncIteration
+            try:
+                await self._next_page()
+            except BaseException:
+                # Including cancellation of the task iterating over results.
+                self._cancel_pending()
+                raise
+        return self.items.popleft()
+
+    async def aclose(self):
+        """Stop the iteration and cancel requests for pages retrieved ahead."""
+        self.items.clear()
+        self._cancel_pending()
+
+    def __del__(self):
+        # The iteration was abandoned, e.g. by break in async for.
+        try:
+            self._cancel_pending()
+        except RuntimeError:
+            # The event loop is already closed.
+            pass
+
+    def _cancel_pending(self):
+        self.done = True
+        while self.pending:
+            self.pending.popleft().cancel()
+
+    def _fetch(self, page):
+        return self.resource(*self.args, **dict(self.kwargs, page=page))
+
+    async def _next_page(self):
+        if self.pages is not None and (self.pending or self.page < self.pages):
+            while self.page < self.pages and len(self.pending) < self.prefetch:
+                self.page += 1
+                self.pending.append(asyncio.ensure_future(self._fetch(self.page)))
+            response = await self.pending.popleft()
+        else:
+            self.page += 1
+            response = await self._fetch(self.page)
+
+        if isinstance(response, list):
+            self.items.extend(response)
+            self.done = True
+        elif _is_page(response):
+            self.items.extend(response['results'])
+            if not response['next']:
+                self._cancel_pending()
+            elif self.page == 1 and self.prefetch and self.prefetch > 0 and response['results']:
+                self.pages = -(-response['count'] // len(response['results']))
+        else:
+            raise NoResultsError(response)
@@ -0,0 +1,61 @@
+#
+# Copyright (c) 2018 Red Hat
+# Licensed under The MIT License (MIT)
+# http://opensource.org/licenses/MIT
+#
+"""
+Authentication strategies for :class:`pdc_client.PDCClient`.
+
+A strategy decides how the client authenticates when obtaining a token from
+the server and how all other requests are authenticated. To use a different
+authentication method, subclass :class:`AuthStrategy` and pass an instance
+as ``auth_strategy`` argument of the client.
+"""
+
+import requests
+
+
+class TokenAuth(requests.auth.AuthBase):
+    """
+    Authenticates requests with a PDC token.
+    """
+    def __init__(self, token):
+        self.token = token
+
+    def __call__(self, request):
+        request.headers['Authorization'] = 'Token %s' % self.token
+        return request
+
+
+class AuthStrategy(object):
+    """
+    Base authentication strategy, which does not authenticate when obtaining
+    token and sends only the token with other requests.
+    """
+    def token_auth(self):
+        """
+        Return requests authentication handler used only for obtaining the
+        token, or None for unauthenticated request.
+        """
+        return None
+
+    def request_auth(self, token):
+        """
+        Return requests authentication handler used for all requests except
+        obtaining the token, or None if there is no token.
+        """
+        if not token:
+            return None
+        return TokenAuth(token)
+
+
+class KerberosAuthStrategy(AuthStrategy):
+    """
+    Uses Kerberos (SPNEGO) to obtain the token. Other requests carry only the
+    token, so they never trigger Kerberos negotiation.
+    """
+    def token_auth(self):
+        import requests_kerberos
+        # REQUIRED, OPTIONAL, DISABLED
+        return requests_kerberos.HTTPKerberosAuth(
+            mutual_authentication=requests_kerberos.DISABLED)
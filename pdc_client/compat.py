@@ -15,6 +15,16 @@ try:
 except ImportError:
     from io import StringIO
 
+try:
+    from urlparse import parse_qs, urlsplit
+except ImportError:
+    from urllib.parse import parse_qs, urlsplit
+
+try:
+    from urllib import urlencode
+except ImportError:
+    from urllib.parse import urlencode
+
 
 if PY3:
     def iteritems(d, **kw):
@@ -0,0 +1,363 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2018 Red Hat
+# Licensed under The MIT License (MIT)
+# http://opensource.org/licenses/MIT
+#
+"""
+Static shell completion for the pdc command.
+
+The generated scripts contain the whole tree of commands and options, so
+completing them does not run Python at all. Values of arguments which have
+`completion_source` attribute set (or an `IdentifierCompleter`) are read
+from cache files:
+
+    ~/.cache/pdc/completion/<server>/<source>
+
+Each file contains one value per line, sorted, so that a prefix can be
+looked up with binary search. The files are filled by `IdentifierCache`,
+either explicitly by `pdc completion refresh` or when argcomplete
+completes an identifier and the file is older than its TTL.
+"""
+
+import argparse
+import logging
+import os
+import re
+import tempfile
+import time
+from collections import OrderedDict
+
+COMPLETION_CACHE_DIR = os.path.expanduser('~/.cache/pdc/completion')
+ROOT = 'pdc'
+SHELLS = ('bash', 'zsh')
+
+# Seconds after which cached identifiers are retrieved again on completion.
+DEFAULT_TTL = 3600
+BULK_PAGE_SIZE = 1000
+
+# Source name -> (resource, field with the identifier)
+IDENTIFIER_SOURCES = OrderedDict([
+    ('releases', ('releases', 'release_id')),
+    ('composes', ('composes', 'compose_id')),
+    ('global-components', ('global-components', 'name')),
+])
+
+logger = logging.getLogger(__name__)
+
+
+def cache_file(source, server, cache_dir=None):
+    """Return path to cache file with values of a source for a server."""
+    return os.path.join(cache_dir or COMPLETION_CACHE_DIR, re.sub(r'[^A-Za-z0-9._-]', '_', server), source)
+
+
+def _line_start(cache, position):
+    if position == 0:
+        return 0
+    cache.seek(position - 1)
+    cache.readline()
+    return cache.tell()
+
+
+def lookup(path, prefix):
+    """
+    Return values with given prefix from a sorted file with one value per
+    line. The first matching line is found by binary search, so only a few
+    blocks of the file are read.
+    """
+    prefix = prefix.encode('utf-8')
+    with open(path, 'rb') as cache:
+        cache.seek(0, os.SEEK_END)
+        low, high = 0, cache.tell()
+        while low < high:
+            middle = (low + high) // 2
+            cache.seek(_line_start(cache, middle))
+            line = cache.readline()
+            if line and line.rstrip(b'\n') < prefix:
+                low = middle + 1
+            else:
+                high = middle
+        cache.seek(_line_start(cache, low))
+        values = []
+        for line in cache:
+            if not line.startswith(prefix):
+                break
+            values.append(line.rstrip(b'\n').decode('utf-8'))
+        return values
+
+
+class IdentifierCache(object):
+    """
+    Identifiers of objects on a server (see IDENTIFIER_SOURCES) stored in
+    sorted files, one for each source.
+    """
+    def __init__(self, server, cache_dir=None, ttl=DEFAULT_TTL):
+        self.server = server
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+
+    def path(self, source):
+        return cache_file(source, self.server, self.cache_dir)
+
+    def is_fresh(self, source):
+        try:
+            return os.path.getmtime(self.path(source)) + self.ttl > time.time()
+        except OSError:
+            return False
+
+    def lookup(self, source, prefix=''):
+        """Return cached identifiers starting with prefix."""
+        try:
+            return lookup(self.path(source), prefix)
+        except (IOError, OSError):
+            return []
+
+    def refresh(self, source, client):
+        """
+        Retrieve all identifiers of a source with the client and store them.
+        Return number of identifiers.
+        """
+        resource, field = IDENTIFIER_SOURCES[source]
+        objects = client.get_paged(client[resource]._, fields=[field], page_size=BULK_PAGE_SIZE)
+        values = sorted(set(obj[field] for obj in objects))
+
+        path = self.path(source)
+        directory = os.path.dirname(path)
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        # Replace the file at once, so that completion never reads part of it.
+        fd, temp_path = tempfile.mkstemp(dir=directory, prefix='.' + source)
+        try:
+            with os.fdopen(fd, 'wb') as cache:
+                for value in values:
+                    cache.write(value.encode('utf-8') + b'\n')
+            os.rename(temp_path, path)
+        except Exception:
+            os.remove(temp_path)
+            raise
+        return len(values)
+
+
+class IdentifierCompleter(object):
+    """
+    Argcomplete completer of identifiers from a source. Identifiers older
+    than TTL are retrieved from the server first; if that fails, the old
+    ones are used.
+
+        parser.add_argument('release_id').completer = IdentifierCompleter('releases')
+    """
+    def __init__(self, source, cache_dir=None, ttl=DEFAULT_TTL):
+        self.source = source
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+
+    def __call__(self, prefix, parsed_args=None, **kwargs):
+        server = getattr(parsed_args, 'server', None) or 'stage'
+        cache = IdentifierCache(server, self.cache_dir, self.ttl)
+        if not cache.is_fresh(self.source):
+            try:
+                cache.refresh(self.source, self._client(server, parsed_args))
+            except Exception as e:
+                logger.debug('Failed to retrieve {0}: {1}'.format(self.source, e))
+        return cache.lookup(self.source, prefix)
+
+    @staticmethod
+    def _client(server, parsed_args):
+        import pdc_client
+
+        if getattr(parsed_args, 'insecure', False):
+            ssl_verify = False
+        else:
+            ssl_verify = getattr(parsed_args, 'ca_cert', None)
+        return pdc_client.PDCClient(server, ssl_verify=ssl_verify)
+
+
+def _value_spec(action):
+    completer = getattr(action, 'completer', None)
+    source = getattr(action, 'completion_source', None) or getattr(completer, 'source', None)
+    if source:
+        return 'source:' + source
+    if action.choices:
+        return 'choices:' + ' '.join(str(choice) for choice in action.choices)
+    return None
+
+
+def _walk(parser, path, tree):
+    words = []
+    takes_value = []
+    values = OrderedDict()
+    tree[path] = (words, takes_value, values)
+    positional = 0
+    for action in parser._actions:
+        if isinstance(action, argparse._SubParsersAction):
+            for name, subparser in action.choices.items():
+                words.append(name)
+                _walk(subparser, path + ' ' + name, tree)
+        elif action.option_strings:
+            if action.help != argparse.SUPPRESS:
+                words.extend(action.option_strings)
+            if action.nargs != 0:
+                takes_value.extend(action.option_strings)
+                spec = _value_spec(action)
+                for option in action.option_strings:
+                    if spec:
+                        values[option] = spec
+        else:
+            spec = _value_spec(action)
+            if spec:
+                values[str(positional)] = spec
+            positional += 1
+
+
+def completion_tree(parser):
+    """
+    Return dict mapping path of commands (starting with "pdc") to tuple of
+    words offered after it (subcommands and options), options taking value
+    and dict of value specifications for options and positional arguments
+    (by index).
+    """
+    tree = OrderedDict()
+    _walk(parser, ROOT, tree)
+    return tree
+
+
+def _quote(value):
+    return "'" + value.replace("'", "'\\''") + "'"
+
+
+def _tables(tree, indent):
+    words = []
+    takes_value = []
+    values = []
+    for path, (path_words, path_takes_value, path_values) in tree.items():
+        words.append((path, ' '.join(path_words)))
+        if path_takes_value:
+            takes_value.append((path, ' '.join(path_takes_value)))
+        for key, spec in path_values.items():
+            values.append((path + '|' + key, spec))
+    return [(name, '\n'.join(indent(key, value) for key, value in table))
+            for name, table in (('words', words), ('takes_value', takes_value), ('values', values))]
+
+
+BASH_TEMPLATE = r'''# Generated by "pdc completion generate --shell bash", do not edit.
+
+{tables}
+
+_pdc_cached() {{
+    local file=${{PDC_COMPLETION_CACHE:-$HOME/.cache/pdc/completion}}/${{2//[^A-Za-z0-9._-]/_}}/$1
+    [[ -r $file ]] || return
+    if type look &>/dev/null; then
+        COMPREPLY=($(look -- "$cur" "$file"))
+    else
+        COMPREPLY=($(compgen -W "$(<"$file")" -- "$cur"))
+    fi
+}}
+
+_pdc() {{
+    local cur=${{COMP_WORDS[COMP_CWORD]}} prev=${{COMP_WORDS[COMP_CWORD-1]}}
+    local cmd={root} server=stage word spec i positional=0
+    for ((i = 1; i < COMP_CWORD; i++)); do
+        word=${{COMP_WORDS[i]}}
+        if [[ $word == -* ]]; then
+            if [[ " ${{_pdc_takes_value[$cmd]}} " == *" $word "* ]]; then
+                ((i++))
+                [[ $word == -s || $word == --server ]] && server=${{COMP_WORDS[i]}}
+            fi
+        elif [[ -n ${{_pdc_words[$cmd $word]+set}} ]]; then
+            cmd="$cmd $word"
+            positional=0
+        else
+            ((positional++))
+        fi
+    done
+
+    if ((COMP_CWORD > 1)) && [[ $prev == -* && " ${{_pdc_takes_value[$cmd]}} " == *" $prev "* ]]; then
+        spec=${{_pdc_values[$cmd|$prev]}}
+        [[ -n $spec ]] || return
+    elif [[ $cur != -* ]]; then
+        spec=${{_pdc_values[$cmd|$positional]}}
+    fi
+
+    case $spec in
+        choices:*) COMPREPLY=($(compgen -W "${{spec#choices:}}" -- "$cur")) ;;
+        source:*) _pdc_cached "${{spec#source:}}" "$server" ;;
+        *) COMPREPLY=($(compgen -W "${{_pdc_words[$cmd]}}" -- "$cur")) ;;
+    esac
+}}
+
+complete -o default -F _pdc pdc
+'''
+
+ZSH_TEMPLATE = r'''#compdef pdc
+# Generated by "pdc completion generate --shell zsh", do not edit.
+
+typeset -gA _pdc_words _pdc_takes_value _pdc_values
+{tables}
+
+_pdc_cached() {{
+    local file=${{PDC_COMPLETION_CACHE:-$HOME/.cache/pdc/completion}}/${{2//[^A-Za-z0-9._-]/_}}/$1
+    [[ -r $file ]] || return 1
+    local -a values
+    values=(${{(f)"$(<$file)"}})
+    compadd -a values
+}}
+
+_pdc() {{
+    local cmd={root} server=stage word spec i positional=0
+    local prev=${{words[CURRENT-1]}}
+    for ((i = 2; i < CURRENT; i++)); do
+        word=${{words[i]}}
+        if [[ $word == -* ]]; then
+            if (( ${{${{=_pdc_takes_value[$cmd]}}[(Ie)$word]}} )); then
+                ((i++))
+                [[ $word == (-s|--server) ]] && server=${{words[i]}}
+            fi
+        elif (( ${{+_pdc_words[$cmd $word]}} )); then
+            cmd="$cmd $word"
+            positional=0
+        else
+            ((positional++))
+        fi
+    done
+
+    if (( CURRENT > 2 )) && [[ $prev == -* ]] && (( ${{${{=_pdc_takes_value[$cmd]}}[(Ie)$prev]}} )); then
+        spec=${{_pdc_values[$cmd|$prev]}}
+        [[ -n $spec ]] || {{ _files; return }}
+    elif [[ $PREFIX != -* ]]; then
+        spec=${{_pdc_values[$cmd|$positional]}}
+    fi
+
+    case $spec in
+        choices:*) compadd -- ${{=spec#choices:}} ;;
+        source:*) _pdc_cached ${{spec#source:}} $server ;;
+        *) compadd -- ${{=_pdc_words[$cmd]}} ;;
+    esac
+}}
+
+if [[ $zsh_eval_context[-1] == loadautofunc ]]; then
+    _pdc "$@"
+else
+    compdef _pdc pdc
+fi
+'''
+
+
+def generate_bash(tree):
+    tables = _tables(tree, lambda key, value: '    [{0}]={1}'.format(_quote(key), _quote(value)))
+    return BASH_TEMPLATE.format(
+        root=ROOT,
+        tables='\n\n'.join('declare -gA _pdc_{0}=(\n{1}\n)'.format(name, table)
+                           for name, table in tables))
+
+
+def generate_zsh(tree):
+    tables = _tables(tree, lambda key, value: '    {0} {1}'.format(_quote(key), _quote(value)))
+    return ZSH_TEMPLATE.format(
+        root=ROOT,
+        tables='\n'.join('_pdc_{0}=(\n{1}\n)'.format(name, table) for name, table in tables))
+
+
+def generate(parser, shell):
+    """Return completion script for given shell (one of SHELLS)."""
+    tree = completion_tree(parser)
+    return {'bash': generate_bash, 'zsh': generate_zsh}[shell](tree)
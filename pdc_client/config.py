@@ -13,6 +13,17 @@ CONFIG_INSECURE_KEY_NAME = 'insecure'
 CONFIG_SSL_VERIFY_KEY_NAME = 'ssl-verify'
 CONFIG_DEVELOP_KEY_NAME = 'develop'
 CONFIG_TOKEN_KEY_NAME = 'token'
+CONFIG_CACHE_DIR_KEY_NAME = 'cache-dir'
+CONFIG_CACHE_SIZE_KEY_NAME = 'cache-size'
+CONFIG_POOL_CONNECTIONS_KEY_NAME = 'pool-connections'
+CONFIG_POOL_MAXSIZE_KEY_NAME = 'pool-maxsize'
+CONFIG_CONNECT_TIMEOUT_KEY_NAME = 'connect-timeout'
+CONFIG_READ_TIMEOUT_KEY_NAME = 'read-timeout'
+CONFIG_MAX_RETRIES_KEY_NAME = 'max-retries'
+CONFIG_RETRY_KEY_NAME = 'retry'
+CONFIG_RATE_LIMIT_KEY_NAME = 'rate-limit'
+CONFIG_MAX_IN_FLIGHT_KEY_NAME = 'max-in-flight'
+CONFIG_HEDGE_KEY_NAME = 'hedge'
 
 logger = logging.getLogger(__name__)
 
@@ -154,3 +165,50 @@ class ServerConfig(object):
     @property
     def token(self):
         return self.config.get(CONFIG_TOKEN_KEY_NAME)
+
+    @property
+    def cache_dir(self):
+        cache_dir = self.config.get(CONFIG_CACHE_DIR_KEY_NAME)
+        if cache_dir:
+            return os.path.expanduser(cache_dir)
+        return None
+
+    @property
+    def cache_size(self):
+        return self.config.get(CONFIG_CACHE_SIZE_KEY_NAME)
+
+    @property
+    def pool_connections(self):
+        return self.config.get(CONFIG_POOL_CONNECTIONS_KEY_NAME)
+
+    @property
+    def pool_maxsize(self):
+        return self.config.get(CONFIG_POOL_MAXSIZE_KEY_NAME)
+
+    @property
+    def connect_timeout(self):
+        return self.config.get(CONFIG_CONNECT_TIMEOUT_KEY_NAME)
+
+    @property
+    def read_timeout(self):
+        return self.config.get(CONFIG_READ_TIMEOUT_KEY_NAME)
+
+    @property
+    def max_retries(self):
+        return self.config.get(CONFIG_MAX_RETRIES_KEY_NAME)
+
+    @property
+    def retry(self):
+        return self.config.get(CONFIG_RETRY_KEY_NAME)
+
+    @property
+    def rate_limit(self):
+        return self.config.get(CONFIG_RATE_LIMIT_KEY_NAME)
+
+    @property
+    def max_in_flight(self):
+        return self.config.get(CONFIG_MAX_IN_FLIGHT_KEY_NAME)
+
+    @property
+    def hedge(self):
+        return self.config.get(CONFIG_HEDGE_KEY_NAME)
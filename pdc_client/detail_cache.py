@@ -0,0 +1,90 @@
+#
+# Copyright (c) 2018 Red Hat
+# Licensed under The MIT License (MIT)
+# http://opensource.org/licenses/MIT
+#
+"""
+In-memory cache of object details retrieved during a single run.
+"""
+
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+DEFAULT_MAX_ENTRIES = 256
+
+
+class DetailCache(object):
+    """
+    Caches responses of GET requests for detail URLs (``resource/<id>/``)
+    for ``ttl`` seconds. At most ``max_entries`` responses are kept, least
+    recently used are dropped first.
+
+    Cached data are copied on the way in and out so that callers can modify
+    the returned objects.
+    """
+    def __init__(self, root_url, ttl, max_entries=None):
+        self.root_url = root_url.rstrip('/') + '/'
+        self.ttl = ttl
+        self.max_entries = DEFAULT_MAX_ENTRIES if max_entries is None else max_entries
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def is_detail_url(self, url):
+        if not url.startswith(self.root_url):
+            return False
+        path = url[len(self.root_url):].strip('/')
+        return len(path.split('/')) >= 2
+
+    @staticmethod
+    def _key(url, params):
+        query = tuple(sorted((key, repr(value)) for key, value in params.items()
+                             if value is not None))
+        return url.rstrip('/'), query
+
+    def get(self, url, params):
+        """
+        Return copy of cached response or None.
+        """
+        key = self._key(url, params)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires < time.time():
+                del self.entries[key]
+                return None
+            # Move to the end as the most recently used entry.
+            del self.entries[key]
+            self.entries[key] = entry
+        return copy.deepcopy(value)
+
+    def set(self, url, params, value):
+        """
+        Store the response if the URL is a detail URL.
+        """
+        if value is None or not self.is_detail_url(url):
+            return
+        key = self._key(url, params)
+        entry = (time.time() + self.ttl, copy.deepcopy(value))
+        with self.lock:
+            self.entries.pop(key, None)
+            self.entries[key] = entry
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def invalidate(self, url):
+        """
+        Drop cached responses for given URL and all URLs below it.
+        """
+        prefix = url.rstrip('/')
+        with self.lock:
+            for key in list(self.entries):
+                if key[0] == prefix or key[0].startswith(prefix + '/'):
+                    del self.entries[key]
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
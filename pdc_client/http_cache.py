@@ -0,0 +1,215 @@
+#
+# Copyright (c) 2018 Red Hat
+# Licensed under The MIT License (MIT)
+# http://opensource.org/licenses/MIT
+#
+"""
+Cache of GET responses revalidated with conditional requests.
+
+Responses with ``ETag`` or ``Last-Modified`` header are stored in a
+directory. When the same URL (including query) is requested again, the
+request is sent with ``If-None-Match`` or ``If-Modified-Since`` header and
+if the server answers with ``304 Not Modified``, the cached body is used.
+The size of the directory is bounded, least recently used entries are
+removed first.
+"""
+
+import errno
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+
+from .transport import PDCHTTPAdapter
+
+DEFAULT_CACHE_SIZE = 100 * 1024 * 1024
+HTTP_OK = 200
+HTTP_NOT_MODIFIED = 304
+
+logger = logging.getLogger(__name__)
+
+
+class HTTPCache(object):
+    """
+    Directory with cached responses.
+
+    Each entry consists of two files named by hash of the URL: ``.json``
+    file with validators and headers, and ``.body`` file with the content.
+    Modification time of the files is updated on each use; when the total
+    size exceeds ``max_size`` bytes, the oldest entries are removed.
+
+    Files are written to unique temporary files first, so the cache can be
+    shared by threads and processes.
+    """
+    def __init__(self, path, max_size=None):
+        self.path = os.path.expanduser(path)
+        self.max_size = DEFAULT_CACHE_SIZE if max_size is None else max_size
+        # Total size of the entries, computed on first write.
+        self.size = None
+        self.lock = threading.Lock()
+
+    def _entry_path(self, url):
+        name = hashlib.sha1(url.encode('utf-8')).hexdigest()
+        return os.path.join(self.path, name)
+
+    @staticmethod
+    def _entry_size(entry_path):
+        size = 0
+        for ext in ('.json', '.body'):
+            try:
+                size += os.path.getsize(entry_path + ext)
+            except OSError:
+                pass
+        return size
+
+    def get(self, url):
+        """
+        Return tuple (metadata dict, body) for given URL or None.
+        """
+        entry_path = self._entry_path(url)
+        try:
+            with open(entry_path + '.json', 'r') as meta_file:
+                meta = json.load(meta_file)
+            with open(entry_path + '.body', 'rb') as body_file:
+                body = body_file.read()
+            os.utime(entry_path + '.json', None)
+            os.utime(entry_path + '.body', None)
+        except (IOError, OSError, ValueError):
+            return None
+        if meta.get('url') != url:
+            return None
+        return meta, body
+
+    def set(self, url, headers, body):
+        """
+        Store response for given URL.
+        """
+        entry_path = self._entry_path(url)
+        meta = {
+            'url': url,
+            'etag': headers.get('ETag'),
+            'last_modified': headers.get('Last-Modified'),
+            'headers': dict((key, value) for key, value in headers.items()
+                            if key.lower() in ('content-type', 'etag', 'last-modified')),
+        }
+        temp_paths = []
+        try:
+            if not os.path.isdir(self.path):
+                os.makedirs(self.path, 0o700)
+            temp_paths.append(self._write_temp(entry_path + '.body', body))
+            temp_paths.append(self._write_temp(entry_path + '.json', json.dumps(meta).encode('utf-8')))
+            with self.lock:
+                old_size = self._entry_size(entry_path)
+                os.rename(temp_paths[0], entry_path + '.body')
+                os.rename(temp_paths[1], entry_path + '.json')
+                del temp_paths[:]
+                if self.size is None:
+                    self._evict()
+                else:
+                    self.size += self._entry_size(entry_path) - old_size
+                    if self.size > self.max_size:
+                        self._evict()
+        except (IOError, OSError) as e:
+            logger.warning('Failed to write HTTP cache entry to %s: %s', self.path, e)
+            for temp_path in temp_paths:
+                try:
+                    os.remove(temp_path)
+                except OSError:
+                    pass
+
+    def _write_temp(self, path, data):
+        """
+        Write data to a new temporary file in the cache directory and return
+        its path. The name does not end with an extension of entry files.
+        """
+        fd, temp_path = tempfile.mkstemp(dir=self.path, prefix='.' + os.path.basename(path),
+                                         suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as temp_file:
+                temp_file.write(data)
+        except Exception:
+            os.remove(temp_path)
+            raise
+        return temp_path
+
+    def evict(self):
+        """
+        Remove least recently used entries until the cache fits its size.
+        """
+        with self.lock:
+            self._evict()
+
+    def _evict(self):
+        entries = {}
+        try:
+            names = os.listdir(self.path)
+        except OSError:
+            return
+        for name in names:
+            stem, ext = os.path.splitext(name)
+            if ext not in ('.json', '.body'):
+                continue
+            try:
+                st = os.stat(os.path.join(self.path, name))
+            except OSError:
+                continue
+            size, mtime = entries.get(stem, (0, 0))
+            entries[stem] = (size + st.st_size, max(mtime, st.st_mtime))
+
+        total = sum(size for size, _ in entries.values())
+        for stem, (size, _) in sorted(entries.items(), key=lambda item: item[1][1]):
+            if total <= self.max_size:
+                break
+            for ext in ('.json', '.body'):
+                try:
+                    os.remove(os.path.join(self.path, stem + ext))
+                except OSError as e:
+                    if e.errno != errno.ENOENT:
+                        raise
+            total -= size
+        self.size = total
+
+
+class CachingHTTPAdapter(PDCHTTPAdapter):
+    """
+    Transport adapter revalidating GET responses stored in :class:`HTTPCache`.
+
+    Responses served from the cache have attribute ``from_cache`` set to
+    True. Streamed requests bypass the cache. Other arguments are passed to
+    :class:`pdc_client.transport.PDCHTTPAdapter`.
+    """
+    def __init__(self, cache, *args, **kwargs):
+        self.cache = cache
+        super(CachingHTTPAdapter, self).__init__(*args, **kwargs)
+
+    def send(self, request, stream=False, **kwargs):
+        if request.method != 'GET' or stream:
+            return super(CachingHTTPAdapter, self).send(request, stream=stream, **kwargs)
+
+        cached = self.cache.get(request.url)
+        if cached:
+            meta, body = cached
+            if meta.get('etag'):
+                request.headers['If-None-Match'] = meta['etag']
+            if meta.get('last_modified'):
+                request.headers['If-Modified-Since'] = meta['last_modified']
+
+        response = super(CachingHTTPAdapter, self).send(request, stream=stream, **kwargs)
+        response.from_cache = False
+
+        if cached and response.status_code == HTTP_NOT_MODIFIED:
+            # Read the empty body to release the connection.
+            response.content
+            response.headers.pop('Content-Length', None)
+            response.status_code = HTTP_OK
+            response.reason = 'OK'
+            response.headers.update(meta['headers'])
+            response._content = body
+            response.from_cache = True
+        elif response.status_code == HTTP_OK and \
+                (response.headers.get('ETag') or response.headers.get('Last-Modified')):
+            self.cache.set(request.url, response.headers, response.content)
+
+        return response
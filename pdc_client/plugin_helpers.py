@@ -32,13 +32,16 @@
 # The base client does not define and use any hooks.
 #
 
+import argparse
 import json
 import logging
+import sys
 
-from pdc_client import compat
+import pdc_client
+from pdc_client import compat, split_fields
 
 # Python 3 compatibility
-from pdc_client.compat import iteritems
+from pdc_client.compat import iteritems, string_type
 
 
 DATA_PREFIX = 'data__'
@@ -169,6 +172,69 @@ def add_create_update_args(parser, required_args, optional_args, create=False):
     add_parser_arguments(parser, optional_args)
 
 
+class VersionAction(argparse.Action):
+    """
+    Print version of the client and exit. Unlike the `version` action of
+    argparse, the version is looked up only when the option is used.
+    """
+    def __init__(self, option_strings, dest=argparse.SUPPRESS, default=argparse.SUPPRESS,
+                 help="show program's version number and exit"):
+        super(VersionAction, self).__init__(option_strings=option_strings, dest=dest,
+                                            default=default, nargs=0, help=help)
+
+    def __call__(self, parser, namespace, values, option_string=None):
+        parser._print_message('%s %s\n' % (parser.prog, pdc_client.__version__), sys.stdout)
+        parser.exit()
+
+
+def add_fields_argument(parser, fields):
+    """
+    Add ``--fields`` option to a list action. The ``fields`` are the ones
+    the action displays in its table; see ``requested_fields`` for how they
+    are used.
+    """
+    parser.add_argument('--fields', type=split_fields, metavar='FIELD[,FIELD...]',
+                        help='retrieve and display only given fields')
+    parser.set_defaults(table_fields=fields)
+
+
+def requested_fields(args):
+    """Return list of fields a list action should request from server.
+
+    These are the fields given by ``--fields`` option if used. Otherwise
+    only the fields displayed in the table are requested, or all of them if
+    the output is JSON.
+    """
+    if args.fields:
+        return args.fields
+    if args.json:
+        return None
+    return args.table_fields
+
+
+def print_fields_table(objects, fields):
+    """
+    Print table with a column for each of given fields of objects. Columns
+    are as wide as the longest value; nested values are printed as JSON.
+    """
+    columns = [[field] for field in fields]
+    for obj in objects:
+        for field, column in zip(fields, columns):
+            value = obj.get(field)
+            if value is None:
+                value = ''
+            elif isinstance(value, (dict, list)):
+                value = json.dumps(value, sort_keys=True)
+            elif not isinstance(value, string_type):
+                value = str(value)
+            column.append(value)
+
+    fmt = '  '.join('{%d:%d}' % (index, max(len(cell) for cell in column))
+                    for index, column in enumerate(columns))
+    for row in zip(*columns):
+        print(fmt.format(*row).rstrip())
+
+
 def extract_arguments(args, prefix=DATA_PREFIX):
     """Return a dict of arguments created by `add_parser_arguments`.
 
@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2018 Red Hat
+# Licensed under The MIT License (MIT)
+# http://opensource.org/licenses/MIT
+#
+"""
+Manifest of commands provided by plugins in a plugin directory.
+
+The manifest is a JSON file mapping each command to the file of the plugin
+which defines it, so that the runner can load only the plugin for the
+requested command. It is generated from sources of the plugins without
+importing them:
+
+    $ python -m pdc_client.plugin_manifest pdc_client/plugins
+
+Files which cannot be described (a plugin class without a literal `command`
+attribute) and files implementing a hook invoked by any plugin are left out
+of the manifest. The runner always loads such files.
+"""
+
+from __future__ import print_function
+
+import argparse
+import ast
+import json
+import os
+
+from pdc_client.compat import string_type
+
+MANIFEST_FILE_NAME = 'manifest.json'
+
+
+def _string(node):
+    value = getattr(node, 'value', getattr(node, 's', None))
+    return value if isinstance(value, string_type) else None
+
+
+def _assigns(node, name):
+    if not isinstance(node, ast.Assign):
+        return False
+    return any(getattr(target, 'id', None) == name for target in node.targets)
+
+
+def _plugin_classes(tree):
+    for node in tree.body:
+        if _assigns(node, 'PLUGIN_CLASSES'):
+            if not isinstance(node.value, (ast.List, ast.Tuple)):
+                return None
+            return [getattr(element, 'id', None) for element in node.value.elts]
+    return []
+
+
+def _class_command(node):
+    for statement in node.body:
+        if _assigns(statement, 'command'):
+            return _string(statement.value)
+    return None
+
+
+def _invoked_hooks(tree):
+    for node in ast.walk(tree):
+        if not isinstance(node, ast.Call) or not node.args:
+            continue
+        if getattr(node.func, 'attr', getattr(node.func, 'id', None)) == 'run_hook':
+            hook = _string(node.args[0])
+            if hook:
+                yield hook
+
+
+def scan_plugin(source):
+    """
+    Return tuple (commands, functions, hooks) for source code of a plugin:
+    commands of its plugin classes (None if some of them is not known), names
+    of its top level functions and names of hooks it invokes.
+    """
+    tree = ast.parse(source)
+    classes = dict((node.name, node) for node in tree.body if isinstance(node, ast.ClassDef))
+    commands = []
+    plugin_classes = _plugin_classes(tree)
+    for name in plugin_classes or []:
+        command = _class_command(classes[name]) if name in classes else None
+        if command is None:
+            commands = None
+            break
+        commands.append(command)
+    if plugin_classes is None:
+        commands = None
+    functions = set(node.name for node in tree.body if isinstance(node, ast.FunctionDef))
+    return commands, functions, set(_invoked_hooks(tree))
+
+
+def generate_manifest(plugin_dir):
+    """Return manifest (dict mapping commands to file names) for a directory."""
+    scanned = {}
+    hooks = set()
+    for name in sorted(os.listdir(plugin_dir)):
+        if not name.endswith('.py') or name == '__init__.py':
+            continue
+        with open(os.path.join(plugin_dir, name)) as plugin_file:
+            commands, functions, invoked = scan_plugin(plugin_file.read())
+        scanned[name] = (commands, functions)
+        hooks.update(invoked)
+
+    manifest = {}
+    for name, (commands, functions) in scanned.items():
+        if commands is None or functions & hooks:
+            continue
+        for command in commands:
+            manifest[command] = name
+    return manifest
+
+
+def load_manifest(plugin_dir):
+    """Return manifest stored in a directory or None if there is none."""
+    try:
+        with open(os.path.join(plugin_dir, MANIFEST_FILE_NAME)) as manifest_file:
+            manifest = json.load(manifest_file)
+    except (IOError, OSError, ValueError):
+        return None
+    return manifest if isinstance(manifest, dict) else None
+
+
+def write_manifest(plugin_dir):
+    manifest = generate_manifest(plugin_dir)
+    with open(os.path.join(plugin_dir, MANIFEST_FILE_NAME), 'w') as manifest_file:
+        json.dump(manifest, manifest_file, indent=4, sort_keys=True, separators=(',', ': '))
+        manifest_file.write('\n')
+    return manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate manifest of plugin commands.')
+    parser.add_argument('plugin_dir', nargs='+', help='directory with plugins')
+    args = parser.parse_args()
+    for plugin_dir in args.plugin_dir:
+        manifest = write_manifest(plugin_dir)
+        print('{0}: {1} commands'.format(os.path.join(plugin_dir, MANIFEST_FILE_NAME), len(manifest)))
+
+
+if __name__ == '__main__':
+    main()
@@ -88,10 +88,11 @@ class BuildImageRttTest(PDCClientPlugin):
         self.build_image_rrt_tests_info(args)
 
     def _get_build_image_rtt_id(self, build_nvr, image_format):
-        results = self.client['build-image-rtt-tests']._(build_nvr=build_nvr, image_format=image_format)
-        if not results['count']:
+        result = self.client.first(self.client['build-image-rtt-tests']._,
+                                   build_nvr=build_nvr, image_format=image_format)
+        if not result:
             return None
-        return results['results'][0]['id']
+        return result['id']
 
 
 PLUGIN_CLASSES = [BuildImageRttTest]
@@ -60,11 +60,10 @@ class BuildImagePlugin(PDCClientPlugin):
 
     def build_image_info(self, args, image_id=None):
         image_id = image_id or args.image_id
-        build_images = self.client['build-images']._(image_id=image_id)
-        if not build_images['count']:
+        build_image = self.client.first(self.client['build-images']._, image_id=image_id)
+        if not build_image:
             print('Not found')
             sys.exit(1)
-        build_image = build_images['results'][0]
 
         if args.json:
             print(self.to_json(build_image))
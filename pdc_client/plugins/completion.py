@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2018 Red Hat
+# Licensed under The MIT License (MIT)
+# http://opensource.org/licenses/MIT
+#
+
+from __future__ import print_function
+
+from pdc_client import completion
+from pdc_client.plugin_helpers import PDCClientPlugin
+
+
+class CompletionPlugin(PDCClientPlugin):
+    command = 'completion'
+
+    def register(self):
+        self.set_command(help='shell completion')
+
+        generate_parser = self.add_action(
+            'generate', help='print static completion script for a shell',
+            description='Print completion script with all commands and options. '
+                        'It needs to be generated again if plugins change.')
+        generate_parser.add_argument('--shell', choices=completion.SHELLS, default='bash',
+                                     help='shell to generate the script for (default: bash)')
+        generate_parser.set_defaults(func=self.completion_generate)
+
+        refresh_parser = self.add_action(
+            'refresh', help='retrieve identifiers offered by completion',
+            description='Retrieve identifiers of objects on the server offered by completion '
+                        'and store them in cache. Identifiers are also retrieved on completion '
+                        'if they are older than {0} seconds.'.format(completion.DEFAULT_TTL))
+        refresh_parser.add_argument('--source', dest='sources', action='append',
+                                    choices=list(completion.IDENTIFIER_SOURCES),
+                                    help='what to retrieve, can be used multiple times '
+                                         '(default: all)')
+        refresh_parser.set_defaults(func=self.completion_refresh)
+
+    def completion_generate(self, args):
+        runner = self.runner.__class__()
+        runner.load_plugins(all_plugins=True)
+        parser = runner.build_parser(sorted(runner.plugins))
+        print(completion.generate(parser, args.shell), end='')
+
+    def completion_refresh(self, args):
+        cache = completion.IdentifierCache(args.server)
+        for source in args.sources or completion.IDENTIFIER_SOURCES:
+            count = cache.refresh(source, self.client)
+            print('{0}: {1}'.format(source, count))
+
+
+PLUGIN_CLASSES = [CompletionPlugin]
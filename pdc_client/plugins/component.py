@@ -8,10 +8,17 @@
 from __future__ import print_function
 
 import sys
+from pdc_client.completion import IdentifierCompleter
 from pdc_client.plugin_helpers import (PDCClientPlugin,
                                        add_parser_arguments,
+                                       add_fields_argument,
                                        extract_arguments,
-                                       add_create_update_args)
+                                       add_create_update_args,
+                                       print_fields_table,
+                                       requested_fields)
+
+# Fields displayed by `release-component list`.
+RELEASE_COMPONENT_LIST_FIELDS = ['id', 'release', 'name']
 
 
 def update_component_contacts(component, component_contacts):
@@ -37,11 +44,11 @@ class GlobalComponentPlugin(PDCClientPlugin):
         list_parser.set_defaults(func=self.list_global_components)
 
         info_parser = self.add_action('info', help='display details of a global component')
-        info_parser.add_argument('global_component_name', metavar='GLOBAL_COMPONENT_NAME')
+        info_parser.add_argument('global_component_name', metavar='GLOBAL_COMPONENT_NAME').completer = IdentifierCompleter('global-components')
         info_parser.set_defaults(func=self.global_component_info)
 
         update_parser = self.add_action('update', help='update an existing global component')
-        update_parser.add_argument('global_component_name', metavar='GLOBAL_COMPONENT_NAME')
+        update_parser.add_argument('global_component_name', metavar='GLOBAL_COMPONENT_NAME').completer = IdentifierCompleter('global-components')
         self.add_global_component_arguments(update_parser)
         update_parser.set_defaults(func=self.global_component_update)
 
@@ -83,9 +90,9 @@ class GlobalComponentPlugin(PDCClientPlugin):
                 global_component['name']))
 
     def _get_component_id(self, args):
-        global_component = self.client['global-components']._(name=args)
-        if global_component['count']:
-            return str(global_component['results'][0]['id'])
+        global_component = self.client.first(self.client['global-components']._, name=args)
+        if global_component:
+            return str(global_component['id'])
         else:
             return None
 
@@ -164,16 +171,17 @@ class ReleaseComponentPlugin(PDCClientPlugin):
                    'type'.split())
         for arg in filters:
             list_parser.add_argument('--' + arg.replace('_', '-'), dest='filter_' + arg)
+        add_fields_argument(list_parser, RELEASE_COMPONENT_LIST_FIELDS)
         list_parser.set_defaults(func=self.list_release_components)
 
         info_parser = self.add_action('info', help='display details of a release component')
         self.add_include_inactive_release_argument(info_parser)
-        info_parser.add_argument('release', metavar='RELEASE')
+        info_parser.add_argument('release', metavar='RELEASE').completer = IdentifierCompleter('releases')
         info_parser.add_argument('name', metavar='NAME')
         info_parser.set_defaults(func=self.release_component_info)
 
         update_parser = self.add_action('update', help='update an existing release component')
-        update_parser.add_argument('release', metavar='RELEASE')
+        update_parser.add_argument('release', metavar='RELEASE').completer = IdentifierCompleter('releases')
         update_parser.add_argument('name', metavar='NAME')
         self.add_release_component_arguments(update_parser, {'name': {}}, is_update=True)
         update_parser.set_defaults(func=self.release_component_update)
@@ -210,12 +218,17 @@ class ReleaseComponentPlugin(PDCClientPlugin):
         if 'include_inactive_release' in args and args.include_inactive_release:
             filters['include_inactive_release'] = True
 
-        release_components = self.client.get_paged(self.client['release-components']._, **filters)
+        release_components = self.client.get_paged(self.client['release-components']._,
+                                                   fields=requested_fields(args), **filters)
 
         if args.json:
             print(self.to_json(list(release_components)))
             return
 
+        if args.fields:
+            print_fields_table(release_components, args.fields)
+            return
+
         fmt = '{0:<10} {1:25} {2}'
         start_line = True
         for release_component in release_components:
@@ -283,10 +296,11 @@ class ReleaseComponentPlugin(PDCClientPlugin):
         self.release_component_info(args, response['id'])
 
     def _get_release_component_id(self, release, component_name):
-        release_components = self.client['release-components']._(name=component_name, release=release)
-        if not release_components['count']:
+        release_component = self.client.first(self.client['release-components']._,
+                                              name=component_name, release=release)
+        if not release_component:
             return None
-        return release_components['results'][0]['id']
+        return release_component['id']
 
     def release_component_update(self, args):
         data = extract_arguments(args)
@@ -7,6 +7,7 @@
 
 from __future__ import print_function
 
+from pdc_client.completion import IdentifierCompleter
 from pdc_client.plugin_helpers import PDCClientPlugin, add_parser_arguments, extract_arguments
 
 
@@ -22,14 +23,14 @@ class ComposePlugin(PDCClientPlugin):
         list_parser.set_defaults(func=self.list_composes)
 
         info_parser = self.add_action('info', help='display details of a compose')
-        info_parser.add_argument('compose_id', metavar='COMPOSE_ID')
+        info_parser.add_argument('compose_id', metavar='COMPOSE_ID').completer = IdentifierCompleter('composes')
         info_parser.set_defaults(func=self.compose_info)
 
         update_parser = self.add_action('update',
                                         help='partial update an existing compose.',
                                         description='only some compose fields can be modified by this call.\
                                             these are acceptance_testing, linked_releases and rtt_tested_architectures.')
-        update_parser.add_argument('compose_id', metavar='COMPOSE_ID')
+        update_parser.add_argument('compose_id', metavar='COMPOSE_ID').completer = IdentifierCompleter('composes')
         self.add_compose_arguments(update_parser)
         update_parser.set_defaults(func=self.compose_update)
         self.compose_update = update_parser
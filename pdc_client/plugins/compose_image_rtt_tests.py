@@ -7,6 +7,7 @@
 
 from __future__ import print_function
 
+from pdc_client.completion import IdentifierCompleter
 from pdc_client.plugin_helpers import PDCClientPlugin, add_parser_arguments, extract_arguments
 
 
@@ -35,7 +36,7 @@ class ComposeImageRTTTestsPlugin(PDCClientPlugin):
         update_parser.set_defaults(func=self.compose_image_rtt_test_update)
 
     def _add_common_arguments(self, parser):
-        parser.add_argument('compose_id', metavar='COMPOSE_ID')
+        parser.add_argument('compose_id', metavar='COMPOSE_ID').completer = IdentifierCompleter('composes')
         parser.add_argument('variant_uid', metavar='VARIANT_UID')
         parser.add_argument('arch', metavar='ARCH')
         parser.add_argument('file_name', metavar='FILE_NAME')
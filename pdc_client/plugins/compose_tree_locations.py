@@ -7,6 +7,7 @@
 
 from __future__ import print_function
 
+from pdc_client.completion import IdentifierCompleter
 from pdc_client.plugin_helpers import (PDCClientPlugin,
                                        extract_arguments,
                                        add_parser_arguments,
@@ -52,7 +53,7 @@ class ComposeTreeLocationsPlugin(PDCClientPlugin):
         delete_parser.set_defaults(func=self.compose_tree_location_delete)
 
     def _add_common_arguments(self, parser):
-        parser.add_argument('compose_id', metavar='COMPOSE_ID')
+        parser.add_argument('compose_id', metavar='COMPOSE_ID').completer = IdentifierCompleter('composes')
         parser.add_argument('variant_uid', metavar='VARIANT_UID')
         parser.add_argument('arch', metavar='ARCH')
         parser.add_argument('location', metavar='LOCATION')
@@ -123,18 +123,17 @@ class GlobalComponentContactPlugin(PDCClientPlugin):
         filters = extract_arguments(args, prefix='filter_')
         if not filters:
             self.subparsers.choices.get('delete-match').error('At least some filter must be used.')
-        global_component_contacts = self.client.get_paged(self.client['global-component-contacts']._, **filters)
-
-        global_component_contacts = list(global_component_contacts)
-        match_count = len(global_component_contacts)
+        match_count, global_component_contact = self.client.count_and_first(
+            self.client['global-component-contacts']._, **filters)
         if match_count == 1:
             self.client['global-component-contacts'
-                        ][global_component_contacts[0]['id']]._("DELETE", {})
+                        ][global_component_contact['id']]._("DELETE", {})
         elif match_count < 1:
             print("No match, nothing to do.")
         else:
             print("Multi matches, please delete via ID or provide more restrictions.")
-            print_component_contacts(global_component_contacts)
+            print_component_contacts(
+                self.client.get_paged(self.client['global-component-contacts']._, **filters))
 
 
 class ReleaseComponentContactPlugin(PDCClientPlugin):
@@ -231,18 +230,17 @@ class ReleaseComponentContactPlugin(PDCClientPlugin):
         filters = extract_arguments(args, prefix='filter_')
         if not filters:
             self.subparsers.choices.get('delete-match').error('At least some filter must be used.')
-        release_component_contacts = self.client.get_paged(self.client['release-component-contacts']._, **filters)
-
-        release_component_contacts = list(release_component_contacts)
-        match_count = len(release_component_contacts)
+        match_count, release_component_contact = self.client.count_and_first(
+            self.client['release-component-contacts']._, **filters)
         if match_count == 1:
             self.client['release-component-contacts'
-                        ][release_component_contacts[0]['id']]._("DELETE", {})
+                        ][release_component_contact['id']]._("DELETE", {})
         elif match_count < 1:
             print("No match, nothing to do.")
         else:
             print("Multi matches, please delete via ID or provide more restrictions.")
-            print_component_contacts(release_component_contacts)
+            print_component_contacts(
+                self.client.get_paged(self.client['release-component-contacts']._, **filters))
 
 
 PLUGIN_CLASSES = [GlobalComponentContactPlugin, ReleaseComponentContactPlugin]
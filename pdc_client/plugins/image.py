@@ -84,17 +84,15 @@ class ImagePlugin(PDCClientPlugin):
         filters = {'file_name': args.filename}
         if args.sha256:
             filters['sha256'] = args.sha256
-        image = self.client.images._(**filters)
-        if image['count'] == 0:
+        count, image = self.client.count_and_first(self.client.images._, **filters)
+        if count == 0:
             print('Not found')
             sys.exit(1)
-        elif image['count'] > 1:
+        elif count > 1:
             print('More than one image with that name, use --sha256 to specify.')
-            self._print_image_list(image['results'], True)
+            self._print_image_list(self.client.get_paged(self.client.images._, **filters), True)
             sys.exit(1)
         else:
-            image = image['results'][0]
-
             if args.json:
                 print(self.to_json(image))
                 return
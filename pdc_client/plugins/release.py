@@ -7,6 +7,7 @@
 
 from __future__ import print_function
 
+from pdc_client.completion import IdentifierCompleter
 from pdc_client.plugin_helpers import (PDCClientPlugin,
                                        extract_arguments,
                                        add_create_update_args)
@@ -26,11 +27,11 @@ class ReleasePlugin(PDCClientPlugin):
         list_parser.set_defaults(func=self.list_releases)
 
         info_parser = self.add_action('info', help='display details of a release')
-        info_parser.add_argument('release_id', metavar='RELEASE_ID')
+        info_parser.add_argument('release_id', metavar='RELEASE_ID').completer = IdentifierCompleter('releases')
         info_parser.set_defaults(func=self.release_info)
 
         update_parser = self.add_action('update', help='update an existing release')
-        update_parser.add_argument('release_id', metavar='RELEASE_ID')
+        update_parser.add_argument('release_id', metavar='RELEASE_ID').completer = IdentifierCompleter('releases')
         self.add_release_arguments(update_parser)
         update_parser.set_defaults(func=self.release_update)
 
@@ -42,7 +43,7 @@ class ReleasePlugin(PDCClientPlugin):
                                        description=('NOTE: At least one of `short`, `version`, '
                                                     '`base_product` or `release_type` '
                                                     'is required.'))
-        clone_parser.add_argument('old_release_id', metavar='OLD_RELEASE_ID')
+        clone_parser.add_argument('old_release_id', metavar='OLD_RELEASE_ID').completer = IdentifierCompleter('releases')
         self.add_clone_arguments(clone_parser, required=False)
         clone_parser.set_defaults(func=self.release_clone)
 
@@ -14,6 +14,7 @@ except ImportError:
     # Python 2.6 needs this back-port
     from ordereddict import OrderedDict
 
+from pdc_client.completion import IdentifierCompleter
 from pdc_client.plugin_helpers import (PDCClientPlugin,
                                        extract_arguments,
                                        add_create_update_args)
@@ -32,7 +33,7 @@ class ReleaseVariantPlugin(PDCClientPlugin):
 
         # CRUD: READ one (info)
         info_parser = self.add_action('info', help='display details of a release_variant')
-        info_parser.add_argument('release')
+        info_parser.add_argument('release').completer = IdentifierCompleter('releases')
         info_parser.add_argument('uid')
         info_parser.set_defaults(func=self.release_variant_info, required=True)
 
@@ -43,14 +44,14 @@ class ReleaseVariantPlugin(PDCClientPlugin):
 
         # CRUD: UPDATE
         update_parser = self.add_action('update', help='update an existing release_variant')
-        update_parser.add_argument('release')
+        update_parser.add_argument('release').completer = IdentifierCompleter('releases')
         update_parser.add_argument('uid')
         self.add_release_variant_arguments(update_parser)
         update_parser.set_defaults(func=self.release_variant_update)
 
         # CRUD: DELETE
         delete_parser = self.add_action('delete', help='delete a release_variant')
-        delete_parser.add_argument('release')
+        delete_parser.add_argument('release').completer = IdentifierCompleter('releases')
         delete_parser.add_argument('uid', nargs="+")
         delete_parser.set_defaults(func=self.release_variant_delete)
 
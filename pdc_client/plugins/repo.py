@@ -7,9 +7,13 @@
 
 from __future__ import print_function
 
+from pdc_client.completion import IdentifierCompleter
 from pdc_client.plugin_helpers import (PDCClientPlugin,
+                                       add_fields_argument,
                                        extract_arguments,
-                                       add_create_update_args)
+                                       add_create_update_args,
+                                       print_fields_table,
+                                       requested_fields)
 
 _FIELD_WITH_NAME = [
     ("id", "ID"),
@@ -49,6 +53,7 @@ class RepoPlugin(PDCClientPlugin):
                    'repo-family', 'service', 'shadow', 'variant-uid', 'product-id')
         for arg in filters:
             list_parser.add_argument('--' + arg, dest='filter_' + arg.replace('-', '_'))
+        add_fields_argument(list_parser, [field for field, _ in _FIELD_WITH_NAME])
         list_parser.set_defaults(func=self.repo_list)
 
         info_parser = self.add_action('info', help='display details of an content delivery repo')
@@ -85,14 +90,14 @@ class RepoPlugin(PDCClientPlugin):
         #  * edit data (change release_id, change versions in repo names)
         #  * import repos to a new release
         export_parser = self.add_action('export', help='export repos from a release into a json file')
-        export_parser.add_argument('release_id')
+        export_parser.add_argument('release_id').completer = IdentifierCompleter('releases')
         export_parser.add_argument('json_file')
         self.add_repo_arguments(export_parser, exclude=['release_id'])
         export_parser.set_defaults(func=self.repo_export)
 
         # import
         import_parser = self.add_action('import', help='import repos from a json file into a release')
-        import_parser.add_argument('release_id')
+        import_parser.add_argument('release_id').completer = IdentifierCompleter('releases')
         import_parser.add_argument('json_file')
         import_parser.set_defaults(func=self.repo_import)
 
@@ -148,12 +153,18 @@ class RepoPlugin(PDCClientPlugin):
         if not filters and not data:
             self.subparsers.choices.get('list').error('At least some filter must be used.')
         ordering = ','.join(_ORDERING)
-        repos = data or self.client.get_paged(self.client['content-delivery-repos']._, ordering=ordering, **filters)
+        fields = None if data else requested_fields(args)
+        repos = data or self.client.get_paged(self.client['content-delivery-repos']._, ordering=ordering,
+                                              fields=fields, **filters)
 
         if args.json:
             print(self.to_json(list(repos)))
             return
 
+        if fields and args.fields:
+            print_fields_table(repos, args.fields)
+            return
+
         # Create transposed table before printing to find out minimal
         # widths for each column.
         columns = [[name] for _, name in _FIELD_WITH_NAME]
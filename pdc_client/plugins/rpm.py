@@ -9,8 +9,14 @@ from __future__ import print_function
 
 from pdc_client.plugin_helpers import (PDCClientPlugin,
                                        add_parser_arguments,
+                                       add_fields_argument,
                                        extract_arguments,
-                                       add_create_update_args)
+                                       add_create_update_args,
+                                       print_fields_table,
+                                       requested_fields)
+
+# Fields displayed by `rpm list`.
+LIST_FIELDS = ['id', 'name', 'epoch', 'version', 'release', 'arch']
 
 
 class RPMPlugin(PDCClientPlugin):
@@ -24,6 +30,7 @@ class RPMPlugin(PDCClientPlugin):
                    'suggests recommends requires'.split())
         for arg in filters:
             list_parser.add_argument('--' + arg, dest='filter_' + arg)
+        add_fields_argument(list_parser, LIST_FIELDS)
         list_parser.set_defaults(func=self.rpm_list)
 
         info_parser = self.add_action('info', help='display details of an RPM')
@@ -66,12 +73,16 @@ class RPMPlugin(PDCClientPlugin):
         filters = extract_arguments(args, prefix='filter_')
         if not filters:
             self.subparsers.choices.get('list').error('At least some filter must be used.')
-        rpms = self.client.get_paged(self.client.rpms._, **filters)
+        rpms = self.client.get_paged(self.client.rpms._, fields=requested_fields(args), **filters)
 
         if args.json:
             print(self.to_json(list(rpms)))
             return
 
+        if args.fields:
+            print_fields_table(rpms, args.fields)
+            return
+
         start_line = True
         for rpm in rpms:
             if start_line:
@@ -0,0 +1,90 @@
+#
+# Copyright (c) 2018 Red Hat
+# Licensed under The MIT License (MIT)
+# http://opensource.org/licenses/MIT
+#
+"""
+Client-side limit of requests sent to the server.
+"""
+
+import threading
+import time
+
+# Not affected by changes of system time, if available.
+_clock = getattr(time, 'monotonic', time.time)
+
+
+class RateLimiter(object):
+    """
+    Limits number of requests per second with a token bucket and number of
+    requests waiting for response at once.
+
+    The bucket holds up to ``burst`` tokens and is refilled with ``rate``
+    tokens per second. Each request takes one token; if there is none, the
+    request waits until its token is refilled. Requests are let through in
+    the order they arrived. Use the limiter as a context manager around each
+    request; it is safe to share it between threads.
+
+    :param rate:          requests per second; None for no limit
+    :param burst:         size of the bucket; defaults to ``rate`` (but at
+                          least one request)
+    :param max_in_flight: maximum number of concurrent requests; None for no
+                          limit
+
+    Number of delayed requests (``delayed``) and seconds spent waiting
+    (``wait``) are counted in ``stats``.
+    """
+    def __init__(self, rate=None, burst=None, max_in_flight=None):
+        self.rate = rate
+        self.burst = max(1.0, rate or 0) if burst is None else burst
+        self.max_in_flight = max_in_flight
+        self.tokens = self.burst
+        self.updated = _clock()
+        self.in_flight = 0
+        self.stats = {'delayed': 0, 'wait': 0.0}
+        self.condition = threading.Condition()
+
+    def _reserve(self):
+        """
+        Take a token and return number of seconds to wait for it.
+        """
+        now = _clock()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        # Tokens can go negative, which reserves them for waiting requests.
+        self.tokens -= 1
+        return max(0.0, -self.tokens / self.rate)
+
+    def acquire(self):
+        start = _clock()
+        delay = 0.0
+        with self.condition:
+            if self.rate:
+                delay = self._reserve()
+        if delay:
+            self.sleep(delay)
+        with self.condition:
+            blocked = False
+            if self.max_in_flight:
+                while self.in_flight >= self.max_in_flight:
+                    blocked = True
+                    self.condition.wait()
+            self.in_flight += 1
+            if delay or blocked:
+                self.stats['delayed'] += 1
+                self.stats['wait'] += _clock() - start
+
+    def release(self):
+        with self.condition:
+            self.in_flight -= 1
+            self.condition.notify()
+
+    def sleep(self, seconds):
+        time.sleep(seconds)
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.release()
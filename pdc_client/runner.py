@@ -23,8 +23,8 @@ import json
 #
 #     eval "$(register-python-argcomplete pdc)"
 #
-# This is only a temporary solution, when the client is packaged, a completion
-# file should be shipped with it and installed to /etc/bash_completion.d/.
+# Static completion scripts which do not run the client on each completion
+# are generated by `pdc completion generate` (see pdc_client/completion.py).
 try:
     import argcomplete
 except ImportError:
@@ -34,6 +34,7 @@ except ImportError:
             pass
 
 import pdc_client
+from pdc_client import plugin_helpers, plugin_manifest
 
 
 # Default path to plugins. This line will be replaced when installing with real
@@ -52,6 +53,7 @@ DEFAULT_PLUGINS = [
     'base_product.py',
     'build_image_rtt_tests.py',
     'build_images.py',
+    'completion.py',
     'component.py',
     'compose_image_rtt_tests.py',
     'compose.py',
@@ -72,13 +74,21 @@ DEFAULT_PLUGINS = [
 CONFIG_PLUGINS_KEY_NAME = 'plugins'
 
 
+class _CommandFinder(argparse.ArgumentParser):
+    """Parser of global options only, used to find the requested command."""
+    def error(self, message):
+        raise ValueError(message)
+
+
 class Runner(object):
     def __init__(self):
         self.raw_plugins = []
         self.plugins = []
+        self.command = None
+        self._client = None
         self.logger = logging.getLogger('pdc')
 
-    def load_plugins(self):
+    def load_plugins(self, all_plugins=False):
         config = None
         server = None
         idx_s, idx_server = (None, None)
@@ -110,26 +120,63 @@ class Runner(object):
                 raise TypeError('Plugins must be a list')
             plugins_set.update(set(plugins))
 
+        # Plugins listed in a manifest are loaded only if they provide the
+        # requested command. Help and completion need all of them.
+        command = self.command = None if all_plugins else self._requested_command(args)
+        skipped = []
         for dir in PLUGIN_DIRS:
             self.logger.debug('Loading plugins from {0}'.format(dir))
+            manifest = plugin_manifest.load_manifest(dir) if command else None
+            lazy = set(manifest.values()) if manifest else set()
             for name in os.listdir(dir):
                 if not name.endswith('.py') or name not in plugins_set:
                     continue
-                try:
-                    module_name = name[:-3]
-                    file, pathname, description = imp.find_module(module_name, [dir])
-                    plugin = imp.load_module(module_name, file, pathname, description)
-                    self.logger.debug('Loaded plugin {0}'.format(module_name))
-                    self.raw_plugins.append(plugin)
-                    if hasattr(plugin, 'PLUGIN_CLASSES'):
-                        for p in plugin.PLUGIN_CLASSES:
-                            self.logger.debug('Instantiating {0}'.format(p.__name__))
-                            self.plugins.append(p(self))
-                except Exception as e:
-                    self.logger.error('Failed to load plugin "{0}": {1}'.format(module_name, e))
-                finally:
-                    if file:
-                        file.close()
+                if name in lazy and manifest.get(command) != name:
+                    skipped.append((dir, name))
+                    continue
+                self._load_plugin(dir, name)
+
+        if skipped and not any(plugin.command == command for plugin in self.plugins):
+            # Unknown command or outdated manifest.
+            self.logger.debug('Command {0} not found in manifest'.format(command))
+            for dir, name in skipped:
+                self._load_plugin(dir, name)
+
+    def _load_plugin(self, dir, name):
+        file = None
+        try:
+            module_name = name[:-3]
+            file, pathname, description = imp.find_module(module_name, [dir])
+            plugin = imp.load_module(module_name, file, pathname, description)
+            self.logger.debug('Loaded plugin {0}'.format(module_name))
+            self.raw_plugins.append(plugin)
+            if hasattr(plugin, 'PLUGIN_CLASSES'):
+                for p in plugin.PLUGIN_CLASSES:
+                    self.logger.debug('Instantiating {0}'.format(p.__name__))
+                    self.plugins.append(p(self))
+        except Exception as e:
+            self.logger.error('Failed to load plugin "{0}": {1}'.format(module_name, e))
+        finally:
+            if file:
+                file.close()
+
+    def _requested_command(self, args):
+        """
+        Return command given on command line or None if it is missing or all
+        commands are needed (for completion).
+        """
+        if '_ARGCOMPLETE' in os.environ:
+            return None
+        parser = _CommandFinder(add_help=False)
+        self._add_global_arguments(parser)
+        try:
+            remaining = parser.parse_known_args(args)[1]
+        except ValueError:
+            return None
+        for arg in remaining:
+            if not arg.startswith('-'):
+                return arg
+        return None
 
     def run_hook(self, hook, *args, **kwargs):
         """
@@ -145,38 +192,66 @@ class Runner(object):
     def setup(self):
         self.load_plugins()
 
-        self.parser = argparse.ArgumentParser(description='PDC Client')
-        self.parser.add_argument('-s', '--server', default='stage',
-                                 help='API URL or shortcut from config file')
+        # Only the requested command needs its arguments. All commands are
+        # registered for help, completion and unknown commands.
+        plugins = sorted(self.plugins)
+        requested = [plugin for plugin in plugins if plugin.command == self.command]
+        self.parser = self.build_parser(requested or plugins)
+
+        argcomplete.autocomplete(self.parser)
+
+    def build_parser(self, plugins):
+        """Return parser with global options and commands of given plugins."""
+        parser = argparse.ArgumentParser(description='PDC Client')
+        self._add_global_arguments(parser)
+
+        subparsers = parser.add_subparsers(metavar='COMMAND')
+        subparsers.required = True
 
-        ssl_group = self.parser.add_mutually_exclusive_group()
+        for plugin in plugins:
+            plugin._before_register(subparsers)
+            plugin.register()
+
+        return parser
+
+    def _add_global_arguments(self, parser):
+        parser.add_argument('-s', '--server', default='stage',
+                            help='API URL or shortcut from config file')
+
+        ssl_group = parser.add_mutually_exclusive_group()
         ssl_group.add_argument('-k', '--insecure', action='store_true',
                                help='Disable SSL certificate verification')
         # ca-cert corresponds to requests session verify attribute:
         # http://docs.python-requests.org/en/master/user/advanced/#ssl-cert-verification
         ssl_group.add_argument("--ca-cert", help="Path to CA certificate file or directory")
 
-        self.parser.add_argument('--debug', action='store_true', help=argparse.SUPPRESS)
-        self.parser.add_argument('--json', action='store_true',
-                                 help='display output as JSON')
-        self.parser.add_argument('--page-size', dest='page_size', type=int,
-                                 help='change page size in response, -1 means that get all pages of data in one request')
-        self.parser.add_argument('--page', dest='page', type=int,
-                                 help='change page in response')
-        self.parser.add_argument('--version', action='version',
-                                 version='%(prog)s ' + pdc_client.__version__)
-
-        subparsers = self.parser.add_subparsers(metavar='COMMAND')
-        subparsers.required = True
+        parser.add_argument('--debug', action='store_true', help=argparse.SUPPRESS)
+        parser.add_argument('--json', action='store_true',
+                            help='display output as JSON')
+        parser.add_argument('--page-size', dest='page_size', type=int,
+                            help='change page size in response, -1 means that get all pages of data in one request')
+        parser.add_argument('--page', dest='page', type=int,
+                            help='change page in response')
+        parser.add_argument('--prefetch', dest='prefetch', type=int, metavar='N',
+                            help='retrieve up to N pages ahead concurrently when listing')
+        parser.add_argument('--rate-limit', dest='rate_limit', type=float, metavar='N',
+                            help='send at most N requests per second')
+        parser.add_argument('--max-in-flight', dest='max_in_flight', type=int, metavar='N',
+                            help='wait for responses of at most N requests at once')
+        parser.add_argument('--stats', action='store_true',
+                            help='print statistics of requests to standard error output')
+        parser.add_argument('--stats-json', dest='stats_json', metavar='FILE',
+                            help='write all requests and their statistics to FILE as JSON')
+        parser.add_argument('--version', action=plugin_helpers.VersionAction)
 
-        for plugin in sorted(self.plugins):
-            plugin._before_register(subparsers)
-            plugin.register()
+    @property
+    def client(self):
+        """Client connected to the server, created when first needed."""
+        if self._client is None:
+            self._client = self._connect()
+        return self._client
 
-        argcomplete.autocomplete(self.parser)
-
-    def run(self, args=None):
-        self.args = self.parser.parse_args(args=args)
+    def _connect(self):
         if self.args.insecure:
             requests.packages.urllib3.disable_warnings(
                 requests.packages.urllib3.exceptions.InsecureRequestWarning)
@@ -187,11 +262,18 @@ class Runner(object):
             ssl_verify = None
 
         try:
-            self.client = pdc_client.PDCClientWithPage(self.args.server, page_size=self.args.page_size, ssl_verify=ssl_verify, page=self.args.page)
+            return pdc_client.PDCClientWithPage(self.args.server, page_size=self.args.page_size, ssl_verify=ssl_verify, page=self.args.page,
+                                                prefetch=self.args.prefetch, rate_limit=self.args.rate_limit,
+                                                max_in_flight=self.args.max_in_flight,
+                                                stats_records=-1 if self.args.stats_json else None)
         except pdc_client.config.ServerConfigError as e:
             self.logger.error(e)
             sys.exit(1)
 
+    def run(self, args=None):
+        self.args = self.parser.parse_args(args=args)
+        self._client = None
+
         try:
             self.args.func(self.args)
         except beanbag.BeanBagException as ex:
@@ -209,3 +291,16 @@ class Runner(object):
                 # response was not JSON
                 print('Failed to parse error response.', file=sys.stderr)
             sys.exit(1)
+        finally:
+            self._report_stats()
+
+    def _report_stats(self):
+        if self._client is None:
+            # No request was sent.
+            return
+        if self.args.stats:
+            print('', file=sys.stderr)
+            self.client.stats.print_summary(sys.stderr)
+        if self.args.stats_json:
+            with open(self.args.stats_json, 'w') as stats_file:
+                self.client.stats.dump(stats_file)
@@ -0,0 +1,75 @@
+#
+# Copyright (c) 2018 Red Hat
+# Licensed under The MIT License (MIT)
+# http://opensource.org/licenses/MIT
+#
+"""
+Coalescing of identical requests sent concurrently from multiple threads.
+"""
+
+import copy
+import threading
+
+
+class _Call(object):
+    def __init__(self):
+        self.done = threading.Event()
+        self.waiters = 0
+        self.result = None
+        self.error = None
+
+
+class SingleFlight(object):
+    """
+    While a call with some key is in progress, other calls with the same key
+    wait for it and get copies of its result (or its exception) instead of
+    running again.
+
+    ``coalesced`` is the number of calls which did not run.
+    """
+    def __init__(self):
+        self.calls = {}
+        self.coalesced = 0
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def key(method, url, params):
+        query = tuple(sorted((name, repr(value)) for name, value in params.items()
+                             if value is not None))
+        return method, url.rstrip('/'), query
+
+    def do(self, key, fn):
+        """
+        Return result of ``fn()`` or of the call with the same key which is
+        already in progress.
+        """
+        with self.lock:
+            call = self.calls.get(key)
+            if call is None:
+                call = self.calls[key] = _Call()
+                leader = True
+            else:
+                call.waiters += 1
+                self.coalesced += 1
+                leader = False
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return copy.deepcopy(call.result)
+
+        try:
+            result = fn()
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self.lock:
+                del self.calls[key]
+                waiters = call.waiters
+            if waiters and call.error is None:
+                # The caller may modify the result before the waiters copy it.
+                call.result = copy.deepcopy(result)
+            call.done.set()
+        return result
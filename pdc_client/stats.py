@@ -0,0 +1,237 @@
+#
+# Copyright (c) 2018 Red Hat
+# Licensed under The MIT License (MIT)
+# http://opensource.org/licenses/MIT
+#
+"""
+Statistics of requests sent by :class:`pdc_client.PDCClient`.
+"""
+
+from __future__ import print_function
+
+import json
+import math
+import threading
+import time
+from bisect import bisect_left, insort
+from collections import deque
+
+from .compat import urlsplit
+
+# Not affected by changes of system time, if available.
+_clock = getattr(time, 'monotonic', time.time)
+
+# Resources which are not collections of objects; their paths are kept.
+PLAIN_RESOURCES = ('auth', 'rpc')
+
+# Number of last requests kept in records.
+DEFAULT_MAX_RECORDS = 1000
+# Number of last latencies of each method and resource used for percentiles.
+DEFAULT_LATENCY_WINDOW = 1000
+
+# Key, title, alignment and width, and format of value of summary columns.
+SUMMARY_COLUMNS = (
+    ('method', 'Method', '<7', ''),
+    ('resource', 'Resource', '<32', ''),
+    ('requests', 'Requests', '>8', 'd'),
+    ('pages', 'Pages', '>6', 'd'),
+    ('errors', 'Errors', '>6', 'd'),
+    ('hedged', 'Hedged', '>6', 'd'),
+    ('bytes_out', 'Sent B', '>10', 'd'),
+    ('bytes_in', 'Received B', '>11', 'd'),
+    ('total', 'Total s', '>8', '.2f'),
+    ('mean', 'Mean ms', '>8', '.1f'),
+    ('p50', 'p50 ms', '>8', '.1f'),
+    ('p95', 'p95 ms', '>8', '.1f'),
+    ('p99', 'p99 ms', '>8', '.1f'),
+    ('max', 'Max ms', '>8', '.1f'),
+)
+
+
+def percentile(values, percent):
+    """
+    Return the nearest-rank percentile of sorted non-empty list of values.
+    """
+    rank = int(math.ceil(len(values) * percent / 100.0))
+    return values[max(0, min(len(values), rank) - 1)]
+
+
+class LatencyWindow(object):
+    """
+    Last ``size`` latencies, kept also sorted so that a percentile is
+    looked up without sorting them.
+    """
+    def __init__(self, size):
+        self.size = size
+        self.recent = deque()
+        self.sorted = []
+
+    def __len__(self):
+        return len(self.recent)
+
+    def add(self, latency):
+        if len(self.recent) >= self.size:
+            oldest = self.recent.popleft()
+            del self.sorted[bisect_left(self.sorted, oldest)]
+        self.recent.append(latency)
+        insort(self.sorted, latency)
+
+    def percentile(self, percent):
+        return percentile(self.sorted, percent)
+
+
+class RequestStats(object):
+    """
+    Counts requests sent to the server by method and resource and records
+    method, resource, status code, latency and size of the last
+    ``max_records`` of them (all of them if None).
+
+    Each record is a dict with keys ``method``, ``url``, ``resource`` (path
+    relative to API root with object identifiers replaced by ``{id}``),
+    ``status`` (None if no response was received), ``start`` and
+    ``latency`` in seconds, ``bytes_out`` and ``bytes_in`` (size of request
+    and response body), ``pages`` (1 if the response is a page of
+    results) and ``hedge`` (True if the request is a duplicate of a slow
+    request, see :class:`pdc_client.transport.HedgePolicy`).
+
+    Latency percentiles are computed from the last ``latency_window``
+    requests with each method and resource.
+    """
+    def __init__(self, root_url, max_records=DEFAULT_MAX_RECORDS,
+                 latency_window=DEFAULT_LATENCY_WINDOW):
+        self.root_path = urlsplit(root_url).path.rstrip('/') + '/'
+        self.latency_window = latency_window
+        self.records = deque(maxlen=max_records)
+        self.started = _clock()
+        self.lock = threading.Lock()
+        self._groups = {}
+
+    def resource(self, url):
+        """
+        Return resource path of given URL with identifiers of objects
+        replaced by ``{id}``. Identifiers are expected at every other
+        position, e.g. ``global-components/{id}/contacts/{id}``.
+        """
+        path = urlsplit(url).path
+        if path.startswith(self.root_path):
+            path = path[len(self.root_path):]
+        parts = [part for part in path.split('/') if part]
+        if parts and parts[0] not in PLAIN_RESOURCES:
+            parts = [part if i % 2 == 0 else '{id}' for i, part in enumerate(parts)]
+        return '/'.join(parts)
+
+    def record(self, method, url, status, start, latency, bytes_out, bytes_in, hedge=False):
+        """
+        Store new record and return it.
+        """
+        entry = {
+            'method': method,
+            'url': url,
+            'resource': self.resource(url),
+            'status': status,
+            'start': start - self.started,
+            'latency': latency,
+            'bytes_out': bytes_out,
+            'bytes_in': bytes_in,
+            'pages': 0,
+            'hedge': hedge,
+        }
+        failed = status is None or status >= 400
+        with self.lock:
+            group = self._group(method, entry['resource'])
+            group['requests'] += 1
+            group['errors'] += failed
+            group['hedged'] += hedge
+            group['bytes_out'] += bytes_out
+            group['bytes_in'] += bytes_in
+            group['total'] += latency
+            group['max'] = max(group['max'], latency)
+            group['latencies'].add(latency)
+            if not failed:
+                group['successful'].add(latency)
+            self.records.append(entry)
+        return entry
+
+    def _group(self, method, resource):
+        key = (method, resource)
+        if key not in self._groups:
+            self._groups[key] = {
+                'requests': 0, 'pages': 0, 'errors': 0, 'hedged': 0, 'bytes_out': 0,
+                'bytes_in': 0, 'total': 0.0, 'max': 0.0,
+                'latencies': LatencyWindow(self.latency_window),
+                'successful': LatencyWindow(self.latency_window),
+            }
+        return self._groups[key]
+
+    def add_page(self, entry):
+        """
+        Mark recorded request as one which retrieved a page of results.
+        """
+        with self.lock:
+            if not entry['pages']:
+                entry['pages'] = 1
+                self._group(entry['method'], entry['resource'])['pages'] += 1
+
+    def latency_percentile(self, method, resource, percent, min_samples=1):
+        """
+        Return percentile of latencies of last successful requests with
+        given method and resource or None if there are less than
+        ``min_samples`` of them.
+        """
+        with self.lock:
+            group = self._groups.get((method, resource))
+            if group is None or len(group['successful']) < max(1, min_samples):
+                return None
+            return group['successful'].percentile(percent)
+
+    def clear(self):
+        with self.lock:
+            self.records.clear()
+            self._groups.clear()
+
+    def summary(self):
+        """
+        Return list of dicts with totals and latency percentiles (in
+        milliseconds) for each method and resource, sorted by total time
+        spent.
+        """
+        summary = []
+        with self.lock:
+            for (method, resource), group in self._groups.items():
+                latencies = group['latencies']
+                summary.append({
+                    'method': method,
+                    'resource': resource,
+                    'requests': group['requests'],
+                    'pages': group['pages'],
+                    'errors': group['errors'],
+                    'hedged': group['hedged'],
+                    'bytes_out': group['bytes_out'],
+                    'bytes_in': group['bytes_in'],
+                    'total': group['total'],
+                    'mean': group['total'] * 1000 / group['requests'],
+                    'p50': latencies.percentile(50) * 1000,
+                    'p95': latencies.percentile(95) * 1000,
+                    'p99': latencies.percentile(99) * 1000,
+                    'max': group['max'] * 1000,
+                })
+        summary.sort(key=lambda item: item['total'], reverse=True)
+        return summary
+
+    def print_summary(self, file):
+        """
+        Print summary as a table.
+        """
+        print(' '.join(format(title, width) for _, title, width, _ in SUMMARY_COLUMNS), file=file)
+        for item in self.summary():
+            print(' '.join(format(item[key], width + fmt)
+                           for key, _, width, fmt in SUMMARY_COLUMNS), file=file)
+
+    def dump(self, file):
+        """
+        Write kept records and summary as JSON.
+        """
+        with self.lock:
+            records = list(self.records)
+        json.dump({'requests': records, 'summary': self.summary()}, file,
+                  indent=2, sort_keys=True)
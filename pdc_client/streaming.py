@@ -0,0 +1,116 @@
+#
+# Copyright (c) 2018 Red Hat
+# Licensed under The MIT License (MIT)
+# http://opensource.org/licenses/MIT
+#
+"""
+Incremental decoding of large JSON responses.
+
+When all objects of a resource are requested at once (``page_size=-1``),
+the response is a single JSON array which can be too large to keep in
+memory together with the decoded objects. :func:`decode_stream` decodes the
+items of the array one by one as the body is received.
+"""
+
+import codecs
+import json
+
+CHUNK_SIZE = 64 * 1024
+WHITESPACE = ' \t\n\r'
+# Characters which can follow a complete value inside an array or object.
+DELIMITERS = WHITESPACE + ',]}'
+
+
+class _Reader(object):
+    """
+    Buffer of text decoded from chunks of bytes.
+    """
+    def __init__(self, chunks, encoding):
+        self.chunks = iter(chunks)
+        self.text_decoder = codecs.getincrementaldecoder(encoding)()
+        self.json_decoder = json.JSONDecoder()
+        self.buf = ''
+        self.pos = 0
+        self.eof = False
+
+    def fill(self):
+        """
+        Append next chunk to the buffer, drop the consumed part of it.
+        """
+        if self.eof:
+            return
+        try:
+            chunk = next(self.chunks)
+        except StopIteration:
+            chunk = b''
+            self.eof = True
+        self.buf = self.buf[self.pos:] + self.text_decoder.decode(chunk, final=self.eof)
+        self.pos = 0
+
+    def peek(self):
+        """
+        Skip whitespace and return next character or empty string at the end.
+        """
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buf) or self.eof:
+                return self.buf[self.pos:self.pos + 1]
+            self.fill()
+
+    def expect(self, chars):
+        char = self.peek()
+        if not char or char not in chars:
+            raise ValueError('Expecting one of %r at position %d' % (chars, self.pos))
+        self.pos += 1
+        return char
+
+    def decode_value(self):
+        """
+        Decode next JSON value, reading as many chunks as needed.
+        """
+        self.peek()
+        while True:
+            try:
+                value, end = self.json_decoder.raw_decode(self.buf, self.pos)
+            except ValueError:
+                if self.eof:
+                    raise
+                self.fill()
+                continue
+            # A number may continue in the next chunk (e.g. "1." and "5").
+            if self.eof or (end < len(self.buf) and self.buf[end] in DELIMITERS):
+                self.pos = end
+                return value
+            self.fill()
+
+    def iter_array(self):
+        self.expect('[')
+        if self.peek() == ']':
+            self.pos += 1
+        else:
+            while True:
+                yield self.decode_value()
+                if self.expect(',]') == ']':
+                    break
+        if self.peek():
+            raise ValueError('Extra data at position %d' % self.pos)
+
+
+def decode_stream(chunks, encoding='utf-8'):
+    """
+    Decode JSON document from iterable of byte chunks.
+
+    If the document is an array, return an iterator which decodes and yields
+    its items one at a time, reading only as many chunks as needed.
+    Otherwise the whole document is read and the decoded value returned.
+
+    :raises ValueError: if the document is not valid JSON
+    """
+    reader = _Reader(chunks, encoding)
+    if reader.peek() == '[':
+        return reader.iter_array()
+    value = reader.decode_value()
+    if reader.peek():
+        raise ValueError('Extra data at position %d' % reader.pos)
+    return value
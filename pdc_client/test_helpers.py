@@ -15,7 +15,9 @@ import json
 import itertools
 
 # Python 3 compatibility
+from pdc_client import _set_projection
 from pdc_client.compat import StringIO
+from pdc_client.stats import RequestStats
 
 
 class PathAccumulator(object):
@@ -63,15 +65,21 @@ class MockAPI(object):
         (POST,   {request data})
         (PATCH,  {request data})
         (DELETE, {request data})
+
+    Each call is also recorded in `stats`.
     """
+    url = 'http://localhost/rest_api/v1/'
+
     def __init__(self):
         self.endpoints = {}
         self.calls = {}
         self.page = None
         self.page_size = None
+        self.stats = RequestStats(self.url)
 
     def get_paged(self, res, **kwargs):
         """ """
+        _set_projection(kwargs)
         if self.page_size is not None:
             if self.page_size <= 0:
                 # If page_size <= 0, pagination will be disable.
@@ -95,6 +103,19 @@ class MockAPI(object):
 
         return itertools.chain.from_iterable(worker())
 
+    def count(self, res, **filters):
+        return res(page_size=1, **filters)['count']
+
+    def exists(self, res, **filters):
+        return self.count(res, **filters) > 0
+
+    def first(self, res, **filters):
+        return self.count_and_first(res, **filters)[1]
+
+    def count_and_first(self, res, **filters):
+        page = res(page_size=1, **filters)
+        return page['count'], page['results'][0] if page['results'] else None
+
     def add_endpoint(self, resource, method, data):
         """Add allowed point of connection.
 
@@ -122,13 +143,13 @@ class MockAPI(object):
     def __call__(self, *args, **kwargs):
         if len(args) == 2:
             if args[0] == 'PATCH':
-                return self._handle_patch(args[1])
+                return self._record('PATCH', self._handle_patch(args[1]))
             elif args[0] == 'DELETE':
-                return self._handle_delete(args[1])
+                return self._record('DELETE', self._handle_delete(args[1]))
         if len(args) == 1:
-            return self._handle_post(args[0])
+            return self._record('POST', self._handle_post(args[0]))
         elif len(args) == 0:
-            return self._handle_get(kwargs)
+            return self._record('GET', self._handle_get(kwargs))
 
     def results(self, *args, **kwargs):
         def worker():
@@ -145,6 +166,13 @@ class MockAPI(object):
 
         return itertools.chain.from_iterable(worker())
 
+    def _record(self, method, response):
+        entry = self.stats.record(method, self.url + self.will_call + '/', 200,
+                                  self.stats.started, 0, 0, 0)
+        if isinstance(response, dict) and 'results' in response:
+            self.stats.add_page(entry)
+        return response
+
     def _handle_post(self, data):
         self.calls.setdefault(self.will_call, []).append(('POST', data))
         data = self.endpoints[self.will_call]['POST']
@@ -167,10 +195,11 @@ class MockAPI(object):
         page_size = filters.get('page_size', 20)
         if isinstance(data, list) and page_size > 0:
             page = filters.get('page', 1)
-            pages = int(math.ceil(float(len(data)) / page_size))
+            count = len(data)
+            pages = int(math.ceil(float(count) / page_size))
             data = data[(page - 1) * page_size:(page - 1) * page_size + page_size]
             return {
-                'count': len(data),
+                'count': count,
                 'next': None if (page == pages or not pages) else self._fmt_url(page + 1),
                 'previous': None if (page == 1 or not pages) else self._fmt_url(page - 1),
                 'results': data
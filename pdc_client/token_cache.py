@@ -0,0 +1,120 @@
+#
+# Copyright (c) 2018 Red Hat
+# Licensed under The MIT License (MIT)
+# http://opensource.org/licenses/MIT
+#
+
+import errno
+import json
+import logging
+import os
+import subprocess
+import tempfile
+
+logger = logging.getLogger(__name__)
+
+KLIST_PRINCIPAL_PREFIX = 'Default principal:'
+
+
+def _klist_principal():
+    try:
+        with open(os.devnull, 'w') as devnull:
+            klist = subprocess.Popen(['klist'], stdout=subprocess.PIPE, stderr=devnull,
+                                     universal_newlines=True, env=dict(os.environ, LC_ALL='C'))
+            output = klist.communicate()[0]
+    except (IOError, OSError):
+        return None
+    if klist.returncode != 0:
+        return None
+    for line in output.splitlines():
+        if line.startswith(KLIST_PRINCIPAL_PREFIX):
+            return line[len(KLIST_PRINCIPAL_PREFIX):].strip() or None
+    return None
+
+
+def current_principal():
+    """
+    Return name of Kerberos principal from the credential cache in use
+    (the default one or the one in ``KRB5CCNAME``), which is found by
+    python-gssapi or by running ``klist``.
+
+    None is returned if the principal cannot be found (there is no valid
+    ticket), in which case tokens should not be cached.
+    """
+    try:
+        import gssapi
+    except ImportError:
+        return _klist_principal()
+    try:
+        return str(gssapi.Credentials(usage='initiate').name)
+    except Exception:
+        return None
+
+
+class TokenCache(object):
+    """
+    Stores tokens obtained from servers in a file readable only by the user.
+
+    Each entry is identified by server URL and Kerberos principal and can
+    contain ``token`` and ``end_point`` that was used to obtain it. Failures
+    to read or write the file are logged and otherwise ignored.
+    """
+    def __init__(self, path):
+        self.path = path
+
+    @staticmethod
+    def _key(url, principal):
+        return '%s %s' % (url, principal)
+
+    def _read(self):
+        try:
+            with open(self.path, 'r') as cache_file:
+                data = json.load(cache_file)
+        except (IOError, OSError) as e:
+            if e.errno != errno.ENOENT:
+                logger.warning('Failed to read token cache %s: %s', self.path, e)
+            return {}
+        except ValueError as e:
+            logger.warning('Ignoring corrupted token cache %s: %s', self.path, e)
+            return {}
+        return data if isinstance(data, dict) else {}
+
+    def _write(self, data):
+        cache_dir = os.path.dirname(self.path)
+        tmp_path = None
+        try:
+            if not os.path.isdir(cache_dir):
+                os.makedirs(cache_dir, 0o700)
+            # Created with mode 0600 and a name unique also among threads.
+            fd, tmp_path = tempfile.mkstemp(dir=cache_dir, prefix='.' + os.path.basename(self.path),
+                                            suffix='.tmp')
+            with os.fdopen(fd, 'w') as cache_file:
+                json.dump(data, cache_file, indent=2, sort_keys=True)
+            os.rename(tmp_path, self.path)
+        except (IOError, OSError) as e:
+            logger.warning('Failed to write token cache %s: %s', self.path, e)
+            if tmp_path is not None:
+                try:
+                    os.remove(tmp_path)
+                except OSError:
+                    pass
+
+    def get(self, url, principal):
+        """
+        Return dict with cached data for given server and principal.
+        """
+        return self._read().get(self._key(url, principal), {})
+
+    def update(self, url, principal, **kwargs):
+        """
+        Update cached data for given server and principal.
+
+        Keys with None value are removed from the entry.
+        """
+        data = self._read()
+        entry = data.setdefault(self._key(url, principal), {})
+        entry.update(kwargs)
+        for key, value in list(entry.items()):
+            if value is None:
+                del entry[key]
+        self._write(data)
@@ -0,0 +1,405 @@
+#
+# Copyright (c) 2018 Red Hat
+# Licensed under The MIT License (MIT)
+# http://opensource.org/licenses/MIT
+#
+"""
+Transport adapter used for all requests of :class:`pdc_client.PDCClient`.
+
+Besides connection pool and timeout settings, the adapter retries
+idempotent requests failed with a temporary error according to
+:class:`RetryPolicy` and sends duplicates of slow requests according to
+:class:`HedgePolicy`. :class:`ThreadLocalSession` sends requests from each
+thread through a separate session.
+"""
+
+import calendar
+import email.utils
+import logging
+import random
+import threading
+import time
+
+from requests import Session
+from requests.adapters import DEFAULT_POOLBLOCK, DEFAULT_POOLSIZE, DEFAULT_RETRIES, HTTPAdapter
+from requests.exceptions import ConnectionError, Timeout
+
+from .stats import _clock
+
+try:
+    from queue import Empty, Queue
+except ImportError:
+    from Queue import Empty, Queue
+
+# Configuration of ThreadLocalSession used by sessions of all threads.
+SHARED_SESSION_ATTRS = ('headers', 'auth', 'proxies', 'hooks', 'params', 'verify', 'cert',
+                        'adapters', 'stream', 'trust_env', 'max_redirects')
+
+IDEMPOTENT_METHODS = frozenset(['GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'])
+# Too Many Requests, Bad Gateway, Service Unavailable, Gateway Timeout
+RETRY_STATUSES = frozenset([429, 502, 503, 504])
+
+logger = logging.getLogger(__name__)
+
+
+def _parse_retry_after(value):
+    """
+    Return number of seconds from Retry-After header value (either seconds
+    or HTTP date) or None if it cannot be parsed.
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return int(value)
+    date = email.utils.parsedate_tz(value)
+    if date is None:
+        return None
+    return max(0, email.utils.mktime_tz(date) - calendar.timegm(time.gmtime()))
+
+
+class RetryPolicy(object):
+    """
+    Decides whether and when a failed request is retried.
+
+    Requests with idempotent method are retried if the connection fails or
+    times out or if the server answers with one of ``statuses``. The delay
+    before the n-th retry is chosen randomly between zero and
+    ``backoff * 2 ** (n - 1)`` seconds, but at most ``max_backoff`` seconds
+    (exponential backoff with full jitter). If the server sends
+    ``Retry-After`` header, its value is used instead.
+
+    :param retries:     maximum number of retries of single request
+    :param backoff:     base delay in seconds
+    :param max_backoff: maximum delay in seconds
+    :param budget:      maximum number of seconds spent on single request
+                        including retries; no retry is attempted if it
+                        would exceed the budget
+    :param statuses:    response status codes to retry
+    :param methods:     request methods to retry
+    """
+    def __init__(self, retries=3, backoff=0.5, max_backoff=30, budget=120,
+                 statuses=RETRY_STATUSES, methods=IDEMPOTENT_METHODS):
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.budget = budget
+        self.statuses = frozenset(statuses)
+        self.methods = frozenset(method.upper() for method in methods)
+
+    @classmethod
+    def from_config(cls, config):
+        """
+        Create policy from ``retry`` object of server configuration, which
+        can contain keys ``retries``, ``backoff``, ``max-backoff``,
+        ``budget``, ``statuses`` and ``methods``.
+        """
+        kwargs = dict((key.replace('-', '_'), value) for key, value in config.items())
+        return cls(**kwargs)
+
+    def delay(self, retry, response=None):
+        """
+        Return number of seconds to wait before given retry (counted from 1).
+        """
+        if response is not None:
+            retry_after = _parse_retry_after(response.headers.get('Retry-After'))
+            if retry_after is not None:
+                return retry_after
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** (retry - 1)))
+
+    def sleep(self, seconds):
+        time.sleep(seconds)
+
+
+class HedgePolicy(object):
+    """
+    Decides when a duplicate (hedge) of a slow request is sent.
+
+    If no response to a request with one of ``methods`` arrives within the
+    delay, the same request is sent again and the response which arrives
+    first is used. The delay is either fixed (``delay`` seconds) or the
+    ``percentile`` of latencies of last ``window`` successful requests to
+    the same resource recorded in statistics (see ``latency_window`` of
+    :class:`pdc_client.stats.RequestStats`). No hedge is sent until there
+    are at least ``min_samples`` such requests. Streamed responses are
+    never hedged.
+
+    :param delay:       fixed delay in seconds; None to use the percentile
+    :param percentile:  percentile of observed latencies used as delay
+    :param min_samples: minimum number of observed latencies
+    :param window:      number of last successful requests considered;
+                        :class:`pdc_client.PDCClient` keeps latencies of
+                        this many requests to each resource
+    :param methods:     request methods to hedge
+    """
+    def __init__(self, delay=None, percentile=95, min_samples=20, window=1000,
+                 methods=('GET',)):
+        self.fixed_delay = delay
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.window = window
+        self.methods = frozenset(method.upper() for method in methods)
+
+    @classmethod
+    def from_config(cls, config):
+        """
+        Create policy from ``hedge`` value of server configuration, which
+        is either the delay in seconds or an object with keys ``delay``,
+        ``percentile``, ``min-samples``, ``window`` and ``methods``.
+        """
+        if not isinstance(config, dict):
+            return cls(delay=config)
+        kwargs = dict((key.replace('-', '_'), value) for key, value in config.items())
+        return cls(**kwargs)
+
+    def delay(self, request, stats=None):
+        """
+        Return number of seconds to wait before hedging the request or None
+        if it should not be hedged.
+        """
+        if request.method not in self.methods:
+            return None
+        if self.fixed_delay is not None:
+            return self.fixed_delay
+        if stats is None:
+            return None
+        return stats.latency_percentile(request.method, stats.resource(request.url),
+                                        self.percentile, self.min_samples)
+
+
+class PDCHTTPAdapter(HTTPAdapter):
+    """
+    HTTP adapter with configurable connection pool and default timeouts.
+
+    :param pool_connections: number of connection pools (one per host)
+    :param pool_maxsize:     maximum number of kept-alive connections per host
+    :param max_retries:      number of retries of failed connection attempts
+    :param connect_timeout:  seconds to wait for connection to the server
+    :param read_timeout:     seconds to wait for data from the server
+    :param retry_policy:     :class:`RetryPolicy` for requests failed with
+                             temporary error; None disables retrying
+    :param rate_limiter:     :class:`pdc_client.rate_limit.RateLimiter`
+                             applied to each request sent, including
+                             retries; None for no limit
+    :param stats:            :class:`pdc_client.stats.RequestStats` recording
+                             each request sent, including retries and hedges;
+                             the record is available as ``stats_entry``
+                             attribute of the response
+    :param hedge_policy:     :class:`HedgePolicy` for sending duplicates of
+                             slow requests; None disables hedging
+
+    Timeouts apply to requests that do not specify their own timeout; None
+    means waiting forever.
+
+    Numbers of retried requests (``retries``), of requests which failed even
+    after retrying (``exhausted``) and seconds spent waiting (``wait``) are
+    counted in ``retry_stats``. Numbers of hedges sent (``hedged``) and of
+    hedges which responded first (``won``) are counted in ``hedge_stats``.
+    """
+    __attrs__ = HTTPAdapter.__attrs__ + ['connect_timeout', 'read_timeout', 'retry_policy',
+                                         'hedge_policy']
+
+    def __init__(self, pool_connections=None, pool_maxsize=None, max_retries=None,
+                 pool_block=DEFAULT_POOLBLOCK, connect_timeout=None, read_timeout=None,
+                 retry_policy=None, rate_limiter=None, stats=None, hedge_policy=None):
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.retry_policy = retry_policy
+        self.rate_limiter = rate_limiter
+        self.stats = stats
+        self.hedge_policy = hedge_policy
+        self.retry_stats = {'retries': 0, 'exhausted': 0, 'wait': 0.0}
+        self.hedge_stats = {'hedged': 0, 'won': 0}
+        self._stats_lock = threading.Lock()
+        super(PDCHTTPAdapter, self).__init__(
+            pool_connections=DEFAULT_POOLSIZE if pool_connections is None else pool_connections,
+            pool_maxsize=DEFAULT_POOLSIZE if pool_maxsize is None else pool_maxsize,
+            max_retries=DEFAULT_RETRIES if max_retries is None else max_retries,
+            pool_block=pool_block)
+
+    @property
+    def timeout(self):
+        if self.connect_timeout is None and self.read_timeout is None:
+            return None
+        return (self.connect_timeout, self.read_timeout)
+
+    def __setstate__(self, state):
+        super(PDCHTTPAdapter, self).__setstate__(state)
+        # The limiter and statistics are shared by the adapters of a client,
+        # they are not copied.
+        self.rate_limiter = None
+        self.stats = None
+        self.retry_stats = {'retries': 0, 'exhausted': 0, 'wait': 0.0}
+        self.hedge_stats = {'hedged': 0, 'won': 0}
+        self._stats_lock = threading.Lock()
+
+    def _count(self, counters=None, **kwargs):
+        counters = self.retry_stats if counters is None else counters
+        with self._stats_lock:
+            for key, value in kwargs.items():
+                counters[key] += value
+
+    def _send(self, request, **kwargs):
+        delay = None
+        if self.hedge_policy is not None and not kwargs.get('stream'):
+            delay = self.hedge_policy.delay(request, self.stats)
+        if delay is None:
+            return self._send_limited(request, **kwargs)
+        return self._send_hedged(request, delay, **kwargs)
+
+    def _send_hedged(self, request, delay, **kwargs):
+        """
+        Send the request and its duplicate if there is no response within
+        ``delay`` seconds. Return the first response, or raise the error of
+        the last request if both fail. Response which arrives later is
+        closed.
+        """
+        results = Queue()
+        state = {'done': False}
+        lock = threading.Lock()
+
+        def run(request, hedge):
+            try:
+                result = (hedge, self._send_limited(request, hedge=hedge, **kwargs), None)
+            except Exception as e:
+                result = (hedge, None, e)
+            with lock:
+                if not state['done']:
+                    results.put(result)
+                    return
+            if result[1] is not None:
+                result[1].close()
+
+        def start(request, hedge):
+            thread = threading.Thread(target=run, args=(request, hedge))
+            thread.daemon = True
+            thread.start()
+
+        start(request, False)
+        pending = 1
+        try:
+            hedge, response, error = results.get(timeout=delay)
+        except Empty:
+            self._count(self.hedge_stats, hedged=1)
+            logger.debug('Hedging %s %s after %.3f s', request.method, request.url, delay)
+            start(request.copy(), True)
+            pending = 2
+            hedge, response, error = results.get()
+        pending -= 1
+        if error is not None and pending:
+            hedge, response, error = results.get()
+            pending -= 1
+        with lock:
+            state['done'] = True
+            late = []
+            while not results.empty():
+                late.append(results.get())
+        for _, late_response, _ in late:
+            if late_response is not None:
+                late_response.close()
+        if error is not None:
+            raise error
+        if hedge:
+            self._count(self.hedge_stats, won=1)
+        return response
+
+    def _send_limited(self, request, hedge=False, **kwargs):
+        if self.rate_limiter is None:
+            return self._send_recorded(request, hedge, **kwargs)
+        with self.rate_limiter:
+            return self._send_recorded(request, hedge, **kwargs)
+
+    def _send_recorded(self, request, hedge=False, **kwargs):
+        if self.stats is None:
+            return super(PDCHTTPAdapter, self).send(request, **kwargs)
+
+        bytes_out = len(request.body) if request.body else 0
+        start = _clock()
+        try:
+            response = super(PDCHTTPAdapter, self).send(request, **kwargs)
+            if kwargs.get('stream'):
+                bytes_in = int(response.headers.get('Content-Length') or 0)
+            else:
+                bytes_in = len(response.content)
+        except Exception:
+            self.stats.record(request.method, request.url, None, start, _clock() - start,
+                              bytes_out, 0, hedge=hedge)
+            raise
+        response.stats_entry = self.stats.record(
+            request.method, request.url, response.status_code, start, _clock() - start,
+            bytes_out, bytes_in, hedge=hedge)
+        return response
+
+    def send(self, request, timeout=None, **kwargs):
+        if timeout is None:
+            timeout = self.timeout
+        policy = self.retry_policy
+        if policy is None or policy.retries <= 0 or request.method not in policy.methods:
+            return self._send(request, timeout=timeout, **kwargs)
+
+        start = time.time()
+        retry = 0
+        while True:
+            try:
+                response = self._send(request, timeout=timeout, **kwargs)
+            except (ConnectionError, Timeout) as e:
+                response = None
+                error = e
+                reason = str(e)
+            else:
+                if response.status_code not in policy.statuses:
+                    return response
+                reason = '%s %s' % (response.status_code, response.reason)
+
+            retry += 1
+            delay = policy.delay(retry, response) if retry <= policy.retries else None
+            if delay is None or time.time() - start + delay > policy.budget:
+                self._count(exhausted=1)
+                logger.warning('Giving up %s %s after %d retries in %.1f s: %s',
+                               request.method, request.url, retry - 1, time.time() - start, reason)
+                if response is None:
+                    raise error
+                return response
+
+            logger.info('Retrying %s %s in %.1f s (retry %d of %d): %s',
+                        request.method, request.url, delay, retry, policy.retries, reason)
+            if response is not None:
+                # Read the body to release the connection back to the pool.
+                response.content
+            self._count(retries=1, wait=delay)
+            policy.sleep(delay)
+
+
+class ThreadLocalSession(Session):
+    """
+    Session which sends requests through a separate session for each
+    thread, so that state kept by sessions between requests (cookies,
+    redirect handling) is never shared by threads.
+
+    This session only holds the configuration. Before each request, its
+    attributes listed in ``SHARED_SESSION_ATTRS`` are assigned to the
+    session of current thread, so changes are used by all threads from the
+    next request. Mounted adapters, and so the connection pool, are
+    shared. Replace dicts and lists (e.g. ``headers``) instead of modifying
+    them while other threads may send requests.
+    """
+    def __init__(self):
+        super(ThreadLocalSession, self).__init__()
+        self.local = threading.local()
+
+    def thread_session(self):
+        """
+        Return session of current thread with current configuration.
+        """
+        session = getattr(self.local, 'session', None)
+        if session is None:
+            session = self.local.session = Session()
+        for name in SHARED_SESSION_ATTRS:
+            setattr(session, name, getattr(self, name))
+        return session
+
+    def request(self, *args, **kwargs):
+        return self.thread_session().request(*args, **kwargs)
+
+    def send(self, request, **kwargs):
+        return self.thread_session().send(request, **kwargs)
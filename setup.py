@@ -13,12 +13,14 @@ setup(
     name = 'pdc-client',
     description = 'Client library and console client for Product Definition Center',
     install_requires = [ 'beanbag >= 1.9.2', 'requests-kerberos'],
+    extras_require = {'async': ['aiohttp']},
     version = __version__,
     license = 'MIT',
     download_url = 'https://github.com/product-definition-center/pdc-client/releases',
     url = 'https://github.com/product-definition-center/pdc-client',
     packages = find_packages(exclude=["*.tests", "*.tests.*", "tests.*",
         "tests"]),
+    package_data = {'pdc_client': ['plugins/manifest.json']},
     scripts = ["bin/pdc", "bin/pdc_client"],
     test_suite = "tests",
     classifiers = [
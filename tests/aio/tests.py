@@ -0,0 +1,205 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2018 Red Hat
+# Licensed under The MIT License (MIT)
+# http://opensource.org/licenses/MIT
+#
+"""
+Tests for pdc_client.aio.AsyncPDCClient class.
+"""
+
+try:
+    from BaseHTTPServer import HTTPServer
+except ImportError:
+    from http.server import HTTPServer
+
+import os
+import shutil
+import tempfile
+from threading import Thread
+
+try:
+    # Python 2.6 compatibility
+    import unittest2 as unittest
+except ImportError:
+    import unittest
+
+import mock
+from beanbag import BeanBagException
+from pdc_client import NoResultsError
+
+from tests.api.tests import API_PATH, HTTP_NOT_FOUND, _MockPDCServerRequestHandler
+
+try:
+    import asyncio
+    from pdc_client.aio import AsyncPDCClient
+except (ImportError, SyntaxError):
+    AsyncPDCClient = None
+
+
+@unittest.skipIf(AsyncPDCClient is None, 'requires Python 3.7 and aiohttp')
+class AsyncPDCClientTestCase(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = HTTPServer(('localhost', 0), _MockPDCServerRequestHandler)
+        cls.server_thread = Thread(target=cls.server.serve_forever)
+        cls.server_thread.daemon = True
+        cls.server_thread.start()
+        cls.url = 'http://localhost:{port}{api_path}'.format(
+            port=cls.server.server_address[1],
+            api_path=API_PATH,
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_dir)
+        token_cache_patcher = mock.patch(
+            'pdc_client.TOKEN_CACHE_FILE', os.path.join(cache_dir, 'tokens.json'))
+        token_cache_patcher.start()
+        self.addCleanup(token_cache_patcher.stop)
+
+        self.loop = asyncio.new_event_loop()
+        self.client = AsyncPDCClient(server=self.url, ssl_verify=False)
+
+    def tearDown(self):
+        self.wait(self.client.close())
+        self.loop.close()
+
+    def wait(self, coroutine):
+        return self.loop.run_until_complete(coroutine)
+
+    def collect(self, results):
+        items = []
+        while True:
+            try:
+                items.append(self.wait(results.__anext__()))
+            except StopAsyncIteration:
+                return items
+
+    def test_token(self):
+        self.assertEqual(self.wait(self.client._get_session()), self.client.session)
+        self.assertEqual(self.client.token, '1')
+        self.assertEqual(self.client.headers['Authorization'], 'Token 1')
+
+    def test_get_attr(self):
+        response = self.wait(self.client.products())
+        self.assertEqual(
+            response.get('count'), len(_MockPDCServerRequestHandler.data['products']))
+
+    def test_get_item_item(self):
+        response = self.wait(self.client['products']['fedora']._())
+        self.assertEqual(
+            response, _MockPDCServerRequestHandler.data['products']['fedora'])
+
+    def test_get_item_not_found(self):
+        with self.assertRaises(BeanBagException) as context:
+            self.wait(self.client['bad-resource']._())
+
+        self.assertEqual(
+            context.exception.response.status_code, HTTP_NOT_FOUND)
+
+    def test_patch(self):
+        cpe = self.client.cpes[1]
+        cpe += {'description': 'ASYNC'}
+        self.wait(cpe)
+        self.assertEqual(_MockPDCServerRequestHandler.data['cpes'][1]['description'], 'ASYNC')
+
+        with self.assertRaises(TypeError):
+            self.client.cpes[1] = {}
+
+    def test_set_comment(self):
+        self.client.set_comment('ASYNC')
+        self.wait(self.client.cpes[1]._('PATCH', {'description': 'ASYNC'}))
+        self.assertEqual(_MockPDCServerRequestHandler.last_comment, 'ASYNC')
+
+    def test_str(self):
+        self.assertEqual(str(self.client.products.fedora), self.url + '/products/fedora')
+        self.assertEqual(str(self.client.products._), self.url + '/products/')
+        self.assertEqual(self.client.products.fedora, self.client['products']['fedora'])
+
+    def test_results(self):
+        rpms = self.collect(self.client.rpms.results())
+        self.assertEqual([rpm['id'] for rpm in rpms], list(range(1, 46)))
+
+        products = self.collect(self.client.products.results(short='fedora'))
+        self.assertEqual([product['short'] for product in products], ['fedora'])
+
+        products = self.collect(self.client.products.results(page_size=-1))
+        self.assertEqual(len(products), 2)
+
+    def test_results_prefetch(self):
+        client = AsyncPDCClient(server=self.url, develop=True, prefetch=3)
+        try:
+            rpms = self.collect(client.rpms.results(page_size=4))
+        finally:
+            self.wait(client.close())
+        self.assertEqual([rpm['id'] for rpm in rpms], list(range(1, 46)))
+
+    def _prefetching_results(self, client, page_error=None):
+        results = client.rpms.results(page_size=4)
+        fetch = results._fetch
+
+        async def fetch_page(page):
+            if page == 2 and page_error:
+                raise page_error
+            if page > 2:
+                await asyncio.sleep(3600)
+            return await fetch(page)
+
+        results._fetch = fetch_page
+        return results
+
+    def test_results_prefetch_aclose(self):
+        client = AsyncPDCClient(server=self.url, develop=True, prefetch=3)
+        try:
+            results = self._prefetching_results(client)
+            self.assertEqual([self.wait(results.__anext__())['id'] for _ in range(5)], list(range(1, 6)))
+            pending = list(results.pending)
+            self.assertEqual(len(pending), 2)
+
+            self.wait(results.aclose())
+            self.wait(asyncio.gather(*pending, return_exceptions=True))
+            self.assertTrue(all(future.cancelled() for future in pending))
+            self.assertEqual(self.collect(results), [])
+        finally:
+            self.wait(client.close())
+
+    def test_results_prefetch_error(self):
+        client = AsyncPDCClient(server=self.url, develop=True, prefetch=3)
+        try:
+            results = self._prefetching_results(client, page_error=ValueError('page 2'))
+            pending = []
+            ensure_future = asyncio.ensure_future
+
+            def record_future(coroutine):
+                pending.append(ensure_future(coroutine))
+                return pending[-1]
+
+            with mock.patch('asyncio.ensure_future', side_effect=record_future):
+                with self.assertRaises(ValueError):
+                    self.collect(results)
+            self.assertEqual(len(pending), 3)
+            self.wait(asyncio.gather(*pending[1:], return_exceptions=True))
+            self.assertTrue(all(future.cancelled() for future in pending[1:]))
+            self.assertEqual(len(results.pending), 0)
+        finally:
+            self.wait(client.close())
+
+    def test_no_results_error(self):
+        with self.assertRaises(NoResultsError):
+            self.collect(self.client.products.fedora.results())
+
+    def test_gather(self):
+        fedora, epel = self.wait(self.client.gather(
+            self.client.products.fedora._(), self.client.products.epel._(), limit=1))
+        self.assertEqual(fedora['short'], 'fedora')
+        self.assertEqual(epel['short'], 'epel')
+
+    def test_get_many(self):
+        rpms = self.wait(self.client.get_many('rpms', [3, 1, 2]))
+        self.assertEqual([rpm['id'] for rpm in rpms], [3, 1, 2])
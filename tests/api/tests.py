@@ -8,8 +8,15 @@
 Tests for pdc_client.PDCClient class.
 """
 
+import email.utils
+import errno
+import hashlib
 import json
+import math
 import os
+import shutil
+import stat
+import tempfile
 import time
 import traceback
 
@@ -18,7 +25,7 @@ try:
 except ImportError:
     from http.server import BaseHTTPRequestHandler, HTTPServer
 
-from threading import Thread
+from threading import Event, Lock, Thread, current_thread
 
 try:
     # Python 2.6 compatibility
@@ -26,8 +33,23 @@ try:
 except ImportError:
     import unittest
 
+import mock
 from beanbag import BeanBagException
-from pdc_client import NoResultsError, PDCClient
+import requests
+from requests.adapters import HTTPAdapter
+from requests.exceptions import ConnectionError
+from pdc_client import NoResultsError, PDCClient, ResultSet, _chunk_values, _iter_pages
+from pdc_client.auth import AuthStrategy, TokenAuth
+from pdc_client.compat import StringIO
+from pdc_client.detail_cache import DetailCache
+from pdc_client.http_cache import HTTPCache
+from pdc_client.rate_limit import RateLimiter
+from pdc_client.single_flight import SingleFlight
+from pdc_client.stats import RequestStats, percentile
+from pdc_client.streaming import decode_stream
+from pdc_client.token_cache import TokenCache, current_principal
+from pdc_client.transport import (HedgePolicy, PDCHTTPAdapter, RetryPolicy, ThreadLocalSession,
+                                  _parse_retry_after)
 
 SERVER_ENV_VAR_NAME = 'PDC_CLIENT_TEST_SERVER'
 DEFAULT_SERVER = 'localhost'
@@ -39,22 +61,38 @@ API_PATH = '/rest_api/v1'
 
 HTTP_OK = 200
 HTTP_NO_CONTENT = 204
+HTTP_NOT_MODIFIED = 304
+HTTP_BAD_REQUEST = 400
+HTTP_UNAUTHORIZED = 401
 HTTP_NOT_FOUND = 404
+HTTP_TOO_MANY_REQUESTS = 429
 HTTP_INTERNAL_SERVER_ERROR = 500
+HTTP_SERVICE_UNAVAILABLE = 503
 
+DEFAULT_PAGE_SIZE = 20
 
-def _paged_results(results, request):
+
+def _page_url(path, request, page):
+    query = dict(request, page=str(page))
+    return 'http://testserver{path}?{query}'.format(
+        path=path, query='&'.join('%s=%s' % item for item in sorted(query.items())))
+
+
+def _paged_results(results, request, path=API_PATH):
     if request.get('page_size') == '-1':
         return HTTP_OK, results
 
-    if request.get('page', '1') != '1':
+    page_size = int(request.get('page_size', DEFAULT_PAGE_SIZE))
+    pages = max(1, int(math.ceil(float(len(results)) / page_size)))
+    page = int(request.get('page', '1'))
+    if page < 1 or page > pages:
         return HTTP_NOT_FOUND, {"detail": "Invalid page"}
 
     return HTTP_OK, {
         'count': len(results),
-        'next': None,
-        'previous': None,
-        'results': results,
+        'next': _page_url(path, request, page + 1) if page < pages else None,
+        'previous': _page_url(path, request, page - 1) if page > 1 else None,
+        'results': results[(page - 1) * page_size:page * page_size],
     }
 
 
@@ -95,6 +133,13 @@ class _MockPDCServerRequestHandler(BaseHTTPRequestHandler, object):
                 "id": 1
             }
         },
+        'rpms': dict(
+            (pk, {"id": pk, "name": "rpm-%d" % pk}) for pk in range(1, 46)
+        ),
+        'arches': [
+            {"name": "ppc64le"},
+            {"name": "x86_64"}
+        ],
         'auth': {
             'token': {
                 'obtain': {
@@ -104,6 +149,12 @@ class _MockPDCServerRequestHandler(BaseHTTPRequestHandler, object):
         }
     }
     last_comment = ''
+    not_modified_count = 0
+    get_count = 0
+    # Status codes and headers sent instead of handling the next requests.
+    failures = []
+    # Whether id__gt filter is supported (True), ignored (False) or rejected (None).
+    id_filter = True
 
     def _find_available_pk(self, data):
         """
@@ -121,11 +172,23 @@ class _MockPDCServerRequestHandler(BaseHTTPRequestHandler, object):
         return json.loads(raw_data.decode())
 
     def _send_response(self, status_code, data):
+        body = json.dumps(data).encode()
+        etag = '"%s"' % hashlib.md5(body).hexdigest()
+        if self.command == 'GET' and status_code == HTTP_OK \
+                and self.headers.get('If-None-Match') == etag:
+            _MockPDCServerRequestHandler.not_modified_count += 1
+            self.send_response(HTTP_NOT_MODIFIED)
+            self.send_header('ETag', etag)
+            self.end_headers()
+            return
+
         self.send_response(status_code)
         self.send_header('Content-Type', 'application/json')
+        if self.command == 'GET':
+            self.send_header('ETag', etag)
         self.end_headers()
 
-        self.wfile.write(json.dumps(data).encode())
+        self.wfile.write(body)
 
     def _get_data_item_and_request(self):
         if not self.path.startswith(API_PATH + '/'):
@@ -137,8 +200,13 @@ class _MockPDCServerRequestHandler(BaseHTTPRequestHandler, object):
 
         if len(data_path_and_request) == 2:
             request_part = data_path_and_request[1]
-            request_part = request_part.split('&')
-            request = dict(key_value.split('=', 1) for key_value in request_part)
+            request = {}
+            for key_value in request_part.split('&'):
+                key, value = key_value.split('=', 1)
+                # Repeated parameters are multiple values of a filter.
+                if key in request:
+                    value = (request[key] if isinstance(request[key], list) else [request[key]]) + [value]
+                request[key] = value
         else:
             request = {}
 
@@ -164,11 +232,20 @@ class _MockPDCServerRequestHandler(BaseHTTPRequestHandler, object):
 
     def _do_GET(self, item, parent_item, pk, request):
         status_code = HTTP_OK
+        path = self.path.split('?', 1)[0]
         if item == self.data['products'] and 'short' in request:
             short = request['short']
-            status_code, data = _paged_results([item[short]], request)
-        elif item in self.data.values():
-            status_code, data = _paged_results(list(item.values()), request)
+            status_code, data = _paged_results([item[short]], request, path)
+        elif isinstance(item, dict) and item in self.data.values():
+            results = [item[key] for key in sorted(item)]
+            if 'id__gt' in request and self.id_filter is None:
+                return HTTP_BAD_REQUEST, {'id__gt': ['Unknown filter.']}
+            if 'id__gt' in request and self.id_filter:
+                results = [obj for obj in results if obj.get('id', 0) > int(request['id__gt'])]
+            if 'name' in request:
+                names = request['name'] if isinstance(request['name'], list) else [request['name']]
+                results = [obj for obj in results if obj.get('name') in names]
+            status_code, data = _paged_results(results, request, path)
         else:
             data = item
         return status_code, data
@@ -197,7 +274,26 @@ class _MockPDCServerRequestHandler(BaseHTTPRequestHandler, object):
         del parent_item[pk]
         return HTTP_NO_CONTENT, 'No content'
 
+    def _send_failure(self):
+        status_code, headers = self.failures.pop(0)
+        body = json.dumps({'detail': 'Temporary failure.'}).encode()
+        self.send_response(status_code)
+        self.send_header('Content-Type', 'application/json')
+        for header in headers.items():
+            self.send_header(*header)
+        self.end_headers()
+        self.wfile.write(body)
+
     def _do(self, method):
+        if self.failures:
+            self._send_failure()
+            return
+
+        authorization = self.headers.get('Authorization')
+        if authorization and authorization != 'Token %s' % self.data['auth']['token']['obtain']['token']:
+            self._send_response(HTTP_UNAUTHORIZED, {'detail': 'Invalid token.'})
+            return
+
         try:
             item, parent_item, pk, request = self._get_data_item_and_request()
             status_code, data = method(item, parent_item, pk, request)
@@ -210,6 +306,7 @@ class _MockPDCServerRequestHandler(BaseHTTPRequestHandler, object):
             self._send_response(HTTP_INTERNAL_SERVER_ERROR, data)
 
     def do_GET(self):
+        _MockPDCServerRequestHandler.get_count += 1
         self._do(self._do_GET)
 
     def do_POST(self):
@@ -266,11 +363,24 @@ class PDCClientTestCase(unittest.TestCase):
         if not hasattr(PDCClientTestCase, 'url'):
             PDCClientTestCase.setUpClass()
 
+        self.cache_dir = tempfile.mkdtemp()
+        self.token_cache_file = os.path.join(self.cache_dir, 'pdc', 'tokens.json')
+        token_cache_patcher = mock.patch('pdc_client.TOKEN_CACHE_FILE', self.token_cache_file)
+        token_cache_patcher.start()
+        self.addCleanup(token_cache_patcher.stop)
+        principal_patcher = mock.patch('pdc_client.current_principal', return_value='user@EXAMPLE.COM')
+        principal_patcher.start()
+        self.addCleanup(principal_patcher.stop)
+
         self.client = PDCClient(
             server=self.url,
             ssl_verify=False,
         )
 
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir)
+        del _MockPDCServerRequestHandler.failures[:]
+
     def test_get_attr(self):
         response = self.client.products()
         self.assertEqual(
@@ -430,10 +540,40 @@ class PDCClientTestCase(unittest.TestCase):
         with self.assertRaises(BeanBagException):
             list(self.client.bad_resource.results())
 
+    def test_results_not_paginated(self):
+        arches = self.client.arches.results()
+        self.assertTrue(arches)
+        self.assertEqual(len(arches), 2)
+        self.assertEqual(list(self.client.arches.results()), _MockPDCServerRequestHandler.data['arches'])
+        self.assertEqual(self.client.arches.results()[1], {'name': 'x86_64'})
+
     def test_no_results_error(self):
         with self.assertRaises(NoResultsError):
             list(self.client.products.fedora.results())
 
+    def test_count(self):
+        self.client.stats.clear()
+        self.assertEqual(self.client.count(self.client.rpms._), 45)
+        self.assertEqual(self.client.count(self.client.rpms._, id__gt=40), 5)
+        self.assertTrue(self.client.exists(self.client.products._, short='fedora'))
+        self.assertFalse(self.client.exists(self.client.rpms._, id__gt=45))
+        self.assertTrue(all('page_size=1' in r['url'] for r in self.client.stats.records))
+
+        with self.assertRaises(NoResultsError):
+            self.client.count(self.client.products.fedora._)
+
+    def test_first(self):
+        self.assertEqual(self.client.first(self.client.rpms._, id__gt=40),
+                         _MockPDCServerRequestHandler.data['rpms'][41])
+        self.assertIsNone(self.client.first(self.client.rpms._, id__gt=45))
+
+    def test_count_and_first(self):
+        self.client.stats.clear()
+        self.assertEqual(self.client.count_and_first(self.client.rpms._, id__gt=40),
+                         (5, _MockPDCServerRequestHandler.data['rpms'][41]))
+        self.assertEqual(self.client.count_and_first(self.client.rpms._, id__gt=45), (0, None))
+        self.assertEqual(len(self.client.stats.records), 2)
+
     def test_get_paged(self):
         products = list(self.client.get_paged(self.client.products))
         self.assertEqual(len(products), 2)
@@ -441,3 +581,1104 @@ class PDCClientTestCase(unittest.TestCase):
         products = list(self.client.get_paged(self.client.products, short='fedora'))
         self.assertEqual(len(products), 1)
         self.assertEqual(products[0]['short'], 'fedora')
+
+    def test_results_multiple_pages(self):
+        rpms = list(self.client.rpms.results())
+        self.assertEqual([rpm['id'] for rpm in rpms], list(range(1, 46)))
+
+    def test_results_prefetch(self):
+        client = PDCClient(server=self.url, ssl_verify=False, prefetch=2)
+        rpms = list(client.rpms.results())
+        self.assertEqual([rpm['id'] for rpm in rpms], list(range(1, 46)))
+
+        rpms = list(client.rpms.results(page_size=7))
+        self.assertEqual([rpm['id'] for rpm in rpms], list(range(1, 46)))
+
+    def test_get_paged_prefetch(self):
+        client = PDCClient(server=self.url, ssl_verify=False, prefetch=3, prefetch_workers=2)
+        rpms = list(client.get_paged(client.rpms._))
+        self.assertEqual([rpm['id'] for rpm in rpms], list(range(1, 46)))
+
+    def test_token_cache(self):
+        cache = TokenCache(self.token_cache_file)
+        self.assertEqual(cache.get(self.url, 'user@EXAMPLE.COM'),
+                         {'token': '1', 'end_point': 'token/obtain'})
+        self.assertEqual(stat.S_IMODE(os.stat(self.token_cache_file).st_mode), 0o600)
+        self.assertEqual(stat.S_IMODE(os.stat(os.path.dirname(self.token_cache_file)).st_mode), 0o700)
+
+        cache.update(self.url, 'user@EXAMPLE.COM', token='1')
+        with mock.patch.object(PDCClient, 'obtain_token') as obtain_token:
+            client = PDCClient(server=self.url, ssl_verify=False)
+        self.assertFalse(obtain_token.called)
+        self.assertEqual(client.token, '1')
+
+    def test_token_cache_write_failure(self):
+        cache = TokenCache(self.token_cache_file)
+        cache_dir = os.path.dirname(self.token_cache_file)
+        files = sorted(os.listdir(cache_dir))
+        with mock.patch('os.rename', side_effect=OSError(errno.EACCES, 'Permission denied')):
+            cache.update(self.url, 'user@EXAMPLE.COM', token='2')
+        self.assertEqual(sorted(os.listdir(cache_dir)), files)
+        self.assertEqual(cache.get(self.url, 'user@EXAMPLE.COM')['token'], '1')
+
+    def test_token_cache_unknown_principal(self):
+        cache = TokenCache(self.token_cache_file)
+        cache.update(self.url, 'None', token='CACHED')
+        with mock.patch('pdc_client.current_principal', return_value=None):
+            client = PDCClient(server=self.url, ssl_verify=False)
+        self.assertIsNone(client.token_cache)
+        self.assertEqual(client.token, '1')
+        self.assertEqual(cache.get(self.url, 'None'), {'token': 'CACHED'})
+
+    def test_current_principal_klist(self):
+        klist = mock.Mock(returncode=0)
+        klist.communicate.return_value = (
+            'Ticket cache: FILE:/tmp/krb5cc_other\nDefault principal: other@EXAMPLE.COM\n', None)
+        with mock.patch.dict('sys.modules', {'gssapi': None}):
+            with mock.patch('subprocess.Popen', return_value=klist) as popen:
+                self.assertEqual(current_principal(), 'other@EXAMPLE.COM')
+            self.assertEqual(popen.call_args[0][0], ['klist'])
+
+            klist.returncode = 1
+            klist.communicate.return_value = ('', None)
+            with mock.patch('subprocess.Popen', return_value=klist):
+                self.assertIsNone(current_principal())
+            with mock.patch('subprocess.Popen', side_effect=OSError(errno.ENOENT, 'klist')):
+                self.assertIsNone(current_principal())
+
+    def test_token_cache_reobtain(self):
+        cache = TokenCache(self.token_cache_file)
+        cache.update(self.url, 'user@EXAMPLE.COM', token='EXPIRED')
+        client = PDCClient(server=self.url, ssl_verify=False)
+        self.assertEqual(client.token, 'EXPIRED')
+
+        response = client.products()
+        self.assertEqual(response.get('count'), len(_MockPDCServerRequestHandler.data['products']))
+        self.assertEqual(client.token, '1')
+        self.assertEqual(cache.get(self.url, 'user@EXAMPLE.COM')['token'], '1')
+
+    def test_configured_token_not_reobtained(self):
+        client = PDCClient(server=self.url, ssl_verify=False, token='BAD')
+        with self.assertRaises(BeanBagException) as context:
+            client.products()
+        self.assertEqual(context.exception.response.status_code, HTTP_UNAUTHORIZED)
+
+    def test_token_auth(self):
+        self.assertIsInstance(self.client.session.auth, TokenAuth)
+        self.assertEqual(self.client.session.auth.token, '1')
+
+    def test_auth_strategy(self):
+        token_requests = []
+
+        class RecordingAuthStrategy(AuthStrategy):
+            def token_auth(self):
+                def auth(request):
+                    token_requests.append(request.url)
+                    return request
+                return auth
+
+        cache = TokenCache(self.token_cache_file)
+        cache.update(self.url, 'user@EXAMPLE.COM', token='EXPIRED')
+        client = PDCClient(server=self.url, ssl_verify=False, auth_strategy=RecordingAuthStrategy())
+        self.assertEqual(token_requests, [])
+
+        client.products()
+        self.assertEqual(token_requests, [self.url + '/auth/token/obtain/'])
+
+        client.products()
+        self.assertEqual(len(token_requests), 1)
+
+    def test_http_cache(self):
+        client = PDCClient(server=self.url, ssl_verify=False,
+                           cache_dir=os.path.join(self.cache_dir, 'http'))
+        not_modified_count = _MockPDCServerRequestHandler.not_modified_count
+
+        response = client.products.fedora()
+        self.assertEqual(response, _MockPDCServerRequestHandler.data['products']['fedora'])
+        self.assertEqual(_MockPDCServerRequestHandler.not_modified_count, not_modified_count)
+
+        response = client.products.fedora()
+        self.assertEqual(response, _MockPDCServerRequestHandler.data['products']['fedora'])
+        self.assertEqual(_MockPDCServerRequestHandler.not_modified_count, not_modified_count + 1)
+
+        response = client.products.fedora(short='fedora')
+        self.assertEqual(_MockPDCServerRequestHandler.not_modified_count, not_modified_count + 1)
+
+        active = not _MockPDCServerRequestHandler.data['products']['fedora']['active']
+        client.products.fedora += {'active': active}
+        response = client.products.fedora()
+        self.assertEqual(response['active'], active)
+        self.assertEqual(_MockPDCServerRequestHandler.not_modified_count, not_modified_count + 1)
+
+    def test_connection_options(self):
+        client = PDCClient(server=self.url, ssl_verify=False, pool_connections=2, pool_maxsize=32,
+                           connect_timeout=1, read_timeout=5, max_retries=3)
+        adapter = client.session.get_adapter(self.url)
+        self.assertIsInstance(adapter, PDCHTTPAdapter)
+        self.assertEqual(adapter._pool_connections, 2)
+        self.assertEqual(adapter._pool_maxsize, 32)
+        self.assertEqual(adapter.max_retries.total, 3)
+
+        send = HTTPAdapter.send
+        with mock.patch.object(HTTPAdapter, 'send', autospec=True, side_effect=send) as mock_send:
+            client.products()
+            client.session.get(self.url + 'products/', timeout=10)
+        self.assertEqual(mock_send.call_args_list[0][1]['timeout'], (1, 5))
+        self.assertEqual(mock_send.call_args_list[1][1]['timeout'], 10)
+
+    @mock.patch.object(RetryPolicy, 'sleep')
+    def test_retry(self, sleep):
+        _MockPDCServerRequestHandler.failures = [
+            (HTTP_SERVICE_UNAVAILABLE, {}),
+            (HTTP_TOO_MANY_REQUESTS, {'Retry-After': '7'}),
+        ]
+        response = self.client.products.fedora()
+        self.assertEqual(response, _MockPDCServerRequestHandler.data['products']['fedora'])
+        self.assertEqual(len(sleep.call_args_list), 2)
+        self.assertLessEqual(sleep.call_args_list[0][0][0], 0.5)
+        self.assertEqual(sleep.call_args_list[1][0][0], 7)
+        stats = self.client.session.get_adapter(self.url).retry_stats
+        self.assertEqual(stats['retries'], 2)
+        self.assertEqual(stats['exhausted'], 0)
+
+    @mock.patch.object(RetryPolicy, 'sleep')
+    def test_retry_exhausted(self, sleep):
+        client = PDCClient(server=self.url, ssl_verify=False, retry={'retries': 2})
+        _MockPDCServerRequestHandler.failures = [(HTTP_SERVICE_UNAVAILABLE, {})] * 3
+        with self.assertRaises(BeanBagException) as context:
+            client.products.fedora()
+        self.assertEqual(context.exception.response.status_code, HTTP_SERVICE_UNAVAILABLE)
+        self.assertEqual(len(sleep.call_args_list), 2)
+        stats = client.session.get_adapter(self.url).retry_stats
+        self.assertEqual(stats['exhausted'], 1)
+
+    @mock.patch.object(RetryPolicy, 'sleep')
+    def test_retry_budget(self, sleep):
+        client = PDCClient(server=self.url, ssl_verify=False, retry=RetryPolicy(budget=5))
+        _MockPDCServerRequestHandler.failures = [(HTTP_SERVICE_UNAVAILABLE, {'Retry-After': '10'})]
+        with self.assertRaises(BeanBagException) as context:
+            client.products.fedora()
+        self.assertEqual(context.exception.response.status_code, HTTP_SERVICE_UNAVAILABLE)
+        self.assertFalse(sleep.called)
+
+    @mock.patch.object(RetryPolicy, 'sleep')
+    def test_no_retry(self, sleep):
+        _MockPDCServerRequestHandler.failures = [(HTTP_SERVICE_UNAVAILABLE, {})]
+        with self.assertRaises(BeanBagException) as context:
+            self.client.cpes._({'cpe': 'cpe:/o:redhat:enterprise_linux:8', 'description': 'RHEL 8'})
+        self.assertEqual(context.exception.response.status_code, HTTP_SERVICE_UNAVAILABLE)
+
+        client = PDCClient(server=self.url, ssl_verify=False, retry=False)
+        _MockPDCServerRequestHandler.failures = [(HTTP_SERVICE_UNAVAILABLE, {})]
+        with self.assertRaises(BeanBagException) as context:
+            client.products.fedora()
+        self.assertFalse(sleep.called)
+
+    @mock.patch.object(RateLimiter, 'sleep')
+    def test_rate_limit(self, sleep):
+        client = PDCClient(server=self.url, ssl_verify=False, rate_limit=1, prefetch=3)
+        results = list(client.rpms.results())
+        self.assertEqual(len(results), len(_MockPDCServerRequestHandler.data['rpms']))
+        self.assertEqual(len(sleep.call_args_list), 2)
+        self.assertEqual(client.rate_limiter.stats['delayed'], 2)
+        self.assertIs(client.session.get_adapter(self.url).rate_limiter, client.rate_limiter)
+
+    def test_max_in_flight(self):
+        client = PDCClient(server=self.url, ssl_verify=False, max_in_flight=1, prefetch=3)
+        in_flight = []
+        send = HTTPAdapter.send
+
+        def record_send(*args, **kwargs):
+            in_flight.append(client.rate_limiter.in_flight)
+            return send(*args, **kwargs)
+
+        with mock.patch.object(HTTPAdapter, 'send', autospec=True, side_effect=record_send):
+            results = list(client.rpms.results())
+        self.assertEqual(len(results), len(_MockPDCServerRequestHandler.data['rpms']))
+        self.assertEqual(in_flight, [1, 1, 1])
+        self.assertEqual(client.rate_limiter.in_flight, 0)
+
+    def test_stats(self):
+        self.client.stats.clear()
+        list(self.client.rpms.results())
+        self.client.products.fedora()
+        self.client.cpes._({'cpe': 'cpe:/o:redhat:enterprise_linux:8', 'description': 'RHEL 8'})
+        with self.assertRaises(BeanBagException):
+            self.client.products.bad_id()
+
+        records = list(self.client.stats.records)
+        self.assertEqual([(r['method'], r['resource'], r['status'], r['pages']) for r in records], [
+            ('GET', 'rpms', HTTP_OK, 1),
+            ('GET', 'rpms', HTTP_OK, 1),
+            ('GET', 'rpms', HTTP_OK, 1),
+            ('GET', 'products/{id}', HTTP_OK, 0),
+            ('POST', 'cpes', HTTP_OK, 0),
+            ('GET', 'products/{id}', HTTP_NOT_FOUND, 0),
+        ])
+        self.assertTrue(all(r['latency'] > 0 and r['bytes_in'] > 0 for r in records))
+        self.assertGreater(records[4]['bytes_out'], 0)
+
+        summary = dict(((item['method'], item['resource']), item)
+                       for item in self.client.stats.summary())
+        self.assertEqual(summary['GET', 'rpms']['requests'], 3)
+        self.assertEqual(summary['GET', 'rpms']['pages'], 3)
+        self.assertEqual(summary['GET', 'products/{id}']['errors'], 1)
+        self.assertEqual(summary['GET', 'rpms']['bytes_in'],
+                         sum(r['bytes_in'] for r in records[:3]))
+
+        output = StringIO()
+        self.client.stats.print_summary(output)
+        self.assertEqual(len(output.getvalue().splitlines()), 4)
+        output = StringIO()
+        self.client.stats.dump(output)
+        self.assertEqual(len(json.loads(output.getvalue())['requests']), 6)
+
+    def test_results_follow_next(self):
+        self.client.stats.clear()
+        results = list(self.client.rpms.results(ordering='id'))
+        self.assertEqual(len(results), len(_MockPDCServerRequestHandler.data['rpms']))
+        # The links generated by server are requested as is.
+        self.assertEqual([r['url'].split('/', 3)[3] for r in self.client.stats.records], [
+            'rest_api/v1/rpms?ordering=id&page=1',
+            'rest_api/v1/rpms?ordering=id&page=2',
+            'rest_api/v1/rpms?ordering=id&page=3',
+        ])
+        self.assertEqual([r['pages'] for r in self.client.stats.records], [1, 1, 1])
+
+    def test_fetch_next_coalesced(self):
+        with mock.patch.object(self.client.single_flight, 'do',
+                               wraps=self.client.single_flight.do) as do:
+            page = self.client._fetch_next(self.url + '/rpms/?page=2')
+        self.assertEqual([obj['id'] for obj in page['results']], list(range(21, 41)))
+        self.assertEqual(do.call_args[0][0], ('GET', self.url + '/rpms/?page=2', ()))
+
+        with self.assertRaises(BeanBagException) as context:
+            self.client._fetch_next(self.url + '/products/bad_id/')
+        self.assertEqual(context.exception.response.status_code, HTTP_NOT_FOUND)
+
+    def test_results_keyset(self):
+        self.client.stats.clear()
+        results = list(self.client.rpms.results(keyset='id'))
+        self.assertEqual(results, [_MockPDCServerRequestHandler.data['rpms'][pk] for pk in range(1, 46)])
+        # The first page was retrieved by list() asking for length.
+        self.assertEqual([r['url'].split('?')[1] for r in self.client.stats.records], [
+            'page=1&ordering=id',
+            'ordering=id&id__gt=20',
+            'ordering=id&id__gt=40',
+        ])
+
+    def test_results_keyset_fallback(self):
+        client = PDCClient(server=self.url, ssl_verify=False)
+        client.stats.clear()
+        results = list(client.products.results(keyset='id', page_size=1))
+        self.assertEqual(results, [_MockPDCServerRequestHandler.data['products'][key]
+                                   for key in sorted(_MockPDCServerRequestHandler.data['products'])])
+        self.assertEqual(len(client.stats.records), 2)
+
+        # The resource is remembered as not supported.
+        client.stats.clear()
+        self.assertEqual(list(client.products.results(keyset='id', page_size=1)), results)
+        self.assertEqual([r['url'].split('?')[1] for r in client.stats.records],
+                         ['page_size=1&page=1', 'page=2&page_size=1'])
+
+    def test_results_keyset_filter_ignored(self):
+        client = PDCClient(server=self.url, ssl_verify=False)
+        client.stats.clear()
+        with mock.patch.object(_MockPDCServerRequestHandler, 'id_filter', False):
+            results = list(client.rpms.results(keyset='id'))
+        self.assertEqual(results, [_MockPDCServerRequestHandler.data['rpms'][pk] for pk in range(1, 46)])
+        self.assertEqual([r['url'].split('?')[1] for r in client.stats.records], [
+            'page=1&ordering=id',
+            'ordering=id&id__gt=20',
+            'ordering=id&page=2',
+            'ordering=id&page=3',
+        ])
+
+    def test_results_keyset_filter_rejected(self):
+        client = PDCClient(server=self.url, ssl_verify=False)
+        client.stats.clear()
+        with mock.patch.object(_MockPDCServerRequestHandler, 'id_filter', None):
+            results = list(client.rpms.results(keyset='id'))
+            self.assertEqual(results, [_MockPDCServerRequestHandler.data['rpms'][pk] for pk in range(1, 46)])
+            self.assertEqual([(r['url'].split('?')[1], r['status']) for r in client.stats.records], [
+                ('page=1&ordering=id', HTTP_OK),
+                ('ordering=id&id__gt=20', HTTP_BAD_REQUEST),
+                ('ordering=id&page=2', HTTP_OK),
+                ('ordering=id&page=3', HTTP_OK),
+            ])
+
+            # The resource is remembered as not supported.
+            client.stats.clear()
+            self.assertEqual(len(list(client.rpms.results(keyset='id'))), 45)
+            self.assertFalse(any('id__gt' in r['url'] for r in client.stats.records))
+
+    def test_results_fields(self):
+        client = PDCClient(server=self.url, ssl_verify=False)
+        client.stats.clear()
+        list(client.products.results(fields='short, name'))
+        list(client.products.results(exclude_fields=['product_versions'], fields=None))
+        list(client.rpms.results(keyset='id', fields=['name'], id__gt=40))
+        self.assertEqual([r['url'].split('?')[1] for r in client.stats.records], [
+            'fields=short&fields=name&page=1',
+            'exclude_fields=product_versions&page=1',
+            'fields=name&fields=id&id__gt=40&page=1&ordering=id',
+        ])
+
+    def test_fetch_many(self):
+        client = PDCClient(server=self.url, ssl_verify=False)
+        client.stats.clear()
+        names = ['rpm-%d' % pk for pk in range(45, 0, -1)] + ['rpm-1', 'missing']
+        results = list(client.fetch_many('rpms', 'name', names, max_url_length=200, fields='id'))
+        self.assertEqual(sorted(results, key=lambda result: result[1]['id']),
+                         [('rpm-%d' % pk, _MockPDCServerRequestHandler.data['rpms'][pk])
+                          for pk in range(1, 46)])
+        urls = [r['url'] for r in client.stats.records]
+        self.assertTrue(all(len(url) <= 200 for url in urls))
+        self.assertEqual(sum(url.count('name=') for url in urls), 46)
+        self.assertTrue(all('fields=id&fields=name' in url for url in urls))
+
+    def test_fetch_many_nothing(self):
+        self.assertEqual(list(self.client.fetch_many('rpms', 'name', [])), [])
+        self.assertEqual(list(self.client.fetch_many('rpms', 'name', ['missing'])), [])
+
+    def test_result_set_len(self):
+        client = PDCClient(server=self.url, ssl_verify=False)
+        client.stats.clear()
+        results = client.rpms.results()
+        self.assertEqual(len(results), 45)
+        self.assertEqual(len(client.stats.records), 1)
+        # The first page is not retrieved again.
+        self.assertEqual([rpm['id'] for rpm in results], list(range(1, 46)))
+        self.assertEqual(len(client.stats.records), 3)
+
+    def test_result_set_index(self):
+        client = PDCClient(server=self.url, ssl_verify=False)
+        client.stats.clear()
+        results = client.rpms.results(page_size=10)
+        self.assertEqual(results[0]['id'], 1)
+        self.assertEqual(results[-1]['id'], 45)
+        self.assertEqual(results[25]['id'], 26)
+        with self.assertRaises(IndexError):
+            results[45]
+        with self.assertRaises(IndexError):
+            results[-46]
+        self.assertEqual([r['url'].split('?')[1] for r in client.stats.records], [
+            'page_size=10&page=1',
+            'page_size=10&page=5',
+            'page_size=10&page=3',
+        ])
+
+    def test_result_set_slice(self):
+        client = PDCClient(server=self.url, ssl_verify=False)
+        client.stats.clear()
+        results = client.rpms.results()
+        self.assertEqual([rpm['id'] for rpm in results[18:23]], list(range(19, 24)))
+        self.assertEqual([r['url'].split('?')[1] for r in client.stats.records],
+                         ['page=1', 'page=2'])
+        # Pages are served from memory.
+        self.assertEqual([rpm['id'] for rpm in results[15:25:5]], [16, 21])
+        self.assertEqual([rpm['id'] for rpm in results[22:17:-2]], [23, 21, 19])
+        self.assertEqual([rpm['id'] for rpm in results[40:100]], list(range(41, 46)))
+        self.assertEqual(results[50:], [])
+        self.assertEqual(len(client.stats.records), 3)
+
+    def test_result_set_cache_pages(self):
+        client = PDCClient(server=self.url, ssl_verify=False)
+        results = ResultSet(client, client.rpms._, {'page_size': 5}, cache_pages=2)
+        client.stats.clear()
+        results[0]
+        results[5]
+        results[10]
+        self.assertEqual(list(results.pages), [2, 3])
+        results[6]
+        results[0]
+        self.assertEqual(list(results.pages), [2, 1])
+        self.assertEqual(len(client.stats.records), 4)
+
+    def test_result_set_next(self):
+        results = self.client.products.results()
+        self.assertEqual(next(results), _MockPDCServerRequestHandler.data['products']['epel'])
+        self.assertEqual(list(results), [_MockPDCServerRequestHandler.data['products']['fedora']])
+        self.assertTrue(results)
+        self.assertFalse(self.client.rpms.results(id__gt=45))
+
+    @mock.patch('pdc_client.CHUNK_SIZE', 64)
+    def test_results_stream(self):
+        results = self.client.rpms.results(page_size=-1)
+        self.assertNotIsInstance(results, list)
+        self.assertEqual(next(results), _MockPDCServerRequestHandler.data['rpms'][1])
+        self.assertEqual(list(results), [_MockPDCServerRequestHandler.data['rpms'][pk] for pk in range(2, 46)])
+
+    def test_results_stream_len_and_index(self):
+        rpms = _MockPDCServerRequestHandler.data['rpms']
+        results = self.client.rpms.results(page_size=-1)
+        self.assertIsInstance(results, ResultSet)
+        get_count = _MockPDCServerRequestHandler.get_count
+        self.assertEqual(len(results), 45)
+        self.assertEqual(results[0], rpms[1])
+        self.assertEqual(results[-1], rpms[45])
+        self.assertEqual(results[10:13], [rpms[pk] for pk in range(11, 14)])
+        self.assertEqual(list(results), [rpms[pk] for pk in range(1, 46)])
+        self.assertEqual(_MockPDCServerRequestHandler.get_count, get_count + 1)
+
+    def test_get_paged_stream(self):
+        client = PDCClient(server=self.url, ssl_verify=False, page_size=-1)
+        results = client.get_paged(client['products']._)
+        self.assertEqual(list(results), [_MockPDCServerRequestHandler.data['products'][key]
+                                         for key in sorted(_MockPDCServerRequestHandler.data['products'])])
+
+        with self.assertRaises(BeanBagException) as context:
+            client.get_paged(client['bad-resource']._)
+        self.assertEqual(context.exception.response.status_code, HTTP_NOT_FOUND)
+
+    def test_stream_page(self):
+        # Server which does not support page_size=-1 returns pages.
+        paged_results = _paged_results
+        with mock.patch(__name__ + '._paged_results',
+                        side_effect=lambda results, request, path: paged_results(
+                            results, dict(request, page_size='20'), path)):
+            results = list(self.client.rpms.results(page_size=-1))
+        self.assertEqual(results, [_MockPDCServerRequestHandler.data['rpms'][pk] for pk in range(1, 46)])
+
+    def test_connection_pool_fits_prefetch(self):
+        client = PDCClient(server=self.url, ssl_verify=False, prefetch=16)
+        self.assertEqual(client.session.get_adapter(self.url)._pool_maxsize, 16)
+        self.assertEqual(client.session.get_adapter(self.url).timeout, None)
+        client = PDCClient(server=self.url, ssl_verify=False, prefetch=16, pool_maxsize=4)
+        self.assertEqual(client.session.get_adapter(self.url)._pool_maxsize, 4)
+
+    def test_coalesce(self):
+        client = PDCClient(server=self.url, ssl_verify=False)
+        get_count = _MockPDCServerRequestHandler.get_count
+        do_get = _MockPDCServerRequestHandler._do_GET
+
+        def slow_get(handler, *args):
+            # Respond after all other threads are waiting for the response.
+            deadline = time.time() + 5
+            while client.single_flight.coalesced < 3 and time.time() < deadline:
+                time.sleep(0.01)
+            return do_get(handler, *args)
+
+        responses = []
+        threads = [Thread(target=lambda: responses.append(client.products.fedora()))
+                   for _ in range(4)]
+        with mock.patch.object(_MockPDCServerRequestHandler, '_do_GET', slow_get):
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual(responses, [_MockPDCServerRequestHandler.data['products']['fedora']] * 4)
+        self.assertEqual(len(set(id(response) for response in responses)), 4)
+        self.assertEqual(_MockPDCServerRequestHandler.get_count, get_count + 1)
+        self.assertEqual(client.single_flight.coalesced, 3)
+
+        # Requests sent one after another are not coalesced.
+        client.products.fedora()
+        self.assertEqual(_MockPDCServerRequestHandler.get_count, get_count + 2)
+
+    def test_thread_safe(self):
+        TokenCache(self.token_cache_file).update(self.url, 'user@EXAMPLE.COM', token='EXPIRED')
+        client = PDCClient(server=self.url, ssl_verify=False, detail_cache_ttl=60)
+        get_count = _MockPDCServerRequestHandler.get_count
+        errors = []
+        sessions = []
+        start = Event()
+        obtain_token = client.obtain_token
+
+        def slow_obtain_token():
+            # Keep the first 401 busy until the other threads get theirs.
+            time.sleep(0.2)
+            return obtain_token()
+
+        def work(n):
+            try:
+                start.wait()
+                for i in range(5):
+                    client.set_comment('thread %d' % n)
+                    rpms = client.rpms.results(page_size=10 + n)
+                    self.assertEqual([rpm['id'] for rpm in rpms], list(range(1, 46)))
+                    self.assertEqual(client.products.fedora()['short'], 'fedora')
+                    self.assertEqual(client.count(client.rpms._, id__gt=40), 5)
+                    self.assertEqual(client.first(client.rpms._, id__gt=40 + n)['id'], 41 + n)
+                sessions.append(client.session.thread_session())
+            except Exception:
+                errors.append(traceback.format_exc())
+
+        threads = [Thread(target=work, args=(n,)) for n in range(4)]
+        with mock.patch.object(client, 'obtain_token', side_effect=slow_obtain_token) as obtain:
+            for thread in threads:
+                thread.start()
+            start.set()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(obtain.call_count, 1)
+        self.assertEqual(client.token, '1')
+        self.assertEqual(len(set(id(session) for session in sessions)), 4)
+        self.assertEqual(len(client.stats.records), _MockPDCServerRequestHandler.get_count - get_count)
+        statuses = [r['status'] for r in client.stats.records]
+        self.assertTrue(1 <= statuses.count(HTTP_UNAUTHORIZED) <= 4)
+        self.assertEqual(set(statuses), set([HTTP_OK, HTTP_UNAUTHORIZED]))
+
+    def test_thread_pool_sessions(self):
+        client = PDCClient(server=self.url, ssl_verify=False, prefetch=3)
+        threads = {}
+        send = requests.Session.send
+
+        def record_send(session, request, **kwargs):
+            if not isinstance(session, ThreadLocalSession):
+                threads.setdefault(id(session), set()).add(current_thread())
+            return send(session, request, **kwargs)
+
+        with mock.patch.object(requests.Session, 'send', autospec=True, side_effect=record_send):
+            self.assertEqual(len(list(client.rpms.results(page_size=5))), 45)
+            self.assertEqual(len(list(client.fetch_many('rpms', 'name', ['rpm-1', 'rpm-2'],
+                                                        max_url_length=100))), 2)
+        self.assertGreater(len(threads), 1)
+        self.assertTrue(all(len(session_threads) == 1 for session_threads in threads.values()))
+
+    def test_detail_cache(self):
+        client = PDCClient(server=self.url, ssl_verify=False, detail_cache_ttl=60)
+        get_count = _MockPDCServerRequestHandler.get_count
+
+        response = client.products.fedora()
+        response['name'] = 'CHANGED'
+        response = client['products']['fedora']._()
+        self.assertEqual(response, _MockPDCServerRequestHandler.data['products']['fedora'])
+        self.assertEqual(_MockPDCServerRequestHandler.get_count, get_count + 1)
+
+        client.products()
+        client.products()
+        self.assertEqual(_MockPDCServerRequestHandler.get_count, get_count + 3)
+
+        active = not response['active']
+        client.products.fedora += {'active': active}
+        response = client.products.fedora()
+        self.assertEqual(response['active'], active)
+        self.assertEqual(_MockPDCServerRequestHandler.get_count, get_count + 4)
+
+        client.cpes[1]()
+        client.cpes[1] = dict(_MockPDCServerRequestHandler.data['cpes'][1], description='PUT')
+        self.assertEqual(client.cpes[1]()['description'], 'PUT')
+        self.assertEqual(_MockPDCServerRequestHandler.get_count, get_count + 6)
+
+
+class ChunkValuesTestCase(unittest.TestCase):
+    def test_chunks(self):
+        self.assertEqual(list(_chunk_values('name', ['a', 'b', 'a', 'cc', 'd'], 14)),
+                         [['a', 'b'], ['cc'], ['d']])
+
+    def test_long_value(self):
+        self.assertEqual(list(_chunk_values('name', ['a', 'x' * 20, 'b'], 14)),
+                         [['a'], ['x' * 20], ['b']])
+
+
+class SingleFlightTestCase(unittest.TestCase):
+    def setUp(self):
+        self.single_flight = SingleFlight()
+        self.calls = 0
+
+    def _call(self, result, waiters):
+        def fn():
+            self.calls += 1
+            deadline = time.time() + 5
+            while self.single_flight.coalesced < waiters and time.time() < deadline:
+                time.sleep(0.01)
+            if isinstance(result, Exception):
+                raise result
+            return result
+        return fn
+
+    def _run(self, key, fn, count):
+        results = []
+
+        def run():
+            try:
+                results.append(self.single_flight.do(key, fn))
+            except Exception as e:
+                results.append(e)
+
+        threads = [Thread(target=run) for _ in range(count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
+
+    def test_result_shared(self):
+        results = self._run('key', self._call({'a': [1]}, 2), 3)
+        self.assertEqual(results, [{'a': [1]}] * 3)
+        self.assertEqual(self.calls, 1)
+        results[0]['a'].append(2)
+        self.assertEqual(results[1], {'a': [1]})
+
+    def test_error_shared(self):
+        error = ValueError('failed')
+        results = self._run('key', self._call(error, 1), 2)
+        self.assertEqual(results, [error, error])
+        self.assertEqual(self.calls, 1)
+
+    def test_key(self):
+        self.assertEqual(SingleFlight.key('GET', 'http://x/a/', {'b': 1, 'c': None}),
+                         SingleFlight.key('GET', 'http://x/a', {'b': 1}))
+        self.assertNotEqual(SingleFlight.key('GET', 'http://x/a', {'b': 1}),
+                            SingleFlight.key('GET', 'http://x/a', {'b': 2}))
+
+
+class HedgePolicyTestCase(unittest.TestCase):
+    def setUp(self):
+        self.stats = RequestStats('http://localhost/rest_api/v1/')
+        self.request = requests.Request('GET', 'http://localhost/rest_api/v1/rpms/1/').prepare()
+
+    def _record(self, url, latencies, status=HTTP_OK):
+        for latency in latencies:
+            self.stats.record('GET', url, status, 0, latency, 0, 0)
+
+    def test_fixed_delay(self):
+        policy = HedgePolicy(delay=0.5)
+        self.assertEqual(policy.delay(self.request), 0.5)
+        self.assertEqual(policy.delay(requests.Request('POST', self.request.url).prepare()), None)
+
+    def test_percentile(self):
+        policy = HedgePolicy(percentile=90, min_samples=10)
+        self._record('http://localhost/rest_api/v1/rpms/2/', [i / 10.0 for i in range(1, 10)])
+        self._record('http://localhost/rest_api/v1/rpms/3/', [5], status=500)
+        self._record('http://localhost/rest_api/v1/releases/1/', [5])
+        self.assertEqual(policy.delay(self.request, self.stats), None)
+        self._record('http://localhost/rest_api/v1/rpms/2/', [1.0])
+        self.assertEqual(policy.delay(self.request, self.stats), 0.9)
+        self.assertEqual(policy.delay(self.request), None)
+
+    def test_from_config(self):
+        self.assertEqual(HedgePolicy.from_config(0.2).fixed_delay, 0.2)
+        policy = HedgePolicy.from_config({'percentile': 99, 'min-samples': 5})
+        self.assertEqual((policy.fixed_delay, policy.percentile, policy.min_samples), (None, 99, 5))
+
+
+class HedgedSendTestCase(unittest.TestCase):
+    def setUp(self):
+        self.stats = RequestStats('http://localhost/rest_api/v1/')
+        self.adapter = PDCHTTPAdapter(stats=self.stats, hedge_policy=HedgePolicy(delay=0.05))
+        self.request = requests.Request('GET', 'http://localhost/rest_api/v1/rpms/1/').prepare()
+        self.responses = []
+
+    def _response(self, content):
+        response = requests.Response()
+        response.status_code = HTTP_OK
+        response._content = content
+        response._content_consumed = True
+        self.responses.append(response)
+        return response
+
+    def _send(self, *results):
+        # Each result is a pair of delay and response content or exception.
+        calls = []
+
+        def send(adapter, request, **kwargs):
+            delay, result = results[len(calls)]
+            calls.append(request)
+            time.sleep(delay)
+            if isinstance(result, Exception):
+                raise result
+            return self._response(result)
+
+        with mock.patch.object(HTTPAdapter, 'send', autospec=True, side_effect=send):
+            start = time.time()
+            try:
+                return self.adapter.send(self.request)
+            finally:
+                self.elapsed = time.time() - start
+                # Let the late request finish.
+                time.sleep(max(delay for delay, _ in results[:len(calls)]) + 0.05)
+
+    def test_fast(self):
+        response = self._send((0, b'first'))
+        self.assertEqual(response.content, b'first')
+        self.assertEqual(self.adapter.hedge_stats, {'hedged': 0, 'won': 0})
+        self.assertEqual([r['hedge'] for r in self.stats.records], [False])
+
+    def test_hedge_wins(self):
+        response = self._send((1, b'first'), (0, b'hedge'))
+        self.assertEqual(response.content, b'hedge')
+        # The hedge is returned without waiting for the original request.
+        self.assertLess(self.elapsed, 0.5)
+        self.assertEqual(self.adapter.hedge_stats, {'hedged': 1, 'won': 1})
+        self.assertEqual([r['hedge'] for r in self.stats.records], [True, False])
+        self.assertEqual(self.stats.summary()[0]['hedged'], 1)
+
+    def test_first_wins(self):
+        response = self._send((0.1, b'first'), (0.3, b'hedge'))
+        self.assertEqual(response.content, b'first')
+        self.assertEqual(self.adapter.hedge_stats, {'hedged': 1, 'won': 0})
+
+    def test_hedge_fails(self):
+        response = self._send((0.2, b'first'), (0, ConnectionError('failed')))
+        self.assertEqual(response.content, b'first')
+        self.assertEqual(self.adapter.hedge_stats, {'hedged': 1, 'won': 0})
+
+    def test_both_fail(self):
+        with self.assertRaises(ConnectionError):
+            self._send((0.1, ConnectionError('failed')), (0, ConnectionError('failed')))
+        self.assertEqual([r['status'] for r in self.stats.records], [None, None])
+
+    def test_no_hedge_for_stream(self):
+        with mock.patch.object(HTTPAdapter, 'send', autospec=True,
+                               side_effect=lambda *args, **kwargs: self._response(b'')):
+            self.adapter.send(self.request, stream=True)
+        self.assertEqual(len(self.stats.records), 1)
+
+
+class ThreadLocalSessionTestCase(unittest.TestCase):
+    def test_thread_session(self):
+        session = ThreadLocalSession()
+        adapter = HTTPAdapter()
+        session.mount('http://', adapter)
+        session.headers = dict(session.headers, Test='1')
+        sessions = []
+        thread = Thread(target=lambda: sessions.append(session.thread_session()))
+        thread.start()
+        thread.join()
+        sessions.append(session.thread_session())
+
+        self.assertIsNot(sessions[0], sessions[1])
+        self.assertIs(session.thread_session(), sessions[1])
+        for thread_session in sessions:
+            self.assertIs(thread_session.get_adapter('http://localhost/'), adapter)
+            self.assertEqual(thread_session.headers['Test'], '1')
+
+        session.headers = dict(session.headers, Test='2')
+        self.assertEqual(session.thread_session().headers['Test'], '2')
+
+
+class RateLimiterTestCase(unittest.TestCase):
+    def setUp(self):
+        self.now = 100.0
+        clock_patcher = mock.patch('pdc_client.rate_limit._clock', side_effect=lambda: self.now)
+        clock_patcher.start()
+        self.addCleanup(clock_patcher.stop)
+        sleep_patcher = mock.patch.object(RateLimiter, 'sleep')
+        self.sleep = sleep_patcher.start()
+        self.addCleanup(sleep_patcher.stop)
+
+    def test_rate(self):
+        limiter = RateLimiter(rate=2)
+        for _ in range(4):
+            with limiter:
+                pass
+        self.assertEqual([args[0][0] for args in self.sleep.call_args_list], [0.5, 1.0])
+        self.assertEqual(limiter.stats['delayed'], 2)
+
+        # Waiting requests used all tokens refilled meanwhile.
+        self.now += 1
+        limiter.acquire()
+        self.assertEqual(self.sleep.call_args[0][0], 0.5)
+
+        self.now += 10
+        self.sleep.reset_mock()
+        for _ in range(2):
+            limiter.acquire()
+        self.assertFalse(self.sleep.called)
+
+    def test_burst(self):
+        limiter = RateLimiter(rate=1, burst=3)
+        for _ in range(3):
+            limiter.acquire()
+        self.assertFalse(self.sleep.called)
+        limiter.acquire()
+        self.assertEqual(self.sleep.call_args[0][0], 1.0)
+
+    def test_max_in_flight(self):
+        limiter = RateLimiter(max_in_flight=2)
+        limiter.acquire()
+        limiter.acquire()
+        thread = Thread(target=limiter.acquire)
+        thread.start()
+        thread.join(0.1)
+        self.assertTrue(thread.is_alive())
+        limiter.release()
+        thread.join(5)
+        self.assertFalse(thread.is_alive())
+        self.assertEqual(limiter.in_flight, 2)
+        self.assertEqual(limiter.stats['delayed'], 1)
+        self.assertFalse(self.sleep.called)
+
+
+class DecodeStreamTestCase(unittest.TestCase):
+    def _chunks(self, data, size):
+        raw = json.dumps(data, ensure_ascii=False).encode('utf-8')
+        return [raw[i:i + size] for i in range(0, len(raw), size)]
+
+    def test_array(self):
+        data = [{'id': pk, 'name': u'\u017elu\u0165ou\u010dk\u00fd k\u016f\u0148 %d' % pk} for pk in range(50)]
+        data += [12345, 1.5e10, 'text', None, True, []]
+        for size in (1, 3, 64, 100000):
+            self.assertEqual(list(decode_stream(self._chunks(data, size))), data)
+
+    def test_lazy(self):
+        chunks = iter(self._chunks([{'id': pk} for pk in range(100)], 10))
+        items = decode_stream(chunks)
+        self.assertEqual(next(items), {'id': 0})
+        self.assertTrue(len(list(chunks)) > 50)
+
+    def test_not_array(self):
+        self.assertEqual(decode_stream(self._chunks({'count': 1}, 3)), {'count': 1})
+        self.assertEqual(list(decode_stream([b' [ ', b'] '])), [])
+
+    def test_invalid(self):
+        for raw in (b'[1,', b'[1 2]', b'[1]x', b'{"a": 1'):
+            with self.assertRaises(ValueError):
+                list(decode_stream([raw]))
+
+
+class RequestStatsTestCase(unittest.TestCase):
+    def test_resource(self):
+        stats = RequestStats('https://pdc.example.com/rest_api/v1/')
+        self.assertEqual(stats.resource('https://pdc.example.com/rest_api/v1/releases/?page=2'),
+                         'releases')
+        self.assertEqual(stats.resource('https://pdc.example.com/rest_api/v1/releases/f27/'),
+                         'releases/{id}')
+        self.assertEqual(stats.resource('https://pdc.example.com/rest_api/v1/global-components/1/contacts/2/'),
+                         'global-components/{id}/contacts/{id}')
+        self.assertEqual(stats.resource('https://pdc.example.com/rest_api/v1/auth/token/obtain/'),
+                         'auth/token/obtain')
+
+    def test_percentile(self):
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 50), 50)
+        self.assertEqual(percentile(values, 95), 95)
+        self.assertEqual(percentile(values, 100), 100)
+        self.assertEqual(percentile([7], 99), 7)
+
+    def test_max_records(self):
+        stats = RequestStats('http://localhost/rest_api/v1/', max_records=2)
+        for latency in (0.3, 0.1, 0.2):
+            stats.record('GET', 'http://localhost/rest_api/v1/rpms/', HTTP_OK, 0, latency, 0, 10)
+        self.assertEqual([r['latency'] for r in stats.records], [0.1, 0.2])
+        summary = stats.summary()
+        self.assertEqual([(s['requests'], s['bytes_in']) for s in summary], [(3, 30)])
+        self.assertAlmostEqual(summary[0]['max'], 300)
+
+    def test_latency_window(self):
+        stats = RequestStats('http://localhost/rest_api/v1/', latency_window=3)
+        for latency in (0.9, 0.1, 0.3, 0.2):
+            stats.record('GET', 'http://localhost/rest_api/v1/rpms/', HTTP_OK, 0, latency, 0, 0)
+        stats.record('GET', 'http://localhost/rest_api/v1/rpms/', 500, 0, 5, 0, 0)
+        self.assertEqual(stats.latency_percentile('GET', 'rpms', 100), 0.3)
+        self.assertEqual(stats.latency_percentile('GET', 'rpms', 50, min_samples=4), None)
+        self.assertEqual(stats.latency_percentile('GET', 'releases', 50), None)
+        self.assertEqual(stats.summary()[0]['p99'], 5000)
+
+
+class RetryPolicyTestCase(unittest.TestCase):
+    def test_backoff(self):
+        policy = RetryPolicy(backoff=1, max_backoff=5)
+        with mock.patch('random.uniform', side_effect=lambda a, b: b):
+            self.assertEqual([policy.delay(retry) for retry in range(1, 6)], [1, 2, 4, 5, 5])
+
+    def test_from_config(self):
+        policy = RetryPolicy.from_config({'retries': 5, 'max-backoff': 60, 'methods': ['get']})
+        self.assertEqual(policy.retries, 5)
+        self.assertEqual(policy.max_backoff, 60)
+        self.assertEqual(policy.methods, frozenset(['GET']))
+
+    def test_parse_retry_after(self):
+        self.assertEqual(_parse_retry_after('120'), 120)
+        self.assertEqual(_parse_retry_after('soon'), None)
+        self.assertEqual(_parse_retry_after(None), None)
+        date = email.utils.formatdate(time.time() + 60, usegmt=True)
+        self.assertAlmostEqual(_parse_retry_after(date), 60, delta=2)
+        self.assertEqual(_parse_retry_after('Wed, 21 Oct 2015 07:28:00 GMT'), 0)
+
+
+class DetailCacheTestCase(unittest.TestCase):
+    root_url = 'http://example.com/rest_api/v1/'
+
+    def test_only_detail_urls(self):
+        cache = DetailCache(self.root_url, 60)
+        cache.set(self.root_url + 'releases/', {}, {'a': 1})
+        self.assertEqual(cache.get(self.root_url + 'releases/', {}), None)
+        cache.set(self.root_url + 'releases/f27/', {}, {'a': 1})
+        self.assertEqual(cache.get(self.root_url + 'releases/f27/', {}), {'a': 1})
+        self.assertEqual(cache.get(self.root_url + 'releases/f27', {'page_size': None}), {'a': 1})
+        self.assertEqual(cache.get(self.root_url + 'releases/f27/', {'active': True}), None)
+
+    def test_ttl(self):
+        cache = DetailCache(self.root_url, 60)
+        cache.set(self.root_url + 'releases/f27/', {}, {'a': 1})
+        with mock.patch('time.time', return_value=time.time() + 61):
+            self.assertEqual(cache.get(self.root_url + 'releases/f27/', {}), None)
+
+    def test_max_entries(self):
+        cache = DetailCache(self.root_url, 60, max_entries=2)
+        for release in ('f25', 'f26', 'f27'):
+            if release == 'f27':
+                cache.get(self.root_url + 'releases/f25/', {})
+            cache.set(self.root_url + 'releases/%s/' % release, {}, release)
+        self.assertEqual(cache.get(self.root_url + 'releases/f25/', {}), 'f25')
+        self.assertEqual(cache.get(self.root_url + 'releases/f26/', {}), None)
+        self.assertEqual(cache.get(self.root_url + 'releases/f27/', {}), 'f27')
+
+    def test_invalidate(self):
+        cache = DetailCache(self.root_url, 60)
+        cache.set(self.root_url + 'releases/f27/', {}, 'f27')
+        cache.set(self.root_url + 'releases/f27/variants/', {}, 'variants')
+        cache.set(self.root_url + 'releases/f2/', {}, 'f2')
+        cache.invalidate(self.root_url + 'releases/f27')
+        self.assertEqual(cache.get(self.root_url + 'releases/f27/', {}), None)
+        self.assertEqual(cache.get(self.root_url + 'releases/f27/variants/', {}), None)
+        self.assertEqual(cache.get(self.root_url + 'releases/f2/', {}), 'f2')
+
+
+class HTTPCacheTestCase(unittest.TestCase):
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.cache_dir)
+
+    def test_get_set(self):
+        cache = HTTPCache(self.cache_dir)
+        self.assertEqual(cache.get('http://example.com/a/'), None)
+        cache.set('http://example.com/a/', {'ETag': '"a"', 'Content-Type': 'application/json',
+                                            'Content-Length': '2'}, b'{}')
+        meta, body = cache.get('http://example.com/a/')
+        self.assertEqual(body, b'{}')
+        self.assertEqual(meta['etag'], '"a"')
+        self.assertEqual(meta['last_modified'], None)
+        self.assertEqual(meta['headers'], {'ETag': '"a"', 'Content-Type': 'application/json'})
+
+    def _age(self, cache, url, seconds):
+        for ext in ('.json', '.body'):
+            timestamp = time.time() - seconds
+            os.utime(cache._entry_path(url) + ext, (timestamp, timestamp))
+
+    def test_evict_least_recently_used(self):
+        cache = HTTPCache(self.cache_dir)
+        urls = ['http://example.com/%d/' % i for i in range(3)]
+        cache.set(urls[0], {'ETag': '"0"'}, b'0' * 100)
+        cache.max_size = cache.size * 2
+        cache.set(urls[1], {'ETag': '"1"'}, b'1' * 100)
+        self._age(cache, urls[0], 100)
+        self._age(cache, urls[1], 200)
+        # Using an entry makes it the most recently used one.
+        cache.get(urls[1])
+
+        cache.set(urls[2], {'ETag': '"2"'}, b'2' * 100)
+        self.assertEqual(cache.get(urls[0]), None)
+        self.assertEqual(cache.get(urls[1])[1], b'1' * 100)
+        self.assertEqual(cache.get(urls[2])[1], b'2' * 100)
+
+    def test_concurrent_set(self):
+        cache = HTTPCache(self.cache_dir)
+        cache.set('http://example.com/first/', {'ETag': '"first"'}, b'')
+
+        def work(n):
+            for i in range(20):
+                cache.set('http://example.com/%d/' % (i % 5), {'ETag': '"%d"' % n}, b'x' * (n + i))
+
+        threads = [Thread(target=work, args=(n,)) for n in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        names = os.listdir(self.cache_dir)
+        self.assertEqual(len(names), 12)
+        self.assertEqual(cache.size, sum(os.path.getsize(os.path.join(self.cache_dir, name))
+                                         for name in names))
+
+
+class IterPagesTestCase(unittest.TestCase):
+    def _fetch(self, count, per_page):
+        lock = Lock()
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.requested = []
+
+        def fetch(page, **kwargs):
+            with lock:
+                self.requested.append(page)
+                self.in_flight += 1
+                self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            time.sleep(0.01)
+            with lock:
+                self.in_flight -= 1
+            results = list(range((page - 1) * per_page, min(page * per_page, count)))
+            return {
+                'count': count,
+                'next': 'next' if page * per_page < count else None,
+                'previous': None,
+                'results': results,
+            }
+        return fetch
+
+    def _results(self, responses):
+        return [item for response in responses for item in response['results']]
+
+    def test_serial(self):
+        fetch = self._fetch(55, 10)
+        responses = list(_iter_pages(fetch, {}))
+        self.assertEqual(self._results(responses), list(range(55)))
+        self.assertEqual(self.requested, [1, 2, 3, 4, 5, 6])
+        self.assertEqual(self.max_in_flight, 1)
+
+    def test_prefetch_keeps_order_and_bounds_in_flight(self):
+        fetch = self._fetch(95, 10)
+        responses = list(_iter_pages(fetch, {}, prefetch=3))
+        self.assertEqual(self._results(responses), list(range(95)))
+        self.assertEqual(sorted(self.requested), list(range(1, 11)))
+        self.assertTrue(1 < self.max_in_flight <= 3)
+
+    def test_prefetch_bounded_workers(self):
+        fetch = self._fetch(95, 10)
+        responses = list(_iter_pages(fetch, {}, prefetch=4, prefetch_workers=1))
+        self.assertEqual(self._results(responses), list(range(95)))
+        self.assertEqual(self.max_in_flight, 1)
+
+    def _fetch_next(self, fetch, cursor=False):
+        self.followed = []
+
+        def fetch_next(url):
+            self.followed.append(url)
+            page = int(url.split('=')[1])
+            response = fetch(page=page)
+            if response['next']:
+                response['next'] = '%s=%d' % ('cursor' if cursor else 'page', page + 1)
+            return response
+
+        def fetch_first(**kwargs):
+            response = fetch(**kwargs)
+            if response['next'] and kwargs['page'] == 1:
+                response['next'] = 'cursor=2' if cursor else 'page=2'
+            return response
+        return fetch_first, fetch_next
+
+    def test_follow_next(self):
+        fetch, fetch_next = self._fetch_next(self._fetch(55, 10))
+        responses = list(_iter_pages(fetch, {}, fetch_next=fetch_next))
+        self.assertEqual(self._results(responses), list(range(55)))
+        self.assertEqual(self.followed, ['page=%d' % page for page in range(2, 7)])
+
+    def test_follow_next_cursor_no_prefetch(self):
+        fetch, fetch_next = self._fetch_next(self._fetch(55, 10), cursor=True)
+        responses = list(_iter_pages(fetch, {}, prefetch=3, fetch_next=fetch_next))
+        self.assertEqual(self._results(responses), list(range(55)))
+        self.assertEqual(self.followed, ['cursor=%d' % page for page in range(2, 7)])
+        self.assertEqual(self.max_in_flight, 1)
+
+    def test_follow_next_fallback(self):
+        fetch = self._fetch(55, 10)
+
+        def fetch_next(url):
+            return None
+        responses = list(_iter_pages(fetch, {}, fetch_next=fetch_next))
+        self.assertEqual(self._results(responses), list(range(55)))
+        self.assertEqual(self.requested, [1, 2, 3, 4, 5, 6])
+
+    def test_prefetch_stops_early(self):
+        fetch = self._fetch(95, 10)
+        pages = _iter_pages(fetch, {}, prefetch=2)
+        next(pages)
+        next(pages)
+        pages.close()
+        self.assertTrue(len(self.requested) <= 4)
@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2018 Red Hat
+# Licensed under The MIT License (MIT)
+# http://opensource.org/licenses/MIT
+#
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+import mock
+
+from pdc_client import completion
+from pdc_client.compat import StringIO
+from pdc_client.runner import Runner
+from pdc_client.test_helpers import CLITestCase
+
+
+class CompletionTestCase(CLITestCase):
+    def setUp(self):
+        self.runner = Runner()
+        self.runner.setup()
+
+    def _generate(self, *args):
+        with mock.patch('sys.stdout', new_callable=StringIO) as output:
+            self.runner.run(['completion', 'generate'] + list(args))
+        return output.getvalue()
+
+    def test_bash_script_is_up_to_date(self, api):
+        with open(os.path.join(os.path.dirname(__file__), '..', '..', 'pdc.bash')) as f:
+            self.assertEqual(self._generate(), f.read())
+        self.assertEqual(api.calls, {})
+
+    def test_generate_zsh(self, api):
+        script = self._generate('--shell', 'zsh')
+        self.assertTrue(script.startswith('#compdef pdc\n'))
+        self.assertIn("    'pdc completion generate|--shell' 'choices:bash zsh'\n", script)
+
+    def test_completion_tree(self, api):
+        parser = argparse.ArgumentParser()
+        parser.add_argument('-s', '--server')
+        parser.add_argument('--debug', action='store_true', help=argparse.SUPPRESS)
+        subparsers = parser.add_subparsers()
+        release = subparsers.add_parser('release').add_subparsers()
+        info = release.add_parser('info')
+        info.add_argument('release_id').completion_source = 'releases'
+        info.add_argument('--format', choices=['json', 'text'])
+
+        tree = completion.completion_tree(parser)
+        self.assertEqual(list(tree), ['pdc', 'pdc release', 'pdc release info'])
+        self.assertEqual(tree['pdc'], (['-h', '--help', '-s', '--server', 'release'],
+                                       ['-s', '--server'], {}))
+        self.assertEqual(tree['pdc release info'],
+                         (['-h', '--help', '--format'], ['--format'],
+                          {'0': 'source:releases', '--format': 'choices:json text'}))
+
+    def test_cache_file(self, api):
+        self.assertEqual(completion.cache_file('releases', 'https://pdc.example.com/', '/cache'),
+                         '/cache/https___pdc.example.com_/releases')
+
+
+class IdentifierCacheTestCase(CLITestCase):
+    def setUp(self):
+        self.runner = Runner()
+        self.runner.setup()
+        self.cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.cache_dir)
+        patcher = mock.patch('pdc_client.completion.COMPLETION_CACHE_DIR', self.cache_dir)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.cache = completion.IdentifierCache('stage')
+
+    def _write(self, source, values):
+        os.makedirs(os.path.join(self.cache_dir, 'stage'))
+        with open(self.cache.path(source), 'wb') as f:
+            f.write(''.join(value + '\n' for value in values).encode('utf-8'))
+
+    def _setup_endpoints(self, api):
+        api.add_endpoint('releases', 'GET', [{'release_id': 'rhel-7.%d' % x} for x in range(10, 0, -1)])
+        api.add_endpoint('composes', 'GET', [{'compose_id': 'Fedora-27-2018010%d.0' % x} for x in range(3)])
+        api.add_endpoint('global-components', 'GET', [{'name': 'python'}, {'name': 'bash'}])
+
+    def test_refresh(self, api):
+        self._setup_endpoints(api)
+        with self.expect_output('refresh.txt'):
+            self.runner.run(['completion', 'refresh'])
+        self.assertEqual(api.calls['releases'],
+                         [('GET', {'page': 1, 'page_size': 1000, 'fields': ['release_id']})])
+        with open(self.cache.path('releases')) as f:
+            self.assertEqual(f.read(), ''.join('rhel-7.%d\n' % x for x in (1, 10, 2, 3, 4, 5, 6, 7, 8, 9)))
+        self.assertEqual(self.cache.lookup('global-components'), ['bash', 'python'])
+        self.assertTrue(self.cache.is_fresh('composes'))
+
+    def test_refresh_source(self, api):
+        self._setup_endpoints(api)
+        with mock.patch('sys.stdout', new_callable=StringIO):
+            self.runner.run(['completion', 'refresh', '--source', 'composes'])
+        self.assertEqual(list(api.calls), ['composes'])
+        self.assertFalse(self.cache.is_fresh('releases'))
+
+    def test_lookup(self, api):
+        values = sorted('%s-%d' % (name, x) for name in ('bash', 'kernel', 'python', u'\u017elu\u0165')
+                        for x in range(100))
+        self._write('global-components', values)
+        lookup = self.cache.lookup
+        self.assertEqual(lookup('global-components'), values)
+        self.assertEqual(lookup('global-components', 'bash-'), values[:100])
+        self.assertEqual(lookup('global-components', 'bash-0'), ['bash-0'])
+        self.assertEqual(lookup('global-components', 'python-9'),
+                         ['python-9'] + ['python-%d' % x for x in range(90, 100)])
+        self.assertEqual(lookup('global-components', u'\u017e'), values[300:])
+        self.assertEqual(lookup('global-components', 'a'), [])
+        self.assertEqual(lookup('global-components', 'zz'), [])
+        self.assertEqual(lookup('releases', 'rhel'), [])
+
+    def test_completer_uses_fresh_cache(self, api):
+        self._write('releases', ['f27', 'f28', 'rhel-7'])
+        completer = completion.IdentifierCompleter('releases')
+        with mock.patch('pdc_client.PDCClient') as client:
+            self.assertEqual(completer('f', argparse.Namespace(server='stage')), ['f27', 'f28'])
+        self.assertFalse(client.called)
+
+    def test_completer_refreshes_old_cache(self, api):
+        self._write('releases', ['f27'])
+        os.utime(self.cache.path('releases'), (0, time.time() - completion.DEFAULT_TTL - 1))
+        self._setup_endpoints(api)
+        completer = completion.IdentifierCompleter('releases')
+        with mock.patch('pdc_client.PDCClient', return_value=api) as client:
+            self.assertEqual(completer('rhel-7.1', argparse.Namespace(server='stage', insecure=True)),
+                             ['rhel-7.1', 'rhel-7.10'])
+        client.assert_called_once_with('stage', ssl_verify=False)
+
+    def test_completer_falls_back_to_old_cache(self, api):
+        self._write('releases', ['f27'])
+        os.utime(self.cache.path('releases'), (0, 0))
+        completer = completion.IdentifierCompleter('releases')
+        with mock.patch('pdc_client.PDCClient', side_effect=Exception('No connection')):
+            self.assertEqual(completer('', argparse.Namespace(server='stage')), ['f27'])
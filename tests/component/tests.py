@@ -74,7 +74,7 @@ class GlobalComponentTestCase(CLITestCase):
         with self.expect_output('global_component/detail.txt'):
             self.runner.run(['global-component', 'info', 'Test Global Component'])
         self.assertEqual(api.calls,
-                         {'global-components': [('GET', {'name': 'Test Global Component'})],
+                         {'global-components': [('GET', {'name': 'Test Global Component', 'page_size': 1})],
                           'global-components/1': [('GET', {})],
                           'global-component-contacts': [('GET', {'component': 'Test Global Component', 'page': 1})]})
 
@@ -102,7 +102,7 @@ class GlobalComponentTestCase(CLITestCase):
         with self.expect_output('global_component/detail.txt'):
             self.runner.run(['global-component', 'update', 'Test Global Component', '--name', 'new test name'])
         self.assertEqual(api.calls,
-                         {'global-components': [('GET', {'name': 'Test Global Component'})],
+                         {'global-components': [('GET', {'name': 'Test Global Component', 'page_size': 1})],
                           'global-components/1': [('PATCH', {'name': 'new test name'}), ('GET', {})],
                           'global-component-contacts': [('GET', {'component': 'Test Global Component', 'page': 1})]})
 
@@ -151,7 +151,7 @@ class GlobalComponentTestCase(CLITestCase):
         with self.expect_output('global_component/detail.json', parse_json=True):
             self.runner.run(['--json', 'global-component', 'info', 'Test Global Component'])
         self.assertEqual(api.calls,
-                         {'global-components': [('GET', {'name': 'Test Global Component'})],
+                         {'global-components': [('GET', {'name': 'Test Global Component', 'page_size': 1})],
                           'global-components/1': [('GET', {})],
                           'global-component-contacts': [('GET', {'component': 'Test Global Component', 'page': 1})]})
 
@@ -228,23 +228,24 @@ class ReleaseComponentTestCase(CLITestCase):
         with self.expect_output('release_component/list_multi_page.txt'):
             self.runner.run(['release-component', 'list',
                              '--release', 'Test Release'])
+        fields = ['id', 'release', 'name']
         self.assertEqual(api.calls['release-components'],
-                         [('GET', {'page': 1, 'release': 'Test Release'}),
-                          ('GET', {'page': 2, 'release': 'Test Release'})])
+                         [('GET', {'page': 1, 'release': 'Test Release', 'fields': fields}),
+                          ('GET', {'page': 2, 'release': 'Test Release', 'fields': fields})])
 
     def test_list_active(self, api):
         api.add_endpoint('release-components', 'GET', [])
         with self.expect_output('release_component/empty.txt'):
             self.runner.run(['release-component', 'list', '--active'])
         self.assertEqual(api.calls['release-components'],
-                         [('GET', {'page': 1, 'active': True})])
+                         [('GET', {'page': 1, 'active': True, 'fields': ['id', 'release', 'name']})])
 
     def test_list_inactive(self, api):
         api.add_endpoint('release-components', 'GET', [])
         with self.expect_output('release_component/empty.txt'):
             self.runner.run(['release-component', 'list', '--inactive'])
         self.assertEqual(api.calls['release-components'],
-                         [('GET', {'page': 1, 'active': False})])
+                         [('GET', {'page': 1, 'active': False, 'fields': ['id', 'release', 'name']})])
 
     def test_detail(self, api):
         api.add_endpoint('release-components', 'GET', [self.detail])
@@ -273,7 +274,8 @@ class ReleaseComponentTestCase(CLITestCase):
         with self.expect_output('release_component/detail.txt'):
             self.runner.run(['release-component', 'info', 'test_release', 'Test Release Component'])
         self.assertEqual(api.calls,
-                         {'release-components': [('GET', {'name': 'Test Release Component', 'release': 'test_release'})],
+                         {'release-components': [('GET', {'name': 'Test Release Component', 'release': 'test_release',
+                                                          'page_size': 1})],
                           'release-components/1': [('GET', {})],
                           'release-component-contacts':
                               [('GET',
@@ -313,7 +315,7 @@ class ReleaseComponentTestCase(CLITestCase):
                              '--name', 'new test name'])
         self.assertEqual(api.calls,
                          {'release-components': [
-                             ('GET', {'name': 'Test Release Component', 'release': 'test_release'})],
+                             ('GET', {'name': 'Test Release Component', 'release': 'test_release', 'page_size': 1})],
                           'release-components/1': [('PATCH', {'name': 'new test name'}),
                                                    ('GET', {})],
                           'release-component-contacts':
@@ -373,7 +375,8 @@ class ReleaseComponentTestCase(CLITestCase):
         with self.expect_output('release_component/detail.json', parse_json=True):
             self.runner.run(['--json', 'release-component', 'info', 'test_release', 'Test Release Component'])
         self.assertEqual(api.calls,
-                         {'release-components': [('GET', {'name': 'Test Release Component', 'release': 'test_release'})],
+                         {'release-components': [('GET', {'name': 'Test Release Component', 'release': 'test_release',
+                                                          'page_size': 1})],
                           'release-components/1': [('GET', {})],
                           'release-component-contacts':
                               [('GET',
@@ -188,3 +188,37 @@ class ServerConfigTestCase(unittest.TestCase):
         configs = ServerConfigManager(fixture_path('config.json'), fixture_path('configs'))
         with self.assertRaises(ServerConfigNotFoundError):
             configs.get('test-pdc-server')
+
+    def test_cache(self):
+        configs = ServerConfigManager(fixture_path('options.json'))
+        config = configs.get('test-pdc-server-options')
+        self.assertEqual(config.cache_dir, os.path.expanduser('~/.cache/pdc/example'))
+        self.assertEqual(config.cache_size, 1048576)
+
+    def test_default_cache(self):
+        configs = ServerConfigManager(fixture_path('config.json'))
+        config = configs.get('test-pdc-server-2')
+        self.assertEqual(config.cache_dir, None)
+        self.assertEqual(config.cache_size, None)
+
+    def test_connection(self):
+        configs = ServerConfigManager(fixture_path('options.json'))
+        config = configs.get('test-pdc-server-options')
+        self.assertEqual(config.pool_connections, 4)
+        self.assertEqual(config.pool_maxsize, 32)
+        self.assertEqual(config.connect_timeout, 3.05)
+        self.assertEqual(config.read_timeout, 60)
+        self.assertEqual(config.max_retries, 2)
+        self.assertEqual(config.retry, {'retries': 5, 'budget': 300})
+        self.assertEqual(config.hedge, 0.5)
+
+    def test_default_connection(self):
+        configs = ServerConfigManager(fixture_path('config.json'))
+        config = configs.get('test-pdc-server-2')
+        self.assertEqual(config.pool_connections, None)
+        self.assertEqual(config.pool_maxsize, None)
+        self.assertEqual(config.connect_timeout, None)
+        self.assertEqual(config.read_timeout, None)
+        self.assertEqual(config.max_retries, None)
+        self.assertEqual(config.retry, None)
+        self.assertEqual(config.hedge, None)
@@ -67,8 +67,7 @@ class GlobalComponentContactTestCase(CLITestCase):
         with self.expect_output('global_component_contact/empty.txt'):
             self.runner.run(['global-component-contact', 'delete-match', '--role', 'pm'])
         self.assertEqual(api.calls,
-                         {'global-component-contacts': [('GET', {'page': 1,
-                                                                 'role': 'pm'})],
+                         {'global-component-contacts': [('GET', {'page_size': 1, 'role': 'pm'})],
                           'global-component-contacts/1': [('DELETE', {})]})
 
     def test_delete_multi_matches(self, api):
@@ -76,8 +75,8 @@ class GlobalComponentContactTestCase(CLITestCase):
         with self.expect_output('global_component_contact/multi_matches.txt'):
             self.runner.run(['global-component-contact', 'delete-match', '--role', 'pm'])
         self.assertEqual(api.calls,
-                         {'global-component-contacts': [('GET', {'page': 1,
-                                                                 'role': 'pm'})]})
+                         {'global-component-contacts': [('GET', {'page_size': 1, 'role': 'pm'}),
+                                                        ('GET', {'page': 1, 'role': 'pm'})]})
 
     def test_create(self, api):
         api.add_endpoint('global-component-contacts', 'POST', self.detail)
@@ -177,8 +176,7 @@ class ReleaseComponentContactTestCase(CLITestCase):
         with self.expect_output('release_component_contact/empty.txt'):
             self.runner.run(['release-component-contact', 'delete-match', '--role', 'pm'])
         self.assertEqual(api.calls,
-                         {'release-component-contacts': [('GET', {'page': 1,
-                                                                  'role': 'pm'})],
+                         {'release-component-contacts': [('GET', {'page_size': 1, 'role': 'pm'})],
                           'release-component-contacts/1': [('DELETE', {})]})
 
     def test_delete_multi_matches(self, api):
@@ -186,8 +184,8 @@ class ReleaseComponentContactTestCase(CLITestCase):
         with self.expect_output('release_component_contact/multi_matches.txt'):
             self.runner.run(['release-component-contact', 'delete-match', '--role', 'pm'])
         self.assertEqual(api.calls,
-                         {'release-component-contacts': [('GET', {'page': 1,
-                                                                  'role': 'pm'})]})
+                         {'release-component-contacts': [('GET', {'page_size': 1, 'role': 'pm'}),
+                                                         ('GET', {'page': 1, 'role': 'pm'})]})
 
     def test_create(self, api):
         api.add_endpoint('release-component-contacts', 'POST', self.detail)
@@ -114,14 +114,14 @@ class ImageTestCase(CLITestCase):
         with self.expect_output('info.txt'):
             self.runner.run(['image', 'info', 'unique_filename.iso'])
         self.assertEqual(api.calls['images'],
-                         [('GET', {'file_name': 'unique_filename.iso'})])
+                         [('GET', {'file_name': 'unique_filename.iso', 'page_size': 1})])
 
     def test_info_json(self, api):
         self._setup_detail(api)
         with self.expect_output('info.json', parse_json=True):
             self.runner.run(['--json', 'image', 'info', 'unique_filename.iso'])
         self.assertEqual(api.calls['images'],
-                         [('GET', {'file_name': 'unique_filename.iso'})])
+                         [('GET', {'file_name': 'unique_filename.iso', 'page_size': 1})])
 
     def test_info_ambiguous(self, api):
         self._setup_duplicit_detail(api)
@@ -129,7 +129,8 @@ class ImageTestCase(CLITestCase):
             with self.expect_failure():
                 self.runner.run(['image', 'info', 'unique_filename.iso'])
         self.assertEqual(api.calls['images'],
-                         [('GET', {'file_name': 'unique_filename.iso'})])
+                         [('GET', {'file_name': 'unique_filename.iso', 'page_size': 1}),
+                          ('GET', {'file_name': 'unique_filename.iso', 'page': 1})])
 
     def test_info_with_sha(self, api):
         self._setup_detail(api)
@@ -137,5 +138,5 @@ class ImageTestCase(CLITestCase):
             self.runner.run(['image', 'info', 'unique_filename.iso',
                              '--sha256', '3333333333333333333333333333333333333333333333333333333333333333'])
         self.assertEqual(api.calls['images'],
-                         [('GET', {'file_name': 'unique_filename.iso',
+                         [('GET', {'file_name': 'unique_filename.iso', 'page_size': 1,
                                    'sha256': '3333333333333333333333333333333333333333333333333333333333333333'})])
@@ -46,9 +46,13 @@ class RepoTestCase(CLITestCase):
         result = api.calls['content-delivery-repos']
         # Skip checking 'ordering'.
         ordering = result[0][1]['ordering']
+        fields = ['id', 'release_id', 'variant_uid', 'arch', 'service', 'name', 'repo_family',
+                  'content_format', 'content_category', 'shadow', 'product_id']
         self.assertEqual(result,
-                         [('GET', {'page': 1, 'content_format': 'iso', 'ordering': ordering}),
-                          ('GET', {'page': 2, 'content_format': 'iso', 'ordering': ordering})])
+                         [('GET', {'page': 1, 'content_format': 'iso', 'ordering': ordering,
+                                   'fields': fields}),
+                          ('GET', {'page': 2, 'content_format': 'iso', 'ordering': ordering,
+                                   'fields': fields})])
 
     def test_list_json(self, api):
         self._setup_list(api)
@@ -4,6 +4,12 @@
 # Licensed under The MIT License (MIT)
 # http://opensource.org/licenses/MIT
 #
+import json
+import tempfile
+
+import mock
+
+from pdc_client.compat import StringIO
 from pdc_client.test_helpers import CLITestCase
 from pdc_client.runner import Runner
 
@@ -32,9 +38,45 @@ class RpmTestCase(CLITestCase):
         self._setup_list(api)
         with self.expect_output('list.txt'):
             self.runner.run(['rpm', 'list', '--name', 'bash'])
+        fields = ['id', 'name', 'epoch', 'version', 'release', 'arch']
         self.assertEqual(api.calls['rpms'],
-                         [('GET', {'page': 1, 'name': 'bash'}),
-                          ('GET', {'page': 2, 'name': 'bash'})])
+                         [('GET', {'page': 1, 'name': 'bash', 'fields': fields}),
+                          ('GET', {'page': 2, 'name': 'bash', 'fields': fields})])
+
+    def test_list_fields(self, api):
+        self._setup_list(api)
+        with self.expect_output('list_fields.txt'):
+            self.runner.run(['rpm', 'list', '--name', 'bash', '--fields', 'id,version,arch'])
+        fields = ['id', 'version', 'arch']
+        self.assertEqual(api.calls['rpms'],
+                         [('GET', {'page': 1, 'name': 'bash', 'fields': fields}),
+                          ('GET', {'page': 2, 'name': 'bash', 'fields': fields})])
+
+    def test_list_fields_json(self, api):
+        self._setup_list(api)
+        with self.expect_output('list.json', parse_json=True):
+            self.runner.run(['--json', 'rpm', 'list', '--name', 'bash', '--fields', 'id, name'])
+        self.assertEqual(api.calls['rpms'],
+                         [('GET', {'page': 1, 'name': 'bash', 'fields': ['id', 'name']}),
+                          ('GET', {'page': 2, 'name': 'bash', 'fields': ['id', 'name']})])
+
+    def test_list_stats(self, api):
+        self._setup_list(api)
+        stats_file = tempfile.NamedTemporaryFile(suffix='.json')
+        self.addCleanup(stats_file.close)
+        with mock.patch('sys.stderr', new_callable=StringIO) as stderr:
+            with self.expect_output('list.txt'):
+                self.runner.run(['--stats', '--stats-json', stats_file.name,
+                                 'rpm', 'list', '--name', 'bash'])
+        self.assertTrue(stderr.getvalue().strip().startswith('Method'))
+        with open(stats_file.name) as f:
+            stats = json.load(f)
+        self.assertEqual([(r['method'], r['url'], r['resource'], r['status'], r['pages'])
+                          for r in stats['requests']],
+                         [('GET', 'http://localhost/rest_api/v1/rpms/', 'rpms', 200, 1)] * 2)
+        self.assertEqual([(s['method'], s['resource'], s['requests'], s['pages'], s['errors'])
+                          for s in stats['summary']],
+                         [('GET', 'rpms', 2, 2, 0)])
 
     def test_list_json(self, api):
         self._setup_list(api)
@@ -4,9 +4,17 @@
 # Licensed under The MIT License (MIT)
 # http://opensource.org/licenses/MIT
 #
+import argparse
+import os
+import subprocess
+import sys
 import unittest
 
-from pdc_client import plugin_helpers
+import mock
+
+from pdc_client import plugin_helpers, plugin_manifest
+from pdc_client.compat import StringIO
+from pdc_client.runner import DEFAULT_PLUGIN_DIR, Runner
 
 
 class PluginHelperTestCase(unittest.TestCase):
@@ -19,3 +27,91 @@ class PluginHelperTestCase(unittest.TestCase):
         data = plugin_helpers.extract_arguments(args, prefix='prf__')
         self.assertEqual(data,
                          {'foo': {'bar': {'baz': 1, 'quux': 2}}})
+
+
+class VersionTestCase(unittest.TestCase):
+    @unittest.skipIf(sys.version_info < (3, 7), 'version is computed on import')
+    def test_import_does_not_compute_version(self):
+        code = ("import sys, pdc_client; "
+                "print('__version__' in vars(pdc_client), 'pkg_resources' in sys.modules)")
+        env = dict(os.environ, PYTHONPATH=os.path.join(os.path.dirname(__file__), '..'))
+        output = subprocess.check_output([sys.executable, '-c', code], env=env)
+        self.assertEqual(output.split(), [b'False', b'False'])
+
+    def test_version_action(self):
+        parser = argparse.ArgumentParser(prog='pdc')
+        parser.add_argument('--version', action=plugin_helpers.VersionAction)
+        self.assertEqual(parser.parse_args([]), argparse.Namespace())
+        with mock.patch('pdc_client.__version__', '1.8.0', create=True):
+            with mock.patch('sys.stdout', new_callable=StringIO) as stdout:
+                with mock.patch('sys.stderr', new_callable=StringIO) as stderr:
+                    with self.assertRaises(SystemExit) as cm:
+                        parser.parse_args(['--version'])
+        self.assertEqual(cm.exception.code, 0)
+        self.assertEqual(stdout.getvalue(), 'pdc 1.8.0\n')
+        self.assertEqual(stderr.getvalue(), '')
+
+
+HOOK_PLUGIN = """
+from pdc_client.plugin_helpers import PDCClientPlugin
+
+
+class FooPlugin(PDCClientPlugin):
+    command = 'foo'
+
+    def register(self):
+        self.run_hook('foo_parser_setup', self.parser)
+
+
+def foo_parser_setup(parser):
+    pass
+
+
+PLUGIN_CLASSES = [FooPlugin]
+"""
+
+
+class PluginManifestTestCase(unittest.TestCase):
+    def test_manifest_is_up_to_date(self):
+        self.assertEqual(plugin_manifest.load_manifest(DEFAULT_PLUGIN_DIR),
+                         plugin_manifest.generate_manifest(DEFAULT_PLUGIN_DIR))
+
+    def test_scan_plugin(self):
+        commands, functions, hooks = plugin_manifest.scan_plugin(HOOK_PLUGIN)
+        self.assertEqual(commands, ['foo'])
+        self.assertEqual(functions, set(['foo_parser_setup']))
+        self.assertEqual(hooks, set(['foo_parser_setup']))
+
+    def test_scan_plugin_with_unknown_command(self):
+        source = HOOK_PLUGIN.replace("command = 'foo'", "command = COMMAND")
+        self.assertEqual(plugin_manifest.scan_plugin(source)[0], None)
+
+    def _load_plugins(self, *args):
+        runner = Runner()
+        with mock.patch('sys.argv', ['pdc'] + list(args)):
+            runner.load_plugins()
+        return sorted(plugin.command for plugin in runner.plugins)
+
+    def test_load_plugin_for_command(self):
+        self.assertEqual(self._load_plugins('--json', 'rpm', 'list'), ['rpm'])
+        self.assertEqual(self._load_plugins('-s', 'http://pdc/', 'release-component', 'list'),
+                         ['global-component', 'release-component'])
+
+    def test_load_all_plugins(self):
+        manifest = plugin_manifest.load_manifest(DEFAULT_PLUGIN_DIR)
+        self.assertEqual(self._load_plugins('--help'), sorted(manifest))
+        self.assertEqual(self._load_plugins('no-such-command'), sorted(manifest))
+        with mock.patch.dict('os.environ', {'_ARGCOMPLETE': '1'}):
+            self.assertEqual(self._load_plugins('rpm'), sorted(manifest))
+
+    def _registered_commands(self, *args):
+        runner = Runner()
+        with mock.patch('sys.argv', ['pdc'] + list(args)):
+            runner.setup()
+        return sorted(runner.parser._subparsers._group_actions[0].choices)
+
+    def test_register_requested_command(self):
+        self.assertEqual(self._registered_commands('release-component', 'list'),
+                         ['release-component'])
+        manifest = plugin_manifest.load_manifest(DEFAULT_PLUGIN_DIR)
+        self.assertEqual(self._registered_commands('--help'), sorted(manifest))